@@ -19,8 +19,21 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
+import collections
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
 import six
 
+try:
+  _clock = time.monotonic
+except AttributeError:  # Python 2
+  _clock = time.time
 
 
 class Context(six.with_metaclass(abc.ABCMeta, object)):
@@ -44,6 +57,15 @@ class Context(six.with_metaclass(abc.ABCMeta, object)):
 
     pass
 
+  def set_status(self, status):
+    """Record the (last) HTTP status observed by this operation."""
+
+  def add_bytes(self, sent=0, received=0):
+    """Record payload bytes sent and received by this operation."""
+
+  def add_retry(self):
+    """Record that this operation had to be retried once more."""
+
 
 class Nop(Context):
   """Default implementation of Context that does nothing."""
@@ -59,3 +81,246 @@ class Nop(Context):
                exc_value,
                traceback):
     pass
+
+
+Sample = collections.namedtuple('Sample', [
+    'operation', 'start', 'duration', 'status', 'bytes_sent',
+    'bytes_received', 'retries', 'error'
+])
+
+
+class Recording(Context):
+  """Context that measures an operation and hands the Sample to a Sink.
+
+  Recording contexts nest: the innermost open context on the current thread
+  is available through Current(), which lets lower layers (e.g. the retrying
+  transport) attribute retries to the operation that triggered them.
+  """
+
+  def __init__(self, operation, sink):
+    super(Recording, self).__init__(operation)
+    self._operation = operation
+    self._sink = sink
+    self._status = None
+    self._bytes_sent = 0
+    self._bytes_received = 0
+    self._retries = 0
+    self._start = None
+    self._wall_start = None
+
+  def set_status(self, status):
+    self._status = status
+
+  def add_bytes(self, sent=0, received=0):
+    self._bytes_sent += sent
+    self._bytes_received += received
+
+  def add_retry(self):
+    self._retries += 1
+
+  def __enter__(self):
+    _Stack().append(self)
+    self._wall_start = time.time()
+    self._start = _clock()
+    return self
+
+  def __exit__(self, exc_type,
+               exc_value,
+               traceback):
+    duration = _clock() - self._start
+    stack = _Stack()
+    if stack and stack[-1] is self:
+      stack.pop()
+    _SafeRecord(
+        self._sink,
+        Sample(
+            operation=self._operation,
+            start=self._wall_start,
+            duration=duration,
+            status=self._status,
+            bytes_sent=self._bytes_sent,
+            bytes_received=self._bytes_received,
+            retries=self._retries,
+            error=exc_type.__name__ if exc_type else None))
+
+
+def _SafeRecord(sink, sample):
+  """Hands the Sample to the sink; monitoring never fails the operation."""
+  try:
+    sink.record(sample)
+  except Exception:  # pylint: disable=broad-except
+    logging.exception('Failed to record the %s operation', sample.operation)
+
+
+class Sink(six.with_metaclass(abc.ABCMeta, object)):
+  """Interface for consumers of the Samples produced by Recording."""
+
+  @abc.abstractmethod
+  def record(self, sample):
+    """Consume a single Sample. Must be threadsafe."""
+
+
+class Aggregator(Sink):
+  """Sink that keeps per-operation totals in memory."""
+
+  def __init__(self):
+    # Reentrant so that subclasses can read the summary while holding it.
+    self._lock = threading.RLock()
+    self._stats = {}
+
+  def record(self, sample):
+    with self._lock:
+      stats = self._stats.setdefault(sample.operation, {
+          'count': 0,
+          'errors': 0,
+          'retries': 0,
+          'seconds': 0.0,
+          'max_seconds': 0.0,
+          'bytes_sent': 0,
+          'bytes_received': 0,
+          'statuses': collections.Counter(),
+      })
+      stats['count'] += 1
+      stats['errors'] += 1 if sample.error else 0
+      stats['retries'] += sample.retries
+      stats['seconds'] += sample.duration
+      stats['max_seconds'] = max(stats['max_seconds'], sample.duration)
+      stats['bytes_sent'] += sample.bytes_sent
+      stats['bytes_received'] += sample.bytes_received
+      if sample.status is not None:
+        stats['statuses'][sample.status] += 1
+
+  def summary(self):
+    """Returns a copy of the per-operation totals, keyed by operation."""
+    with self._lock:
+      return {
+          operation: dict(stats, statuses=dict(stats['statuses']))
+          for operation, stats in six.iteritems(self._stats)
+      }
+
+  def reset(self):
+    with self._lock:
+      self._stats = {}
+
+
+class JsonLines(Sink):
+  """Sink that appends every Sample as one JSON object per line.
+
+  Args:
+    fileobj: a writable text file object (not closed by this sink).
+  """
+
+  def __init__(self, fileobj):
+    self._fileobj = fileobj
+    self._lock = threading.Lock()
+
+  def record(self, sample):
+    line = json.dumps(sample._asdict(), sort_keys=True)
+    with self._lock:
+      self._fileobj.write(line + '\n')
+      self._fileobj.flush()
+
+
+class PrometheusTextfile(Aggregator):
+  """Aggregator that exports its totals in the Prometheus textfile format.
+
+  The file is rewritten atomically (write to a temporary file of the same
+  directory, then rename) so that it can be scraped by the node_exporter
+  textfile collector at any time.
+
+  Args:
+    path: the .prom file to write.
+    interval: minimum number of seconds between two rewrites triggered by
+      record(); call write() to force one.
+  """
+
+  def __init__(self, path, interval=10):
+    super(PrometheusTextfile, self).__init__()
+    self._path = path
+    self._interval = interval
+    self._last_write = None
+
+  def record(self, sample):
+    with self._lock:
+      super(PrometheusTextfile, self).record(sample)
+      now = _clock()
+      if self._last_write is None or now - self._last_write >= self._interval:
+        self._last_write = now
+        self.write()
+
+  def write(self):
+    """Rewrite the textfile with the current totals."""
+    lines = []
+    for name, key, kind in [
+        ('registry_operation_total', 'count', 'counter'),
+        ('registry_operation_errors_total', 'errors', 'counter'),
+        ('registry_operation_retries_total', 'retries', 'counter'),
+        ('registry_operation_seconds_total', 'seconds', 'counter'),
+        ('registry_operation_seconds_max', 'max_seconds', 'gauge'),
+        ('registry_operation_sent_bytes_total', 'bytes_sent', 'counter'),
+        ('registry_operation_received_bytes_total', 'bytes_received',
+         'counter'),
+    ]:
+      lines.append('# TYPE {} {}'.format(name, kind))
+      for operation, stats in sorted(six.iteritems(self.summary())):
+        lines.append('{}{{operation="{}"}} {}'.format(name, operation,
+                                                      stats[key]))
+    directory, name = os.path.split(self._path)
+    with self._lock:
+      fd, tmp = tempfile.mkstemp(
+          prefix=name + '.', suffix='.tmp', dir=directory or '.')
+      try:
+        with os.fdopen(fd, 'w') as f:
+          f.write('\n'.join(lines) + '\n')
+        os.rename(tmp, self._path)
+        tmp = None
+      finally:
+        if tmp is not None:
+          os.remove(tmp)
+
+
+class Tee(Sink):
+  """Sink that forwards every Sample to several sinks."""
+
+  def __init__(self, *sinks):
+    self._sinks = sinks
+
+  def record(self, sample):
+    for sink in self._sinks:
+      _SafeRecord(sink, sample)
+
+
+_local = threading.local()
+_NOP = Nop('')
+_factory = Nop
+
+
+def _Stack():
+  if not hasattr(_local, 'stack'):
+    _local.stack = []
+  return _local.stack
+
+
+# pylint: disable=invalid-name
+def Configure(sink=None):
+  """Send all subsequent client operations to the given Sink.
+
+  Args:
+    sink: the Sink receiving Samples, or None to disable monitoring.
+  """
+  global _factory
+  if sink is None:
+    _factory = Nop
+  else:
+    _factory = functools.partial(Recording, sink=sink)
+
+
+def Operation(operation):
+  """Returns the Context in which the named client operation should run."""
+  return _factory(operation)
+
+
+def Current():
+  """Returns the innermost open Context on this thread (or a Nop)."""
+  stack = _Stack()
+  return stack[-1] if stack else _NOP
@@ -69,7 +69,7 @@ class Layer(docker_image.DockerImage):
           'size': len(self._blob),
       })
       if not diff_id:
-        diff_id = docker_digest.SHA256(self.uncompressed_blob(self._blob_sum))
+        diff_id = docker_digest.SHA256Uncompressed(self._blob)
 
       # Takes naked hex.
       overrides = overrides.Override(layers=[diff_id[len('sha256:'):]])
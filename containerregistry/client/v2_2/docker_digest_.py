@@ -19,9 +19,45 @@ from __future__ import division
 from __future__ import print_function
 
 import hashlib
+import zlib
 
+# Compressed bytes fed to the decompressor at a time by SHA256Uncompressed.
+_CHUNK_SIZE = 1024 * 1024
 
 
 def SHA256(content, prefix='sha256:'):
   """Return 'sha256:' + hex(sha256(content))."""
   return prefix + hashlib.sha256(content).hexdigest()
+
+
+def SHA256Uncompressed(zipped, prefix='sha256:'):
+  """Return 'sha256:' + hex(sha256(gunzip(zipped))) without inflating it all.
+
+  The gzip stream is decompressed and hashed incrementally, so memory use is
+  bounded by the chunk size rather than by the size of the uncompressed layer.
+
+  Args:
+    zipped: the gzipped bytes, or a binary file object positioned at them.
+    prefix: the prefix of the returned digest.
+
+  Returns:
+    The digest of the uncompressed content (i.e. a layer's diff_id).
+  """
+  if isinstance(zipped, bytes):
+    view = memoryview(zipped)
+    chunks = (view[i:i + _CHUNK_SIZE] for i in range(0, len(view), _CHUNK_SIZE))
+  else:
+    chunks = iter(lambda: zipped.read(_CHUNK_SIZE), b'')
+
+  sha = hashlib.sha256()
+  # 16 + MAX_WBITS selects the gzip container format.
+  inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+  for chunk in chunks:
+    while chunk:
+      sha.update(inflater.decompress(chunk))
+      # A gzip file may consist of several concatenated members.
+      chunk = inflater.unused_data if inflater.eof else b''
+      if chunk:
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+  sha.update(inflater.flush())
+  return prefix + sha.hexdigest()
@@ -18,12 +18,15 @@ from __future__ import division
 
 from __future__ import print_function
 
+import collections
+import concurrent.futures
 import json
 import re
 import threading
 
 from containerregistry.client import docker_creds
 from containerregistry.client import docker_name
+from containerregistry.client import monitor
 from containerregistry.client.v2_2 import docker_creds as v2_2_creds
 import httplib2
 import six.moves.http_client
@@ -152,6 +155,43 @@ class TokenRefreshException(BadStateException):
   """Exception when token refresh fails."""
 
 
+class ETagCache(object):
+  """A threadsafe, bounded store of (etag, response, content) keyed by URL.
+
+  Passed to Transport.Request to turn repeated GETs of slowly changing
+  listings (tags/list, _catalog pages) into conditional requests, which
+  the registry answers with an empty 304 when nothing has changed.
+
+  Args:
+    max_entries: the number of URLs to remember before evicting the least
+      recently used one.
+  """
+
+  def __init__(self, max_entries = 4096):
+    self._max_entries = max_entries
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, url):
+    """Returns the cached (etag, response, content) for url, or None."""
+    with self._lock:
+      entry = self._entries.pop(url, None)
+      if entry is not None:
+        self._entries[url] = entry
+      return entry
+
+  def put(self, url, etag, resp, content):
+    with self._lock:
+      self._entries.pop(url, None)
+      self._entries[url] = (etag, resp, content)
+      while len(self._entries) > self._max_entries:
+        self._entries.popitem(last=False)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+
 def _CheckState(predicate, message = None):
   if not predicate:
     raise BadStateException(message if message else 'Unknown')
@@ -224,12 +264,16 @@ class Transport(object):
         'content-type': 'application/json',
         'user-agent': docker_name.USER_AGENT,
     }
-    resp, content = self._transport.request(
-        '{scheme}://{registry}/v2/'.format(
-            scheme=Scheme(self._name.registry), registry=self._name.registry),
-        'GET',
-        body=None,
-        headers=headers)
+    with monitor.Operation('registry.ping') as ctx:
+      resp, content = self._transport.request(
+          '{scheme}://{registry}/v2/'.format(
+              scheme=Scheme(self._name.registry),
+              registry=self._name.registry),
+          'GET',
+          body=None,
+          headers=headers)
+      ctx.set_status(resp.status)
+      ctx.add_bytes(received=len(content or b''))
 
     # We expect a www-authenticate challenge.
     _CheckState(
@@ -301,14 +345,17 @@ class Transport(object):
         'scope': self._Scope(),
         'service': self._service,
     }
-    resp, content = self._transport.request(
-        # 'realm' includes scheme and path
-        '{realm}?{query}'.format(
-            realm=self._realm,
-            query=six.moves.urllib.parse.urlencode(parameters)),
-        'GET',
-        body=None,
-        headers=headers)
+    with monitor.Operation('registry.token') as ctx:
+      resp, content = self._transport.request(
+          # 'realm' includes scheme and path
+          '{realm}?{query}'.format(
+              realm=self._realm,
+              query=six.moves.urllib.parse.urlencode(parameters)),
+          'GET',
+          body=None,
+          headers=headers)
+      ctx.set_status(resp.status)
+      ctx.add_bytes(received=len(content or b''))
 
     if resp.status != six.moves.http_client.OK:
       raise TokenRefreshException('Bad status during token exchange: %d\n%s' %
@@ -335,7 +382,8 @@ class Transport(object):
               method = None,
               body = None,
               content_type = None,
-              accepted_mimes = None
+              accepted_mimes = None,
+              etag_cache = None
              ):
     """Wrapper containing much of the boilerplate REST logic for Registry calls.
 
@@ -348,6 +396,9 @@ class Transport(object):
       content_type: the mime-type of the request (or None for JSON).
               content_type is ignored when body is None.
       accepted_mimes: the list of acceptable mime-types
+      etag_cache: an optional ETagCache used to revalidate GET requests with
+              If-None-Match; a 304 response yields the cached response
+              (including its Link header) and content.
 
     Raises:
       BadStateException: an unexpected internal state has been encountered.
@@ -359,42 +410,60 @@ class Transport(object):
     if not method:
       method = 'GET' if not body else 'PUT'
 
+    cached = None
+    if etag_cache is not None and method == 'GET':
+      cached = etag_cache.get(url)
+
     # If the first request fails on a 401 Unauthorized, then refresh the
     # Bearer token and retry, if the authentication mode is bearer.
-    for retry in [self._authentication == _BEARER, False]:
-      # self._creds may be changed by self._Refresh(), so do
-      # not hoist this.
-      headers = {
-          'user-agent': docker_name.USER_AGENT,
-      }
-      auth = self._creds.Get()
-      if auth:
-        headers['Authorization'] = auth
-
-      if body:  # Requests w/ bodies should have content-type.
-        headers['content-type'] = (
-            content_type if content_type else 'application/json')
-
-      if accepted_mimes is not None:
-        headers['Accept'] = ','.join(accepted_mimes)
-
-      # POST/PUT require a content-length, when no body is supplied.
-      if method in ('POST', 'PUT') and not body:
-        headers['content-length'] = '0'
-
-      resp, content = self._transport.request(
-          url, method, body=body, headers=headers)
-
-      if resp.status != six.moves.http_client.UNAUTHORIZED:
-        break
-      elif retry:
-        # On Unauthorized, refresh the credential and retry.
-        self._Refresh()
+    with monitor.Operation('http.' + method) as ctx:
+      for retry in [self._authentication == _BEARER, False]:
+        # self._creds may be changed by self._Refresh(), so do
+        # not hoist this.
+        headers = {
+            'user-agent': docker_name.USER_AGENT,
+        }
+        auth = self._creds.Get()
+        if auth:
+          headers['Authorization'] = auth
+
+        if body:  # Requests w/ bodies should have content-type.
+          headers['content-type'] = (
+              content_type if content_type else 'application/json')
+
+        if accepted_mimes is not None:
+          headers['Accept'] = ','.join(accepted_mimes)
+
+        if cached is not None:
+          headers['If-None-Match'] = cached[0]
+
+        # POST/PUT require a content-length, when no body is supplied.
+        if method in ('POST', 'PUT') and not body:
+          headers['content-length'] = '0'
+
+        resp, content = self._transport.request(
+            url, method, body=body, headers=headers)
+        ctx.set_status(resp.status)
+        ctx.add_bytes(sent=len(body or b''), received=len(content or b''))
+
+        if resp.status != six.moves.http_client.UNAUTHORIZED:
+          break
+        elif retry:
+          # On Unauthorized, refresh the credential and retry.
+          ctx.add_retry()
+          self._Refresh()
+
+    if cached is not None and resp.status == six.moves.http_client.NOT_MODIFIED:
+      return cached[1], cached[2]
 
     if resp.status not in accepted_codes:
       # Use the content returned by GCR as the error message.
       raise V2DiagnosticException(resp, content)
 
+    if (etag_cache is not None and method == 'GET' and
+        resp.status == six.moves.http_client.OK and resp.get('etag')):
+      etag_cache.put(url, resp['etag'], resp, content)
+
     return resp, content
 
   def PaginatedRequest(self,
@@ -402,7 +471,9 @@ class Transport(object):
                        accepted_codes = None,
                        method = None,
                        body = None,
-                       content_type = None
+                       content_type = None,
+                       prefetch = False,
+                       etag_cache = None
                       ):
     """Wrapper around Request that follows Link headers if they exist.
 
@@ -413,18 +484,49 @@ class Transport(object):
               whether body is provided)
       body: the body to pass into the PUT request (or None for GET)
       content_type: the mime-type of the request (or None for JSON)
+      prefetch: whether to fetch the next page on a background thread while
+              the caller consumes the current one.
+      etag_cache: an optional ETagCache to revalidate each page against.
 
     Yields:
       The return value of calling Request for each page of results.
     """
-    next_page = url
-
-    while next_page:
-      resp, content = self.Request(next_page, accepted_codes, method, body,
-                                   content_type)
-      yield resp, content
+    def _Fetch(page):
+      return self.Request(page, accepted_codes, method, body, content_type,
+                          etag_cache=etag_cache)
+
+    def _NextPage(page, resp):
+      # Registries commonly return a Link relative to the registry host.
+      link = ParseNextLinkHeader(resp)
+      return six.moves.urllib.parse.urljoin(page, link) if link else None
+
+    if not prefetch:
+      next_page = url
+      while next_page:
+        resp, content = _Fetch(next_page)
+        yield resp, content
+
+        next_page = _NextPage(next_page, resp)
+      return
 
-      next_page = ParseNextLinkHeader(resp)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+      page = url
+      resp, content = _Fetch(page)
+      while True:
+        next_page = _NextPage(page, resp)
+        # The next page is only named by the current response, so this is
+        # as early as its request can be issued.
+        future = executor.submit(_Fetch, next_page) if next_page else None
+        yield resp, content
+        if future is None:
+          return
+        page = next_page
+        resp, content = future.result()
+    finally:
+      # Don't block a caller that stopped iterating early on the in-flight
+      # request; its result is simply discarded.
+      executor.shutdown(wait=False)
 
 
 def ParseNextLinkHeader(resp):
@@ -19,8 +19,10 @@ from __future__ import division
 from __future__ import print_function
 
 import abc
+import concurrent.futures
 import gzip
 import io
+import itertools
 import json
 import os
 import tarfile
@@ -28,6 +30,7 @@ import threading
 
 from containerregistry.client import docker_creds
 from containerregistry.client import docker_name
+from containerregistry.client import monitor
 from containerregistry.client.v2_2 import docker_digest
 from containerregistry.client.v2_2 import docker_http
 import httplib2
@@ -36,6 +39,11 @@ from six.moves import zip  # pylint: disable=redefined-builtin
 import six.moves.http_client
 
 
+# Listings (tags/list and _catalog pages) are shared by every FromRegistry in
+# the process and revalidated with their ETag rather than refetched.
+LISTING_CACHE = docker_http.ETagCache()
+
+
 class DigestMismatchedError(Exception):
   """Exception raised when a digest mismatch is encountered."""
 
@@ -249,7 +257,8 @@ class FromRegistry(DockerImage):
   def _content(self,
                suffix,
                accepted_mimes = None,
-               cache = True):
+               cache = True,
+               etag_cache = None):
     """Fetches content of the resources from registry by http calls."""
     if isinstance(self._name, docker_name.Repository):
       suffix = '{repository}/{suffix}'.format(
@@ -264,7 +273,8 @@ class FromRegistry(DockerImage):
             registry=self._name.registry,
             suffix=suffix),
         accepted_codes=[six.moves.http_client.OK],
-        accepted_mimes=accepted_mimes)
+        accepted_mimes=accepted_mimes,
+        etag_cache=etag_cache)
     if cache:
       self._response[suffix] = content
     return content
@@ -272,7 +282,8 @@ class FromRegistry(DockerImage):
   def _tags(self):
     # See //cloud/containers/registry/proto/v2/tags.proto
     # for the full response structure.
-    return json.loads(self._content('tags/list').decode('utf8'))
+    return json.loads(
+        self._content('tags/list', etag_cache=LISTING_CACHE).decode('utf8'))
 
   def tags(self):
     return self._tags().get('tags', [])
@@ -343,7 +354,9 @@ class FromRegistry(DockerImage):
   def blob(self, digest):
     """Override."""
     # GET server1/v2/<name>/blobs/<digest>
-    c = self._content('blobs/' + digest, cache=False)
+    with monitor.Operation('registry.blob_pull') as ctx:
+      c = self._content('blobs/' + digest, cache=False)
+      ctx.add_bytes(received=len(c))
     computed = docker_digest.SHA256(c)
     if digest != computed:
       raise DigestMismatchedError(
@@ -351,7 +364,13 @@ class FromRegistry(DockerImage):
           '%s vs. %s' % (digest, computed if c else '(content was empty)'))
     return c
 
-  def catalog(self, page_size = 100):
+  def catalog(self, page_size = 100, prefetch = True):
+    """Yields the repositories of the registry, following pagination.
+
+    Args:
+      page_size: the number of repositories to request per page.
+      prefetch: fetch the next page while the caller consumes this one.
+    """
     # TODO(user): Handle docker_name.Repository for /v2/<name>/_catalog
     if isinstance(self._name, docker_name.Repository):
       raise ValueError('Expected docker_name.Registry for "name"')
@@ -362,7 +381,8 @@ class FromRegistry(DockerImage):
         page_size=page_size)
 
     for _, content in self._transport.PaginatedRequest(
-        url, accepted_codes=[six.moves.http_client.OK]):
+        url, accepted_codes=[six.moves.http_client.OK], prefetch=prefetch,
+        etag_cache=LISTING_CACHE):
       wrapper_object = json.loads(content.decode('utf8'))
 
       if 'repositories' not in wrapper_object:
@@ -388,6 +408,56 @@ class FromRegistry(DockerImage):
     return '<docker_image.FromRegistry name: {}>'.format(str(self._name))
 
 
+# pylint: disable=invalid-name
+def ListTags(repositories,
+             creds,
+             transport,
+             threads = 8):
+  """Fetches tags/list for many repositories with bounded concurrency.
+
+  Each repository needs its own (pull-scoped) docker_http.Transport, so the
+  ping and token exchange are fanned out along with the listing itself.
+
+  Args:
+    repositories: an iterable of docker_name.Repository.
+    creds: the credentials to use, or a callable mapping a repository to them
+      (e.g. docker_creds.DefaultKeychain.Resolve).
+    transport: a threadsafe http transport (e.g. transport_pool.Http).
+    threads: the maximum number of repositories listed at once.
+
+  Yields:
+    (repository, tags payload) tuples in completion order. The payload is the
+    decoded tags/list response (see FromRegistry.tags/manifests/children).
+  """
+  def _List(repository):
+    repo_creds = creds(repository) if callable(creds) else creds
+    with FromRegistry(repository, repo_creds, transport) as img:
+      return img._tags()  # pylint: disable=protected-access
+
+  repositories = iter(repositories)
+  executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+  # Only `threads` repositories are in flight at once, so a caller that stops
+  # iterating early leaves nothing queued behind it.
+  future_to_repository = {}
+  try:
+    for repository in itertools.islice(repositories, threads):
+      future_to_repository[executor.submit(_List, repository)] = repository
+    while future_to_repository:
+      done, _ = concurrent.futures.wait(
+          future_to_repository,
+          return_when=concurrent.futures.FIRST_COMPLETED)
+      for future in done:
+        repository = future_to_repository.pop(future)
+        # Keep the pool busy while the caller consumes this result.
+        for following in itertools.islice(repositories, 1):
+          future_to_repository[executor.submit(_List, following)] = following
+        yield repository, future.result()
+  finally:
+    for future in future_to_repository:
+      future.cancel()
+    executor.shutdown(wait=False)
+
+
 # Gzip injects a timestamp into its output, which makes its output and digest
 # non-deterministic.  To get reproducible pushes, freeze time.
 # This approach is based on the following StackOverflow answer:
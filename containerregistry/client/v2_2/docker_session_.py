@@ -23,6 +23,7 @@ import concurrent.futures
 
 from containerregistry.client import docker_creds
 from containerregistry.client import docker_name
+from containerregistry.client import monitor
 from containerregistry.client.v2_2 import docker_http
 from containerregistry.client.v2_2 import docker_image
 from containerregistry.client.v2_2 import docker_image_list as image_list
@@ -88,13 +89,15 @@ class Push(object):
   def _blob_exists(self, digest):
     """Check the remote for the given layer."""
     # HEAD the blob, and check for a 200
-    resp, unused_content = self._transport.Request(
-        '{base_url}/blobs/{digest}'.format(
-            base_url=self._base_url(), digest=digest),
-        method='HEAD',
-        accepted_codes=[
-            six.moves.http_client.OK, six.moves.http_client.NOT_FOUND
-        ])
+    with monitor.Operation('registry.blob_head') as ctx:
+      resp, unused_content = self._transport.Request(
+          '{base_url}/blobs/{digest}'.format(
+              base_url=self._base_url(), digest=digest),
+          method='HEAD',
+          accepted_codes=[
+              six.moves.http_client.OK, six.moves.http_client.NOT_FOUND
+          ])
+      ctx.set_status(resp.status)  # pytype: disable=attribute-error
 
     return resp.status == six.moves.http_client.OK  # pytype: disable=attribute-error
 
@@ -116,8 +119,11 @@ class Push(object):
 
   def _get_blob(self, image, digest):
     if digest == image.config_blob():
-      return image.config_file().encode('utf8')
-    return image.blob(digest)
+      blob = image.config_file().encode('utf8')
+    else:
+      blob = image.blob(digest)
+    monitor.Current().add_bytes(sent=len(blob))
+    return blob
 
   def _monolithic_upload(self, image,
                          digest):
@@ -203,7 +209,8 @@ class Push(object):
     # * We attempt to perform a cross-repo mount if any repositories are
     # specified in the "mount" parameter. This does a fast copy from a
     # repository that is known to contain this blob and skips the upload.
-    self._patch_upload(image, digest)
+    with monitor.Operation('registry.blob_upload'):
+      self._patch_upload(image, digest)
 
   def _remote_tag_digest(
       self, image
@@ -236,16 +243,20 @@ class Push(object):
     else:
       tag_or_digest = _tag_or_digest(self._name)
 
-    self._transport.Request(
-        '{base_url}/manifests/{tag_or_digest}'.format(
-            base_url=self._base_url(), tag_or_digest=tag_or_digest),
-        method='PUT',
-        body=image.manifest(),
-        content_type=image.media_type(),
-        accepted_codes=[
-            six.moves.http_client.OK, six.moves.http_client.CREATED,
-            six.moves.http_client.ACCEPTED  # pytype: disable=wrong-arg-types
-        ])
+    manifest = image.manifest()
+    with monitor.Operation('registry.manifest_put') as ctx:
+      resp, unused_content = self._transport.Request(
+          '{base_url}/manifests/{tag_or_digest}'.format(
+              base_url=self._base_url(), tag_or_digest=tag_or_digest),
+          method='PUT',
+          body=manifest,
+          content_type=image.media_type(),
+          accepted_codes=[
+              six.moves.http_client.OK, six.moves.http_client.CREATED,
+              six.moves.http_client.ACCEPTED  # pytype: disable=wrong-arg-types
+          ])
+      ctx.set_status(resp.status)  # pytype: disable=attribute-error
+      ctx.add_bytes(sent=len(manifest))
 
   def _start_upload(self,
                     digest,
@@ -268,8 +279,11 @@ class Push(object):
     #       six.moves.http_client.CREATED, six.moves.http_client.ACCEPTED
     #   ]
     # import pdb; pdb.set_trace()
-    resp, unused_content = self._transport.Request(
-        url, method='POST', body=None, accepted_codes=accepted_codes)
+    with monitor.Operation('registry.blob_mount' if mount else
+                           'registry.blob_upload_start') as ctx:
+      resp, unused_content = self._transport.Request(
+          url, method='POST', body=None, accepted_codes=accepted_codes)
+      ctx.set_status(resp.status)  # pytype: disable=attribute-error
     # pytype: disable=attribute-error,bad-return-type
     return resp.status == six.moves.http_client.CREATED, resp.get('location')
     # pytype: enable=attribute-error,bad-return-type
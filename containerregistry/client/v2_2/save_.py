@@ -41,8 +41,12 @@ def _diff_id(v1_img, blob):
   try:
     return v1_img.diff_id(blob)
   except ValueError:
-    unzipped = v1_img.uncompressed_layer(blob)
-    return docker_digest.SHA256(unzipped)
+    if (type(v1_img).uncompressed_layer is not
+        v1_image.DockerImage.uncompressed_layer):
+      # The layer is held uncompressed (e.g. FromTarball), layer() would gzip
+      # it only for it to be gunzipped again.
+      return docker_digest.SHA256(v1_img.uncompressed_layer(blob))
+    return docker_digest.SHA256Uncompressed(v1_img.layer(blob))
 
 
 def multi_image_tarball(
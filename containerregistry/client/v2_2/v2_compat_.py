@@ -139,8 +139,20 @@ class V22FromV2(v2_2_image.DockerImage):
     self._manifest = json.dumps(manifest_schema2, sort_keys=True)
 
   def _GetDiffId(self, digest):
-    """Hash the uncompressed layer blob."""
-    return docker_digest.SHA256(self._v2_image.uncompressed_blob(digest))
+    """Hash the uncompressed layer blob, unless its diff_id is known."""
+    # v2 images backed by a v2.2 config (e.g. V2FromV22) already know it.
+    try:
+      diff_id = self._v2_image.diff_id(digest)
+    except ValueError:
+      diff_id = None
+    if diff_id:
+      return diff_id
+    if (type(self._v2_image).uncompressed_blob is not
+        v2_image.DockerImage.uncompressed_blob):
+      # The source holds the layer uncompressed (e.g. V2FromV1 of a tarball),
+      # blob() would gzip it only for it to be gunzipped again.
+      return docker_digest.SHA256(self._v2_image.uncompressed_blob(digest))
+    return docker_digest.SHA256Uncompressed(self._v2_image.blob(digest))
 
   def manifest(self):
     """Override."""
@@ -18,6 +18,7 @@
 import logging
 import time
 
+from containerregistry.client import monitor
 from containerregistry.transport import nested
 
 import httplib2
@@ -105,5 +106,6 @@ class RetryTransport(nested.NestedTransport):
 
         logging.error('Retrying after exception %s.', err)
         retries += 1
+        monitor.Current().add_retry()
         time.sleep(self._backoff_factor * (2**retries))
         continue
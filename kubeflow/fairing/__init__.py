@@ -1,5 +1,5 @@
 import os
-from kubeflow.fairing.ml_tasks.tasks import TrainJob, PredictionEndpoint
+from kubeflow.fairing.ml_tasks.tasks import TrainJob, PredictionEndpoint, Sweep
 
 if os.getenv('FAIRING_RUNTIME', None) is not None:
     from kubeflow.fairing.runtime_config import config
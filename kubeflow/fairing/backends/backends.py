@@ -95,8 +95,13 @@ class BackendInterface:
 class KubernetesBackend(BackendInterface):
     """ Use to create a builder instance and create a deployer to be used with a traing job or
     a serving job for the Kubernetes.
+
+    :param namespace: namespace to run the jobs in
+    :param build_context_source: context source used by the cluster builder
+    :param wheelhouse: a Wheelhouse; when set, jobs with a requirements.txt are built by
+        the append builder with a dependency layer instead of an in-cluster or docker build
     """
-    def __init__(self, namespace=None, build_context_source=None):
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None):
         if not namespace and not utils.is_running_in_k8s():
             logger.warning("Can't determine namespace automatically. "
                            "Using 'default' namespace but recomend to provide namespace explicitly"
@@ -104,6 +109,7 @@ class KubernetesBackend(BackendInterface):
                            "required secrets in cloud backends.")
         self._namespace = namespace or utils.get_default_target_namespace()
         self._build_context_source = build_context_source
+        self._wheelhouse = wheelhouse
 
     def get_builder(self, preprocessor, base_image, registry, needs_deps_installation=True,  # pylint:disable=arguments-differ
                     pod_spec_mutators=None):
@@ -119,10 +125,12 @@ class KubernetesBackend(BackendInterface):
                                   (Default value =None)
 
         """
-        if not needs_deps_installation:
+        if not needs_deps_installation or self._wheelhouse is not None:
             return AppendBuilder(preprocessor=preprocessor,
                                  base_image=base_image,
-                                 registry=registry)
+                                 registry=registry,
+                                 install_requirements=needs_deps_installation,
+                                 wheelhouse=self._wheelhouse)
         elif utils.is_running_in_k8s():
             return ClusterBuilder(preprocessor=preprocessor,
                                   base_image=base_image,
@@ -169,8 +177,9 @@ class GKEBackend(KubernetesBackend):
     And get the approriate docker registry for GKE.
     """
 
-    def __init__(self, namespace=None, build_context_source=None):
-        super(GKEBackend, self).__init__(namespace, build_context_source)
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None):
+        super(GKEBackend, self).__init__(namespace, build_context_source,
+                                         wheelhouse=wheelhouse)
         self._build_context_source = gcs_context.GCSContextSource(
             namespace=self._namespace)
 
@@ -192,10 +201,12 @@ class GKEBackend(KubernetesBackend):
         pod_spec_mutators = pod_spec_mutators or []
         pod_spec_mutators.append(gcp.add_gcp_credentials_if_exists)
 
-        if not needs_deps_installation:
+        if not needs_deps_installation or self._wheelhouse is not None:
             return AppendBuilder(preprocessor=preprocessor,
                                  base_image=base_image,
-                                 registry=registry)
+                                 registry=registry,
+                                 install_requirements=needs_deps_installation,
+                                 wheelhouse=self._wheelhouse)
         elif (utils.is_running_in_k8s() or
               not ml_tasks_utils.is_docker_daemon_exists()):
             return ClusterBuilder(preprocessor=preprocessor,
@@ -258,9 +269,10 @@ class AWSBackend(KubernetesBackend):
     or a serving job for the AWS backend.
     """
 
-    def __init__(self, namespace=None, build_context_source=None):
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None):
         build_context_source = build_context_source or s3_context.S3ContextSource()
-        super(AWSBackend, self).__init__(namespace, build_context_source)
+        super(AWSBackend, self).__init__(namespace, build_context_source,
+                                         wheelhouse=wheelhouse)
 
     def get_builder(self, preprocessor, base_image, registry, needs_deps_installation=True,
                     pod_spec_mutators=None):
@@ -318,10 +330,12 @@ class IBMCloudBackend(KubernetesBackend):
     or a serving job for the IBM Cloud backend.
     """
 
-    def __init__(self, namespace=None, cos_endpoint_url=None, build_context_source=None):
+    def __init__(self, namespace=None, cos_endpoint_url=None, build_context_source=None,
+                 wheelhouse=None):
         build_context_source = build_context_source or\
             cos_context.COSContextSource(namespace=namespace, cos_endpoint_url=cos_endpoint_url)
-        super(IBMCloudBackend, self).__init__(namespace, build_context_source)
+        super(IBMCloudBackend, self).__init__(namespace, build_context_source,
+                                              wheelhouse=wheelhouse)
 
     def get_builder(self, preprocessor, base_image, registry, needs_deps_installation=True,
                     pod_spec_mutators=None):
@@ -373,11 +387,12 @@ class AzureBackend(KubernetesBackend):
     """ Use to create a builder instance and create a deployer to be used with a traing job or
     a serving job for the Azure backend.
     """
-    def __init__(self, namespace=None, build_context_source=None):
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None):
         build_context_source = (
             build_context_source or azurestorage_context.StorageContextSource(namespace=namespace)
         )
-        super(AzureBackend, self).__init__(namespace, build_context_source)
+        super(AzureBackend, self).__init__(namespace, build_context_source,
+                                           wheelhouse=wheelhouse)
 
     def get_builder(self, preprocessor, base_image, registry,
                     needs_deps_installation=True, pod_spec_mutators=None):
@@ -397,7 +412,7 @@ class AzureBackend(KubernetesBackend):
         if not azure.is_acr_registry(registry):
             raise Exception("'{}' is not an Azure Container Registry".format(registry))
         pod_spec_mutators.append(azure.add_acr_config)
-        pod_spec_mutators.append(azure.add_azure_files)
+        pod_spec_mutators.append(azure.get_azure_files_mutator(self._build_context_source))
         return super(AzureBackend, self).get_builder(preprocessor,
                                                      base_image,
                                                      registry,
@@ -407,35 +422,37 @@ class AzureBackend(KubernetesBackend):
 class KubeflowBackend(KubernetesBackend):
     """Kubeflow backend refer to KubernetesBackend """
 
-    def __init__(self, namespace=None, build_context_source=None):
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None):
         if not namespace and not utils.is_running_in_k8s():
             namespace = "kubeflow"
-        super(KubeflowBackend, self).__init__(namespace, build_context_source)
+        super(KubeflowBackend, self).__init__(namespace, build_context_source,
+                                              wheelhouse=wheelhouse)
 
 
 class KubeflowGKEBackend(GKEBackend):
     """Kubeflow for GKE backend refer to GKEBackend """
 
-    def __init__(self, namespace=None, build_context_source=None):
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None):
         if not namespace and not utils.is_running_in_k8s():
             namespace = "kubeflow"
         super(KubeflowGKEBackend, self).__init__(
-            namespace, build_context_source)
+            namespace, build_context_source, wheelhouse=wheelhouse)
 
 
 class KubeflowAWSBackend(AWSBackend):
     """Kubeflow for AWS backend refer to AWSBackend """
 
-    def __init__(self, namespace=None, build_context_source=None): # pylint:disable=useless-super-delegation
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None): # pylint:disable=useless-super-delegation
         super(KubeflowAWSBackend, self).__init__(
-            namespace, build_context_source)
+            namespace, build_context_source, wheelhouse=wheelhouse)
 
 
 class KubeflowAzureBackend(AzureBackend):
     """Kubeflow for Azure backend refer to AzureBackend """
 
-    def __init__(self, namespace=None, build_context_source=None): # pylint:disable=useless-super-delegation
-        super(KubeflowAzureBackend, self).__init__(namespace, build_context_source)
+    def __init__(self, namespace=None, build_context_source=None, wheelhouse=None): # pylint:disable=useless-super-delegation
+        super(KubeflowAzureBackend, self).__init__(namespace, build_context_source,
+                                                   wheelhouse=wheelhouse)
 
 
 class GCPManagedBackend(BackendInterface):
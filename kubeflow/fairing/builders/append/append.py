@@ -1,7 +1,9 @@
 from timeit import default_timer as timer
 import httplib2
+import json
 import os
 import logging
+import posixpath
 
 from containerregistry.client import docker_creds
 from containerregistry.client import docker_name
@@ -11,6 +13,8 @@ from containerregistry.client.v2_2 import docker_session
 from containerregistry.transport import transport_pool
 from containerregistry.transform.v2_2 import metadata
 
+from kubeflow.fairing import executor
+from kubeflow.fairing.builders.append.wheelhouse import Wheelhouse
 from kubeflow.fairing.builders.base_builder import BaseBuilder
 from kubeflow.fairing.constants import constants
 
@@ -26,15 +30,21 @@ class AppendBuilder(BaseBuilder):
     :param preprocessor: Preprocessor{BasePreProcessor} to use to modify inputs
         before sending them to docker build
     :param push: Whether or not to push the image to the registry
+    :param install_requirements: Whether to install the requirements.txt of the
+        context in a dependency layer appended below the code layer (default: False)
+    :param wheelhouse: Wheelhouse building the dependency layer, it must match the
+        python version and platform of the base image (default: Wheelhouse())
 
     """
 
-    def __init__(self,
+    def __init__(self, #pylint:disable=too-many-arguments
                  registry=None,
                  image_name=constants.DEFAULT_IMAGE_NAME,
                  base_image=constants.DEFAULT_BASE_IMAGE,
                  push=True,
-                 preprocessor=None):
+                 preprocessor=None,
+                 install_requirements=False,
+                 wheelhouse=None):
         super().__init__(
             registry=registry,
             image_name=image_name,
@@ -42,12 +52,15 @@ class AppendBuilder(BaseBuilder):
             push=push,
             preprocessor=preprocessor,
         )
+        self.install_requirements = install_requirements
+        self.wheelhouse = wheelhouse or Wheelhouse()
 
     def build(self):
         """Will be called when the build needs to start"""
         transport = transport_pool.Http(httplib2.Http)
         src = docker_name.Tag(self.base_image, strict=False)
         logger.warning("Building image using Append builder...")
+        self.progress.update(executor.BUILDING)
         start = timer()
         new_img = self._build(transport, src)
         end = timer()
@@ -68,8 +81,12 @@ class AppendBuilder(BaseBuilder):
         self.image_tag = self.full_image_name(self.context_hash)
         creds = docker_creds.DefaultKeychain.Resolve(src)
         with v2_2_image.FromRegistry(src, creds, transport) as src_image:
+            base_img = src_image
+            if self.install_requirements and \
+                    self.preprocessor.is_requirements_txt_file_present():
+                base_img = self._dependencies_layer(src_image)
             with open(self.context_file, 'rb') as f:
-                new_img = append.Layer(src_image, f.read(), overrides=metadata.Overrides(
+                new_img = append.Layer(base_img, f.read(), overrides=metadata.Overrides(
                     cmd=self.preprocessor.get_command(),
                     user='0', 
                     env={"FAIRING_RUNTIME": "1"}
@@ -77,6 +94,21 @@ class AppendBuilder(BaseBuilder):
                 )
         return new_img
 
+    def _dependencies_layer(self, src_image):
+        """Appends the packages of the context's requirements.txt to src_image."""
+        requirements = self.preprocessor.context_map()[
+            posixpath.join(self.preprocessor.path_prefix, "requirements.txt")]
+        layer_file, diff_id = self.wheelhouse.layer(requirements)
+        target_dir = self.wheelhouse.target_dir
+        env = {"PYTHONPATH": target_dir,
+               "PATH": posixpath.join(target_dir, "bin") + ":$PATH"}
+        if any(e.startswith("PYTHONPATH=")
+               for e in json.loads(src_image.config_file()).get("config", {}).get("Env") or []):
+            env["PYTHONPATH"] = target_dir + ":$PYTHONPATH"
+        with open(layer_file, 'rb') as f:
+            return append.Layer(src_image, f.read(), diff_id=diff_id,
+                                overrides=metadata.Overrides(env=env))
+
     def _push(self, transport, src, img, dst):
         creds = docker_creds.DefaultKeychain.Resolve(dst)
         with docker_session.Push(dst, creds, transport,
@@ -95,6 +127,7 @@ class AppendBuilder(BaseBuilder):
 
         """
         logger.warning("Pushing image {}...".format(self.image_tag))
+        self.progress.update(executor.PUSHING)
         start = timer()
         self._push(transport, src, img, dst)
         end = timer()
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+from containerregistry.client.v2_2 import docker_digest
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.preprocessors.base import reset_tar_mtime
+
+logger = logging.getLogger(__name__)
+
+
+class Wheelhouse(object):
+    """Turns a requirements file into a dependency layer for the append builder.
+
+    Wheels are downloaded for the target interpreter and platform rather than the
+    local one, installed into `target_dir` and packed into a gzipped tarball.
+    Everything is cached under `cache_dir` keyed by the hash of the requirements
+    and target, so the layer is only built once per set of requirements and its
+    blob digest stays the same across pushes.
+
+    :param cache_dir: directory holding wheelhouses and layers
+        (default: {constants.WHEELHOUSE_CACHE_DIR})
+    :param python_version: python version of the base image, e.g. '3.6',
+        defaults to the local interpreter's version
+    :param platform: pip platform tag of the base image
+        (default: {constants.WHEELHOUSE_PLATFORM})
+    :param target_dir: where the packages are installed in the image
+        (default: {constants.WHEELHOUSE_TARGET_DIR})
+
+    """
+
+    def __init__(self,
+                 cache_dir=constants.WHEELHOUSE_CACHE_DIR,
+                 python_version=None,
+                 platform=constants.WHEELHOUSE_PLATFORM,
+                 target_dir=constants.WHEELHOUSE_TARGET_DIR):
+        self.cache_dir = cache_dir
+        self.python_version = python_version or '{}.{}'.format(*sys.version_info[:2])
+        self.platform = platform
+        self.target_dir = target_dir
+
+    def key(self, requirements_file):
+        """Cache key of the layer built from the given requirements file.
+
+        :param requirements_file: path to the requirements file
+        :returns: hex sha256 of the requirements and the target
+
+        """
+        sha = hashlib.sha256()
+        with open(requirements_file, 'rb') as f:
+            sha.update(f.read())
+        for value in (self.python_version, self.platform, self.target_dir):
+            sha.update(b'\0' + value.encode('utf8'))
+        return sha.hexdigest()
+
+    def layer(self, requirements_file):
+        """Returns the dependency layer for a requirements file, building it if needed.
+
+        :param requirements_file: path to the requirements file
+        :returns: (path to the gzipped layer tarball, diff_id of the layer)
+
+        """
+        entry = os.path.join(self.cache_dir, self.key(requirements_file))
+        layer_file = os.path.join(entry, 'layer.tar.gz')
+        diff_id_file = os.path.join(entry, 'diff_id')
+        if os.path.exists(layer_file) and os.path.exists(diff_id_file):
+            logger.warning("Using cached dependency layer {}".format(layer_file))
+            with open(diff_id_file) as f:
+                return layer_file, f.read().strip()
+
+        wheels = os.path.join(entry, 'wheels')
+        os.makedirs(wheels, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='fairing_site_packages_')
+        try:
+            logger.warning("Downloading wheels for python {} on {}...".format(
+                self.python_version, self.platform))
+            self._pip('download', '--dest', wheels, '-r', requirements_file)
+            self._pip('install', '--no-index', '--find-links', wheels,
+                      '--target', staging, '-r', requirements_file)
+            diff_id = self._write_layer(staging, layer_file)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        with open(diff_id_file, 'w') as f:
+            f.write(diff_id)
+        return layer_file, diff_id
+
+    def _pip(self, command, *args):
+        cmd = [sys.executable, '-m', 'pip', command,
+               '--only-binary=:all:',
+               '--platform', self.platform,
+               '--python-version', self.python_version,
+               '--implementation', 'cp',
+               '--disable-pip-version-check']
+        subprocess.check_call(cmd + list(args))
+
+    def _write_layer(self, staging, layer_file):
+        # Written next to the final path and renamed, so that an interrupted
+        # build never leaves a truncated layer in the cache.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(layer_file), suffix='.tar.gz')
+        os.close(fd)
+        try:
+            with open(tmp, 'wb') as raw, \
+                    gzip.GzipFile(filename='', fileobj=raw, mode='wb', mtime=0) as gz, \
+                    tarfile.open(fileobj=gz, mode='w', dereference=True) as tar:
+                tar.add(staging, arcname=self.target_dir.strip('/'),
+                        filter=reset_tar_mtime)
+            with open(tmp, 'rb') as f:
+                diff_id = docker_digest.SHA256Uncompressed(f)
+            os.rename(tmp, layer_file)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return diff_id
@@ -1,7 +1,9 @@
 import logging
+import subprocess
 
 from kubernetes import client
 
+from kubeflow.fairing import executor
 from kubeflow.fairing.builders.builder import BuilderInterface
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.cloud import gcp
@@ -37,6 +39,10 @@ class BaseBuilder(BuilderInterface): #pylint:disable=too-many-instance-attribute
         self.preprocessor = preprocessor
         self.image_tag = None
         self.docker_client = None
+        self.progress = executor.Progress()
+        # (step, seconds) for each step of the last build, for builders that time them.
+        self.step_timings = []
+        self._process = None
 
     def generate_pod_spec(self):
         return client.V1PodSpec(
@@ -68,3 +74,52 @@ class BaseBuilder(BuilderInterface): #pylint:disable=too-many-instance-attribute
     def build(self):
         """Runs the build"""
         raise NotImplementedError()
+
+    def cancel(self):
+        """Stop the running build or push command, which then fails."""
+        process = self._process
+        if process is not None and process.poll() is None:
+            logger.warning('Cancelling {}...'.format(process.args[0]))
+            process.terminate()
+
+    def _run_command(self, cmd, stdin=None, on_line=None, env=None):
+        """Run a build or push command, logging its output line by line.
+
+        :param cmd: argument list of the command
+        :param stdin: file object to feed to the command
+        :param on_line: optional callable invoked with every output line, and with
+            None once the output ends
+        :param env: environment of the command, the current one if None
+        :returns: the exit code of the command
+        """
+        logger.info("Running: {}".format(' '.join(cmd)))
+        self._process = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE,
+                                         stderr=subprocess.STDOUT, env=env,
+                                         universal_newlines=True, errors='replace')
+        try:
+            for line in self._process.stdout:
+                line = line.rstrip()
+                logger.info(line)
+                if on_line is not None:
+                    on_line(line)
+            return self._process.wait()
+        finally:
+            self._process.stdout.close()
+            self._process = None
+            if on_line is not None:
+                on_line(None)
+
+    def build_async(self):
+        """Runs the build on the shared background executor.
+
+        Other builders can run at the same time, but a builder runs one build at
+        a time: wait for the returned future before building again.
+
+        :returns: a concurrent.futures.Future of the image tag, its `progress`
+            attribute tells which stage the build is in
+
+        """
+        def build():
+            self.build()
+            return self.image_tag
+        return executor.submit(build, progress=self.progress)
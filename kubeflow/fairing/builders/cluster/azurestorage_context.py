@@ -6,6 +6,7 @@ from kubeflow.fairing import utils
 from kubeflow.fairing.builders.cluster.context_source import ContextSourceInterface
 from kubeflow.fairing.cloud import azure
 from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes.manager import KubeManager
 
 
 class StorageContextSource(ContextSourceInterface):
@@ -21,9 +22,10 @@ class StorageContextSource(ContextSourceInterface):
         self.share_name = constants.AZURE_FILES_SHARED_FOLDER
         self.context_hash = None
         self.context_path = None
+        self.manager = KubeManager()
 
     def prepare(self, context_filename):  # pylint:disable=arguments-differ
-        self.context_hash = utils.crc(context_filename)
+        self.context_hash = utils.sha256(context_filename)
         self.context_path = self.upload_context(context_filename)
 
     def upload_context(self, context_filename):
@@ -32,7 +34,7 @@ class StorageContextSource(ContextSourceInterface):
         # we are uploading the files in the context to a shared folder in Azure Files,
         # mounting the shared folder into the Kaniko pod,
         # and providing Kaniko with a local path to the files.
-        azure_uploader = azure.AzureFileUploader(self.namespace)
+        azure_uploader = azure.AzureFileUploader(self.namespace, kube_manager=self.manager)
         dir_name = "build_{}".format(self.context_hash)
         storage_account_name, storage_key = azure_uploader.upload_to_share(
             self.region,
@@ -44,7 +46,8 @@ class StorageContextSource(ContextSourceInterface):
 
         # This is the secret that we need to mount the shared folder into the Kaniko pod
         azure.create_storage_creds_secret(
-            self.namespace, self.context_hash, storage_account_name, storage_key
+            self.namespace, self.context_hash, storage_account_name, storage_key,
+            kube_manager=self.manager
         )
 
         # Local path to the files
@@ -52,7 +55,8 @@ class StorageContextSource(ContextSourceInterface):
 
 
     def cleanup(self):
-        azure.delete_storage_creds_secret(self.namespace, self.context_hash)
+        azure.delete_storage_creds_secret(self.namespace, self.context_hash,
+                                          kube_manager=self.manager)
 
     def generate_pod_spec(self, image_name, push):  # pylint:disable=arguments-differ
         args = ["--dockerfile=Dockerfile",
@@ -1,19 +1,69 @@
 import logging
+import re
 import uuid
 
 from kubernetes import client
 
+from kubeflow.fairing import executor
 from kubeflow.fairing import utils
 from kubeflow.fairing.builders.base_builder import BaseBuilder
 from kubeflow.fairing.builders import dockerfile
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.kubernetes.manager import KubeManager
+from kubeflow.fairing.kubernetes.mutators import run_mutators
 
 logger = logging.getLogger(__name__)
 
+KANIKO_CACHE_HIT = re.compile(r'Using caching version of cmd')
+KANIKO_CACHE_MISS = re.compile(r'No cached layer found for cmd')
+KANIKO_BASE_IMAGE_CACHE_HIT = re.compile(r'Found \S+ in local cache')
+
+
+class KanikoCacheStats(object):
+    """Counts layer cache hits and misses reported in Kaniko logs."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.base_image_hits = 0
+
+    def __call__(self, line):
+        """Consume one line of Kaniko output.
+
+        :param line: the log line
+        """
+        if KANIKO_CACHE_HIT.search(line):
+            self.hits += 1
+        elif KANIKO_CACHE_MISS.search(line):
+            self.misses += 1
+        elif KANIKO_BASE_IMAGE_CACHE_HIT.search(line):
+            self.base_image_hits += 1
+
+    def __repr__(self):
+        return "KanikoCacheStats(hits={}, misses={}, base_image_hits={})".format(
+            self.hits, self.misses, self.base_image_hits)
+
 
 class ClusterBuilder(BaseBuilder):
     """Builds a docker image in a Kubernetes cluster.
+
+    Layers are cached in a per-namespace cache repository next to the built
+    image, for every context source. With warm_cache (or a cache_volume), base
+    images are additionally pre-pulled into a volume shared with the build pod
+    by a Kaniko warmer Job.
+
+    :param cache: whether Kaniko should use the remote layer cache
+    :param cache_repo: repository for cached layers, defaults to
+        <registry>/fairing-cache-<namespace>
+    :param cache_ttl: how long cached layers stay valid, e.g. '336h'
+    :param warm_cache: run the warmer Job for the base image before building
+    :param cache_volume: V1Volume holding the base image cache; defaults to a
+        hostPath on the node when warm_cache is set. Use a ReadWriteMany volume
+        for the warm cache to be visible on every node.
+    :param stream_logs: whether to print the Kaniko logs while waiting for the build
+    :param build_timeout: seconds to wait for the build Job, None waits forever
+    :param multi_stage: whether the generated Dockerfile installs the requirements
+        in a separate stage (Default value = False)
     """
 
     def __init__(self,
@@ -26,7 +76,15 @@ class ClusterBuilder(BaseBuilder):
                  pod_spec_mutators=None,
                  namespace=None,
                  dockerfile_path=None,
-                 cleanup=False):
+                 cleanup=False,
+                 cache=True,
+                 cache_repo=None,
+                 cache_ttl=constants.KANIKO_CACHE_TTL,
+                 warm_cache=False,
+                 cache_volume=None,
+                 stream_logs=True,
+                 build_timeout=None,
+                 multi_stage=False):
         super().__init__(
             registry=registry,
             image_name=image_name,
@@ -41,6 +99,109 @@ class ClusterBuilder(BaseBuilder):
         self.pod_spec_mutators = pod_spec_mutators or []
         self.namespace = namespace or utils.get_default_target_namespace()
         self.cleanup = cleanup
+        self.cache = cache
+        self.cache_repo = cache_repo or '{}/fairing-cache-{}'.format(
+            self.registry, self.namespace)
+        self.cache_ttl = cache_ttl
+        self.warm_cache = warm_cache
+        if cache_volume is None and warm_cache:
+            cache_volume = client.V1Volume(
+                name=constants.KANIKO_CACHE_VOLUME_NAME,
+                host_path=client.V1HostPathVolumeSource(
+                    path=constants.KANIKO_CACHE_HOST_PATH,
+                    type='DirectoryOrCreate'))
+        self.cache_volume = cache_volume
+        self.stream_logs = stream_logs
+        self.build_timeout = build_timeout
+        self.multi_stage = multi_stage
+        self.cache_stats = None
+        self.build_result = None
+
+    def add_cache_args(self, pod_spec):
+        """Point the kaniko container of pod_spec at the layer and base image caches.
+
+        :param pod_spec: pod spec generated by the context source
+        """
+        kaniko = next(c for c in pod_spec.containers if c.name == 'kaniko')
+        args = [arg for arg in kaniko.args or [] if not arg.startswith('--cache')]
+        if self.cache:
+            args += ["--cache=true",
+                     "--cache-repo=" + self.cache_repo,
+                     "--cache-ttl=" + self.cache_ttl]
+        if self.cache_volume is not None:
+            args.append("--cache-dir=" + constants.KANIKO_CACHE_DIR)
+            kaniko.volume_mounts = (kaniko.volume_mounts or []) + [
+                client.V1VolumeMount(name=self.cache_volume.name,
+                                     mount_path=constants.KANIKO_CACHE_DIR,
+                                     read_only=True)]
+            pod_spec.volumes = (pod_spec.volumes or []) + [self.cache_volume]
+        kaniko.args = args
+
+    def warm_base_images(self, images=None):
+        """Pre-pull images into the cache volume with a Kaniko warmer Job.
+
+        :param images: images to cache, defaults to the base image
+        """
+        if self.cache_volume is None:
+            raise RuntimeError("cache_volume is required to warm the base image cache")
+        images = images or [self.base_image]
+        labels = {constants.FAIRING_BUILDER_LABEL: 'kaniko-warmer',
+                  'fairing-build-id': str(uuid.uuid1())}
+        pod_spec = client.V1PodSpec(
+            containers=[client.V1Container(
+                name='warmer',
+                image=constants.KANIKO_WARMER_IMAGE,
+                args=["--cache-dir=" + constants.KANIKO_CACHE_DIR] +
+                ["--image=" + image for image in images],
+                volume_mounts=[client.V1VolumeMount(
+                    name=self.cache_volume.name,
+                    mount_path=constants.KANIKO_CACHE_DIR)],
+            )],
+            restart_policy='Never',
+            volumes=[self.cache_volume],
+        )
+        run_mutators(self.manager, pod_spec, self.namespace, self.pod_spec_mutators)
+        warmer_job = client.V1Job(
+            api_version="batch/v1",
+            kind="Job",
+            metadata=client.V1ObjectMeta(
+                generate_name="fairing-cache-warmer-",
+                labels=labels,
+            ),
+            spec=client.V1JobSpec(
+                template=client.V1PodTemplateSpec(
+                    metadata=client.V1ObjectMeta(
+                        labels=labels,
+                        annotations={"sidecar.istio.io/inject": "false"},
+                    ),
+                    spec=pod_spec),
+                backoff_limit=0,
+                ttl_seconds_after_finished=constants.JOB_TTL_SECONDS_AFTER_FINISHED or None,
+            )
+        )
+        logging.info("Warming the Kaniko cache with %s", ", ".join(images))
+        created_job = self.manager.create_job(self.namespace, warmer_job)
+        result = None
+        try:
+            result = self.manager.wait_for_job(
+                created_job.metadata.name,
+                created_job.metadata.namespace,
+                timeout=self.build_timeout,
+                stream_logs=self.stream_logs,
+                container="warmer")
+        finally:
+            # Failed warmers are kept for inspection until their TTL expires.
+            if result is None or result.succeeded:
+                self._delete_job(created_job)
+        if not result.succeeded:
+            logging.warning("Warming the Kaniko cache did not succeed: %s", result)
+
+    def _delete_job(self, job):
+        """Deletes a builder Job and its pods."""
+        self.manager.api_instance.delete_namespaced_job(
+            job.metadata.name,
+            job.metadata.namespace,
+            body=client.V1DeleteOptions(propagation_policy='Background'))
 
     def build(self):
         logging.info("Building image using cluster builder.")
@@ -51,18 +212,23 @@ class ClusterBuilder(BaseBuilder):
             dockerfile_path = dockerfile.write_dockerfile(
                 path_prefix=self.preprocessor.path_prefix,
                 base_image=self.base_image,
-                install_reqs_before_copy=install_reqs_before_copy
+                install_reqs_before_copy=install_reqs_before_copy,
+                backend='kaniko',
+                multi_stage=self.multi_stage
             )
         self.preprocessor.output_map[dockerfile_path] = 'Dockerfile'
         context_path, context_hash = self.preprocessor.context_tar_gz()
         self.image_tag = self.full_image_name(context_hash)
+        self.progress.update(executor.UPLOADING_CONTEXT)
         self.context_source.prepare(context_path)
-        labels = {'fairing-builder': 'kaniko'}
+        if self.warm_cache:
+            self.warm_base_images()
+        labels = {constants.FAIRING_BUILDER_LABEL: 'kaniko'}
         labels['fairing-build-id'] = str(uuid.uuid1())
         pod_spec = self.context_source.generate_pod_spec(
             self.image_tag, self.push)
-        for fn in self.pod_spec_mutators:
-            fn(self.manager, pod_spec, self.namespace)
+        self.add_cache_args(pod_spec)
+        run_mutators(self.manager, pod_spec, self.namespace, self.pod_spec_mutators)
 
         pod_spec_template = client.V1PodTemplateSpec(
             metadata=client.V1ObjectMeta(
@@ -78,6 +244,7 @@ class ClusterBuilder(BaseBuilder):
             parallelism=1,
             completions=1,
             backoff_limit=0,
+            ttl_seconds_after_finished=constants.JOB_TTL_SECONDS_AFTER_FINISHED or None,
         )
         build_job = client.V1Job(
             api_version="batch/v1",
@@ -88,26 +255,31 @@ class ClusterBuilder(BaseBuilder):
             ),
             spec=job_spec
         )
-        created_job = client. \
-            BatchV1Api(). \
-            create_namespaced_job(self.namespace, build_job)
-
-        self.manager.log(
-            name=created_job.metadata.name,
-            namespace=created_job.metadata.namespace,
-            selectors=labels,
-            container="kaniko")
-
-        # Invoke upstream clean ups
-        self.context_source.cleanup()
-        # Cleanup build_job if requested by user
-        # Otherwise build_job will be cleaned up by Kubernetes GC
-        if self.cleanup:
-            logging.warning("Cleaning up job {}...".format(created_job.metadata.name))
-            client. \
-                BatchV1Api(). \
-                delete_namespaced_job(
-                    created_job.metadata.name,
-                    created_job.metadata.namespace,
-                    body=client.V1DeleteOptions(propagation_policy='Foreground')
-                )
+        created_job = self.manager.create_job(self.namespace, build_job)
+
+        self.progress.update(executor.BUILDING)
+        self.cache_stats = KanikoCacheStats()
+        try:
+            # The logs are followed for the cache stats even when they are not printed.
+            self.build_result = self.manager.wait_for_job(
+                created_job.metadata.name,
+                created_job.metadata.namespace,
+                timeout=self.build_timeout,
+                stream_logs=self.stream_logs,
+                container="kaniko",
+                line_handler=self.cache_stats)
+        finally:
+            # Invoke upstream clean ups
+            self.context_source.cleanup()
+            # Cleanup build_job if requested by user
+            # Otherwise build_job will be cleaned up by Kubernetes GC once its TTL expired
+            if self.cleanup:
+                logging.warning("Cleaning up job {}...".format(created_job.metadata.name))
+                self._delete_job(created_job)
+        logging.info("Kaniko cache: %s hits, %s misses, %s cached base images",
+                     self.cache_stats.hits, self.cache_stats.misses,
+                     self.cache_stats.base_image_hits)
+        if not self.build_result.succeeded:
+            raise RuntimeError("Image build job {} {}: {}".format(
+                created_job.metadata.name, self.build_result.status,
+                self.build_result.message or self.build_result.reason))
@@ -3,6 +3,7 @@ from kubeflow.fairing.builders.cluster.context_source import ContextSourceInterf
 from kubeflow.fairing.cloud import ibm_cloud
 from kubeflow.fairing import utils
 from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes.manager import KubeManager
 
 class COSContextSource(ContextSourceInterface):
     """
@@ -17,8 +18,9 @@ class COSContextSource(ContextSourceInterface):
         self.cos_endpoint_url = cos_endpoint_url
         self.region = region
         self.namespace = namespace or utils.get_default_target_namespace()
+        self.manager = KubeManager()
         self.aws_access_key_id, self.aws_secret_access_key =\
-            ibm_cloud.get_ibm_cos_credentials(namespace)
+            ibm_cloud.get_ibm_cos_credentials(self.namespace, self.manager)
 
     def prepare(self, context_filename):  # pylint: disable=arguments-differ
         """
@@ -32,11 +34,13 @@ class COSContextSource(ContextSourceInterface):
         """
         cos_uploader = ibm_cloud.COSUploader(
             self.namespace,
-            self.cos_endpoint_url
+            self.cos_endpoint_url,
+            kube_manager=self.manager
         )
 
-        context_hash = utils.crc(context_filename)
-        bucket_name = 'kubeflow-' + context_hash.lower()
+        context_hash = utils.sha256(context_filename)
+        # Bucket names are limited to 63 characters.
+        bucket_name = 'kubeflow-' + context_hash[:32]
         return cos_uploader.upload_to_bucket(blob_name='fairing-builds/' +
                                              context_hash,
                                              bucket_name=bucket_name,
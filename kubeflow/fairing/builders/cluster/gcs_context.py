@@ -24,7 +24,7 @@ class GCSContextSource(ContextSourceInterface):
 
     def upload_context(self, context_filename):
         gcs_uploader = gcp.GCSUploader()
-        context_hash = utils.crc(context_filename)
+        context_hash = utils.sha256(context_filename)
         return gcs_uploader.upload_to_bucket(bucket_name=self.gcp_project,
                                              blob_name='fairing_builds/' + context_hash,
                                              file_to_upload=context_filename)
@@ -35,8 +35,7 @@ class GCSContextSource(ContextSourceInterface):
     def generate_pod_spec(self, image_name, push):  # pylint:disable=arguments-differ
         args = ["--dockerfile=Dockerfile",
                 "--destination=" + image_name,
-                "--context=" + self.uploaded_context_url,
-                "--cache=true"]
+                "--context=" + self.uploaded_context_url]
         if not push:
             args.append("--no-push")
 
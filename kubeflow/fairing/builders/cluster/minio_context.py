@@ -27,7 +27,7 @@ class MinioContextSource(ContextSourceInterface):
                                            self.minio_secret,
                                            self.minio_secret_key,
                                            self.region_name)
-        context_hash = utils.crc(context_filename)
+        context_hash = utils.sha256(context_filename)
         bucket_name = 'kubeflow-' + self.region_name
         return minio_uploader.upload_to_bucket(blob_name='fairing-builds/' +
                                                context_hash,
@@ -33,7 +33,7 @@ class S3ContextSource(ContextSourceInterface):
 
         """
         s3_uploader = aws.S3Uploader(self.region)
-        context_hash = utils.crc(context_filename)
+        context_hash = utils.sha256(context_filename)
         bucket_name = self.bucket_name or 'kubeflow-' + \
             self.aws_account + '-' + self.region
         return s3_uploader.upload_to_bucket(bucket_name=bucket_name,
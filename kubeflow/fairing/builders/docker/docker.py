@@ -1,17 +1,37 @@
 import json
 import logging
+import os
+import re
 
 from docker import APIClient
 
+from kubeflow.fairing import executor
 from kubeflow.fairing.builders.base_builder import BaseBuilder
 from kubeflow.fairing.builders import dockerfile
 from kubeflow.fairing.constants import constants
 
 logger = logging.getLogger(__name__)
 
+# BuildKit plain progress output: "#5 [2/4] RUN pip install ..." starts a step,
+# "#5 DONE 12.3s" or "#5 CACHED" ends it.
+BUILDKIT_STEP = re.compile(r'^#(\d+) \[([^\]]+)\] (.*)$')
+BUILDKIT_STEP_END = re.compile(r'^#(\d+) (?:DONE (\d+(?:\.\d+)?)s|(CACHED))$')
+
 
 class DockerBuilder(BaseBuilder):
-    """A builder using the local Docker client"""
+    """A builder using the local Docker client
+
+    With buildkit, the image is built by the docker CLI with BuildKit. The build
+    uses the inline cache of the image's cache tag in the registry, and pushing
+    moves that tag to the new image. Layers are then reused by builds on other
+    machines, which only pull the layers they need.
+
+    :param buildkit: whether to build with BuildKit (Default value = False)
+    :param cache_from: images whose inline cache BuildKit may use, defaults to
+        <registry>/<image_name>:{constants.DOCKER_BUILDKIT_CACHE_TAG}
+    :param multi_stage: whether the generated Dockerfile installs the requirements
+        in a separate stage (Default value = False)
+    """
 
     def __init__(self,
                  registry=None,
@@ -19,7 +39,10 @@ class DockerBuilder(BaseBuilder):
                  base_image=constants.DEFAULT_BASE_IMAGE,
                  preprocessor=None,
                  push=True,
-                 dockerfile_path=None):
+                 dockerfile_path=None,
+                 buildkit=False,
+                 cache_from=None,
+                 multi_stage=False):
         super().__init__(
             registry=registry,
             image_name=image_name,
@@ -27,6 +50,11 @@ class DockerBuilder(BaseBuilder):
             base_image=base_image,
             preprocessor=preprocessor,
             dockerfile_path=dockerfile_path)
+        self.buildkit = buildkit
+        self.cache_image = self.full_image_name(constants.DOCKER_BUILDKIT_CACHE_TAG)
+        self.cache_from = cache_from if cache_from is not None else [self.cache_image]
+        self._buildkit_steps = {}
+        self.multi_stage = multi_stage
 
     def build(self):
         logging.info("Building image using docker")
@@ -49,11 +77,17 @@ class DockerBuilder(BaseBuilder):
                 docker_command=docker_command,
                 path_prefix=self.preprocessor.path_prefix,
                 base_image=self.base_image,
-                install_reqs_before_copy=install_reqs_before_copy)
+                install_reqs_before_copy=install_reqs_before_copy,
+                backend='buildkit' if self.buildkit else 'docker',
+                multi_stage=self.multi_stage)
         self.preprocessor.output_map[dockerfile_path] = 'Dockerfile'
         context_file, context_hash = self.preprocessor.context_tar_gz()
         self.image_tag = self.full_image_name(context_hash)
         logger.warning('Building docker image {}...'.format(self.image_tag))
+        self.progress.update(executor.BUILDING)
+        if self.buildkit:
+            self._buildkit_build(context_file)
+            return
         with open(context_file, 'rb') as fileobj:
             bld = self.docker_client.build(
                 path='.',
@@ -68,8 +102,58 @@ class DockerBuilder(BaseBuilder):
     def publish(self):
         """push the docker image to the docker registry"""
         logger.warning('Publishing image {}...'.format(self.image_tag))
+        self.progress.update(executor.PUSHING)
         for line in self.docker_client.push(self.image_tag, stream=True):
             self._process_stream(line)
+        if self.buildkit:
+            repository, tag = self.cache_image.rsplit(':', 1)
+            self.docker_client.tag(self.image_tag, repository, tag=tag)
+            for line in self.docker_client.push(repository, tag=tag, stream=True):
+                self._process_stream(line)
+
+    def buildkit_cmd(self):
+        """Argument list of the BuildKit build, which reads the context from stdin"""
+        cmd = ['docker', 'build', '--progress=plain',
+               '--build-arg', 'BUILDKIT_INLINE_CACHE=1',
+               '-t', self.image_tag]
+        for image in self.cache_from:
+            cmd += ['--cache-from', image]
+        cmd.append('-')
+        return cmd
+
+    def _buildkit_build(self, context_file):
+        """build the docker image with BuildKit"""
+        self.step_timings = []
+        self._buildkit_steps = {}
+        with open(context_file, 'rb') as fileobj:
+            build_return = self._run_command(self.buildkit_cmd(), stdin=fileobj,
+                                             on_line=self._time_buildkit_step,
+                                             env=dict(os.environ, DOCKER_BUILDKIT='1'))
+        if build_return != 0:
+            raise Exception('Image build failed with exit code {}'.format(build_return))
+        cached = sum(1 for _, seconds in self.step_timings if seconds == 0)
+        logger.warning('Built docker image {}: {} of {} steps cached'.format(
+            self.image_tag, cached, len(self.step_timings)))
+
+    def _time_buildkit_step(self, line):
+        """Record (step, seconds) in step_timings for each step in BuildKit's output.
+
+        Cached steps take 0 seconds; BuildKit's internal steps are left out.
+
+        :param line: a line of BuildKit plain progress output, None once it ends
+        """
+        if line is None:
+            return
+        match = BUILDKIT_STEP.match(line)
+        if match:
+            if match.group(2) != 'internal':
+                self._buildkit_steps[match.group(1)] = match.group(3)
+            return
+        match = BUILDKIT_STEP_END.match(line)
+        if match and match.group(1) in self._buildkit_steps:
+            step = self._buildkit_steps.pop(match.group(1))
+            seconds = 0.0 if match.group(3) else float(match.group(2))
+            self.step_timings.append((step, seconds))
 
     def _process_stream(self, line):
         """
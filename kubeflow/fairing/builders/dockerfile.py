@@ -1,37 +1,78 @@
 import logging
+import posixpath
 import tempfile
 
 from kubeflow.fairing.constants import constants
 
 logger = logging.getLogger('fairing')
 
+# Whether each builder backend understands `RUN --mount=type=cache`.
+# The classic docker build API, older podman/buildah and kaniko reject it.
+PIP_CACHE_MOUNT_SUPPORT = {
+    'docker': False,
+    'buildkit': True,
+    'podman': False,
+    'kaniko': False,
+}
+
+DEPS_STAGE_NAME = 'fairing-deps'
+WHEELS_DIR = '/tmp/fairing-wheels'
+# Python user base the dependency stage installs into when the wheels cannot be
+# mounted, so that only the installed packages are copied into the image.
+DEPS_USER_BASE = '/opt/fairing-deps'
+PIP_CACHE_DIR = '/root/.cache/pip'
+
+
 # TODO(@karthikv2k): Need to be refractored into a better template
-def write_dockerfile(
+def write_dockerfile( #pylint:disable=too-many-arguments
         docker_command=None,
         destination=None,
         path_prefix=constants.DEFAULT_DEST_PREFIX,
         base_image=None,
-        install_reqs_before_copy=False):
+        install_reqs_before_copy=False,
+        backend=None,
+        pip_cache_mount=None,
+        multi_stage=False):
     """Generate dockerfile accoding to the parameters
 
+    The dependency manifest is copied and installed before the application code,
+    so that code changes do not invalidate the dependency layer.
+
     :param docker_command: string, CMD of the dockerfile (Default value = None)
     :param destination: string, destination folder for this dockerfile (Default value = None)
     :param path_prefix: string, WORKDIR (Default value = constants.DEFAULT_DEST_PREFIX)
     :param base_image: string, base image, example: gcr.io/kubeflow-image
     :param install_reqs_before_copy: whether to install the prerequisites (Default value = False)
+    :param backend: builder backend the dockerfile is for: docker, buildkit, podman or kaniko
+    :param pip_cache_mount: whether to install with a pip cache mount, defaults to what
+        the backend supports
+    :param multi_stage: whether to install the requirements in a separate stage so that
+        build-time dependencies and wheels do not end up in the image. Backends with
+        cache mounts mount the wheels built by that stage, others copy the installed
+        packages from it (Default value = False)
 
     """
     if not destination:
         _, destination = tempfile.mkstemp(prefix="/tmp/fairing_dockerfile_")
-    content_lines = ["FROM {}".format(base_image),
-                     "WORKDIR {PATH_PREFIX}".format(PATH_PREFIX=path_prefix),
-                     "ENV FAIRING_RUNTIME 1"]
-    copy_context = "COPY {} {}".format(path_prefix, path_prefix)
-    content_lines.append(copy_context)
-    if install_reqs_before_copy:
-        content_lines.append("COPY {}/requirements.txt {}".format(path_prefix, path_prefix))
-    content_lines.append("RUN if [ -e requirements.txt ];" +
-                         "then pip install --no-cache -r requirements.txt; fi")
+    if pip_cache_mount is None:
+        pip_cache_mount = PIP_CACHE_MOUNT_SUPPORT.get(backend, False)
+    requirements = posixpath.join(path_prefix, "requirements.txt")
+    content_lines = []
+    if pip_cache_mount:
+        content_lines.append("# syntax=docker/dockerfile:1")
+    multi_stage = multi_stage and install_reqs_before_copy
+    if multi_stage:
+        content_lines += _deps_stage_lines(base_image, path_prefix, requirements,
+                                           pip_cache_mount)
+    content_lines += ["FROM {}".format(base_image),
+                      "WORKDIR {PATH_PREFIX}".format(PATH_PREFIX=path_prefix),
+                      "ENV FAIRING_RUNTIME 1"]
+    if multi_stage:
+        content_lines += _deps_copy_lines(path_prefix, requirements, pip_cache_mount)
+    else:
+        content_lines += _install_lines(path_prefix, requirements, install_reqs_before_copy,
+                                        pip_cache_mount)
+    content_lines.append("COPY {PATH_PREFIX} {PATH_PREFIX}".format(PATH_PREFIX=path_prefix))
 
     if docker_command:
         content_lines.append("CMD {}".format(" ".join(docker_command)))
@@ -40,3 +81,52 @@ def write_dockerfile(
     with open(destination, 'w') as f:
         f.write(content)
     return destination
+
+
+def _deps_stage_lines(base_image, path_prefix, requirements, pip_cache_mount):
+    """Stage building the wheels of the requirements, or installing them apart."""
+    lines = ["FROM {} AS {}".format(base_image, DEPS_STAGE_NAME),
+             "WORKDIR {}".format(path_prefix),
+             "COPY {} {}".format(requirements, path_prefix)]
+    if pip_cache_mount:
+        lines.append(_run_pip("pip wheel --wheel-dir {} -r requirements.txt"
+                              .format(WHEELS_DIR), True))
+    else:
+        lines += ["ENV PYTHONUSERBASE {}".format(DEPS_USER_BASE),
+                  "RUN pip install --user --no-cache -r requirements.txt"]
+    return lines
+
+
+def _deps_copy_lines(path_prefix, requirements, pip_cache_mount):
+    """Lines of the final stage taking the requirements from the dependency stage."""
+    if not pip_cache_mount:
+        # Copying the wheels in and removing them in a later RUN would keep them in a layer.
+        return ["ENV PYTHONUSERBASE {}".format(DEPS_USER_BASE),
+                "ENV PATH {}/bin:$PATH".format(DEPS_USER_BASE),
+                "COPY --from={STAGE} {USER_BASE} {USER_BASE}".format(
+                    STAGE=DEPS_STAGE_NAME, USER_BASE=DEPS_USER_BASE)]
+    return ["COPY {} {}".format(requirements, path_prefix),
+            "RUN --mount=type=bind,from={STAGE},source={WHEELS},target={WHEELS} "
+            "pip install --no-cache --no-index --find-links {WHEELS} -r requirements.txt"
+            .format(STAGE=DEPS_STAGE_NAME, WHEELS=WHEELS_DIR)]
+
+
+def _install_lines(path_prefix, requirements, install_reqs_before_copy, pip_cache_mount):
+    """Lines installing the requirements in the image itself."""
+    lines = []
+    if install_reqs_before_copy:
+        lines.append("COPY {} {}".format(requirements, path_prefix))
+    if pip_cache_mount:
+        lines.append(_run_pip("if [ -e requirements.txt ];" +
+                              "then pip install -r requirements.txt; fi", True))
+    else:
+        lines.append("RUN if [ -e requirements.txt ];" +
+                     "then pip install --no-cache -r requirements.txt; fi")
+    return lines
+
+
+def _run_pip(command, pip_cache_mount):
+    """RUN line for a pip command, sharing pip's cache across builds if possible."""
+    if pip_cache_mount:
+        return "RUN --mount=type=cache,target={} {}".format(PIP_CACHE_DIR, command)
+    return "RUN {}".format(command)
@@ -1,7 +1,9 @@
 import logging
-import os
+import re
+from timeit import default_timer as timer
 #from podman import Client
 
+from kubeflow.fairing import executor
 from kubeflow.fairing.builders.base_builder import BaseBuilder
 from kubeflow.fairing.builders import dockerfile
 from kubeflow.fairing.constants import constants
@@ -9,7 +11,11 @@ from kubeflow.fairing.constants import constants
 logger = logging.getLogger(__name__)
 
 
-class PodmanBuilder(BaseBuilder):
+# Podman prints "STEP 2: RUN ..." (or "STEP 2/5: RUN ...") when a build step starts.
+PODMAN_STEP = re.compile(r'^STEP (\d+)(?:/\d+)?: (.*)$')
+
+
+class PodmanBuilder(BaseBuilder):  #pylint:disable=too-many-instance-attributes
     """A builder using the local Podman"""
 
     def __init__(self,
@@ -19,7 +25,10 @@ class PodmanBuilder(BaseBuilder):
                  preprocessor=None,
                  push=True,
                  dockerfile_path=None,
-                 tls_verify=False):
+                 tls_verify=False,
+                 layers=True,
+                 jobs=None,
+                 multi_stage=False):
         """
         Initiate a Podman builder to build and publish images
 
@@ -30,6 +39,11 @@ class PodmanBuilder(BaseBuilder):
         :param push:  whether to publish image to registry
         :param dockerfile_path:  specify the dockerfile path for image built
         :param tls_verify:  when publishing image, whether to skip tls verify
+        :param layers:  whether to cache intermediate layers between builds
+        :param jobs:  how many stages of a multi-stage build to run in parallel,
+            podman's default if None
+        :param multi_stage:  whether the generated Dockerfile installs the requirements
+            in a separate stage
         """
         super().__init__(
             registry=registry,
@@ -39,6 +53,11 @@ class PodmanBuilder(BaseBuilder):
             preprocessor=preprocessor,
             dockerfile_path=dockerfile_path)
         self.tls_verify = tls_verify
+        self.layers = layers
+        self.jobs = jobs
+        self.multi_stage = multi_stage
+        self.context_file = None
+        self._current_step = None
 
     def build(self):
         logging.info("Building image using podman")
@@ -53,15 +72,20 @@ class PodmanBuilder(BaseBuilder):
 
         see https://github.com/containers/libpod/blob/master/docs/source/markdown/podman-build.1.md
         """
-        logger.warning('Building podman image {}...'.format(self.image_tag))
-
         #TBD @mochiliu3000 Due to this issue, instead of using 'podman_client.images.build',
         #call command line to build: https://github.com/containers/python-podman/issues/51
 
         cmd_build = self.gen_cmd(option='build')
-        build_return = os.system(cmd_build)
+        logger.warning('Building podman image {}...'.format(self.image_tag))
+        self.progress.update(executor.BUILDING)
+        self.step_timings = []
+        self._current_step = None
+        with open(self.context_file, 'rb') as context:
+            build_return = self._run_command(cmd_build, stdin=context, on_line=self._time_step)
         if build_return != 0:
-            raise Exception('Image build failed')
+            raise Exception('Image build failed with exit code {}'.format(build_return))
+        logger.warning('Built podman image {} in {} steps'.format(
+            self.image_tag, len(self.step_timings)))
 
     def publish(self):
         """
@@ -70,20 +94,40 @@ class PodmanBuilder(BaseBuilder):
         see https://github.com/containers/libpod/blob/master/docs/source/markdown/podman-push.1.md
         """
         logger.warning('Publishing image {}...'.format(self.image_tag))
+        self.progress.update(executor.PUSHING)
 
         #TBD @mochiliu3000 Due to this issue, instead of using 'podman_client.image.push',
         #call command line to push: https://github.com/containers/python-podman/issues/77
 
         cmd_push = self.gen_cmd(option='publish')
-        push_return = os.system(cmd_push)
+        start = timer()
+        push_return = self._run_command(cmd_push)
         if push_return != 0:
-            raise Exception('Image push failed')
+            raise Exception('Image push failed with exit code {}'.format(push_return))
+        logger.warning('Pushed image {} in {:.1f}s.'.format(self.image_tag, timer() - start))
+
+    def _time_step(self, line):
+        """Record (step, seconds) in step_timings for each build step in podman's output.
+
+        :param line: a line of podman build output, None once the output ends
+        """
+        now = timer()
+        match = PODMAN_STEP.match(line) if line is not None else None
+        if line is not None and not match:
+            return
+        if self._current_step is not None:
+            step, started = self._current_step
+            self.step_timings.append((step, now - started))
+            self._current_step = None
+        if match:
+            self._current_step = (match.group(2), now)
 
     def gen_cmd(self, option):
         """
         generate podman cmd for builder and publisher
 
         :param option:  options for which cmd to generate, 'build' or 'publish'
+        :returns: argument list of the command; the build reads the context from stdin
         """
         if option == 'build':
             docker_command = self.preprocessor.get_command()
@@ -98,14 +142,19 @@ class PodmanBuilder(BaseBuilder):
                     docker_command=docker_command,
                     path_prefix=self.preprocessor.path_prefix,
                     base_image=self.base_image,
-                    install_reqs_before_copy=install_reqs_before_copy)
+                    install_reqs_before_copy=install_reqs_before_copy,
+                    backend='podman',
+                    multi_stage=self.multi_stage)
             self.preprocessor.output_map[dockerfile_path] = 'Dockerfile'
             self.context_file, context_hash = self.preprocessor.context_tar_gz()
             self.image_tag = self.full_image_name(context_hash)
-            cmd = 'podman build -t {} - < {}'.format(self.image_tag, self.context_file)
+            cmd = ['podman', 'build', '--layers={}'.format(str(self.layers).lower())]
+            if self.jobs is not None:
+                cmd.append('--jobs={}'.format(self.jobs))
+            cmd += ['-t', self.image_tag, '-']
         elif option == 'publish':
-            cmd = 'podman push {} --tls-verify={}' \
-                .format(self.image_tag, str(self.tls_verify).lower())
+            cmd = ['podman', 'push', self.image_tag,
+                   '--tls-verify={}'.format(str(self.tls_verify).lower())]
         else:
             raise Exception('Generate command failed with option - ' + option)
         return cmd
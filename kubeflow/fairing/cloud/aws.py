@@ -1,6 +1,7 @@
 import boto3
 import logging
 import re
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from kubernetes import client
 
@@ -18,7 +19,10 @@ class S3Uploader(object):
                          blob_name,
                          bucket_name,
                          file_to_upload):
-        """Upload a file to an S3 bucket
+        """Upload a file to an S3 bucket, unless the object already exists.
+
+        Object names are expected to be derived from the content hash, so an existing
+        object holds the same content. Large files use parallel multipart uploads.
 
         :param blob_name: S3 object name
         :param bucket_name: Bucket to upload to
@@ -26,9 +30,23 @@ class S3Uploader(object):
 
         """
         self.create_bucket_if_not_exists(bucket_name)
-        self.storage_client.upload_file(file_to_upload, bucket_name, blob_name)
+        if self.object_exists(bucket_name, blob_name):
+            logger.info("s3://{}/{} already exists, skipping upload".format(
+                bucket_name, blob_name))
+        else:
+            self.storage_client.upload_file(file_to_upload, bucket_name, blob_name,
+                                            Config=upload_transfer_config())
         return "s3://{}/{}".format(bucket_name, blob_name)
 
+    def object_exists(self, bucket_name, blob_name):
+        """Check whether an object exists in an S3 bucket
+
+        :param bucket_name: Bucket name
+        :param blob_name: S3 object name
+
+        """
+        return object_exists(self.storage_client, bucket_name, blob_name)
+
     def create_bucket_if_not_exists(self, bucket_name):
         """Create bucket if this bucket not exists
 
@@ -44,6 +62,37 @@ class S3Uploader(object):
             self.storage_client.create_bucket(**bucket)
 
 
+def object_exists(storage_client, bucket_name, blob_name, client_error=ClientError):
+    """Check whether an object exists using an S3 compatible client
+
+    :param storage_client: boto3 S3 client
+    :param bucket_name: Bucket name
+    :param blob_name: Object name
+    :param client_error: ClientError class raised by the client, for clients of
+        botocore forks such as ibm_boto3 (Default value = botocore's ClientError)
+
+    """
+    try:
+        storage_client.head_object(Bucket=bucket_name, Key=blob_name)
+        return True
+    except client_error as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+
+
+def upload_transfer_config(transfer_config_class=TransferConfig):
+    """Transfer config for parallel multipart uploads of build contexts
+
+    :param transfer_config_class: TransferConfig class of the S3 client library
+
+    """
+    return transfer_config_class(
+        multipart_threshold=constants.CONTEXT_UPLOAD_PART_SIZE,
+        multipart_chunksize=constants.CONTEXT_UPLOAD_PART_SIZE,
+        max_concurrency=constants.CONTEXT_UPLOAD_CONCURRENCY)
+
+
 def guess_account_id():
     """ Get account id """
     account_id = boto3.client('sts').get_caller_identity()["Account"]
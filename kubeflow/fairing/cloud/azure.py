@@ -1,28 +1,33 @@
 import logging
 import base64
+import hashlib
+import posixpath
 import tarfile
-from pathlib import Path
-from shutil import rmtree
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
 
+from azure.common import AzureMissingResourceHttpError
 from azure.common.credentials import ServicePrincipalCredentials
 from azure.mgmt.storage import StorageManagementClient
 from azure.mgmt.storage.models import StorageAccountCreateParameters
 from azure.mgmt.storage.models import Sku
 from azure.mgmt.storage.models import SkuName
 from azure.mgmt.storage.models import Kind
-from azure.storage.file import FileService
+from azure.storage.file import ContentSettings, FileService
 from kubernetes import client
 
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.kubernetes.manager import KubeManager
+from kubeflow.fairing.kubernetes.mutators import pod_spec_dependent
 
 logger = logging.getLogger(__name__)
 
 # Helper class to upload files to Azure Files
 class AzureFileUploader(object):
-    def __init__(self, namespace, credentials=None, subscription_id=None):
+    def __init__(self, namespace, credentials=None, subscription_id=None, kube_manager=None):
         if not credentials or not subscription_id:
-            credentials, subscription_id = get_azure_credentials(namespace)
+            credentials, subscription_id = get_azure_credentials(namespace, kube_manager)
         self.storage_client = StorageManagementClient(credentials, subscription_id)
 
     # Upload the files and dirs in a tar.gz file to a dir in a shared folder in Azure Files
@@ -45,8 +50,18 @@ class AzureFileUploader(object):
         )
         share_service = FileService(account_name=storage_account_name, account_key=storage_key)
         self.create_share_if_not_exists(share_service, share_name)
-        share_service.create_directory(share_name, dir_name)
-        self.upload_tar_gz_contents(share_service, share_name, dir_name, tar_gz_file_to_upload)
+        # Directory names are derived from the content hash and the marker is only
+        # written once all the files are uploaded, so a complete directory holds
+        # the same context. An incomplete one is resumed, skipping the files that
+        # were already uploaded.
+        if share_service.exists(share_name, dir_name,
+                                constants.AZURE_FILES_UPLOAD_COMPLETE_MARKER):
+            logging.info("'{}' is already uploaded, skipping upload".format(dir_name))
+        else:
+            self.upload_tar_gz_contents(share_service, share_name, dir_name,
+                                        tar_gz_file_to_upload)
+            share_service.create_file_from_text(
+                share_name, dir_name, constants.AZURE_FILES_UPLOAD_COMPLETE_MARKER, '')
 
         return storage_account_name, storage_key
 
@@ -97,42 +112,89 @@ class AzureFileUploader(object):
         if share is None:
             share_service.create_share(share_name)
 
+    # Upload the members of a tar.gz file to a dir in a shared folder, streaming them
+    # from the archive instead of extracting it to disk. Directories are created one
+    # depth level at a time and files are uploaded with bounded concurrency.
     def upload_tar_gz_contents(self, share_service, share_name, dir_name, tar_gz_file):
-        local_dir = Path('{}_contents'.format(tar_gz_file))
-        cloud_dir = Path(dir_name)
-        self.uncompress_tar_gz_file(tar_gz_file, local_dir)
-
-        for path in local_dir.glob('**/*'):
-            local_path = Path(path)
-            cloud_relative_path = cloud_dir / path.relative_to(local_dir)
-
-            if local_path.is_dir():
-                share_service.create_directory(share_name, cloud_relative_path)
-            else:
-                share_service.create_file_from_path(
-                    share_name, cloud_relative_path.parents[0],
-                    cloud_relative_path.name, local_path
-                )
-
-        self.delete_uncompressed_files(local_dir)
-
-    def uncompress_tar_gz_file(self, tar_gz_file, target_dir):
-        tar = tarfile.open(tar_gz_file, 'r:gz')
-        tar.extractall(path=target_dir)
-        tar.close()
-
-    def delete_uncompressed_files(self, target_dir):
-        rmtree(target_dir)
+        cloud_dir = PurePosixPath(dir_name)
+        with tarfile.open(tar_gz_file, 'r:gz') as tar:
+            members = []
+            dirs = {cloud_dir}
+            for member in tar:
+                path = PurePosixPath(posixpath.normpath(member.name))
+                if path.is_absolute() or '..' in path.parts or path == PurePosixPath('.'):
+                    continue
+                members.append((member, cloud_dir / path))
+                dirs.update(cloud_dir / parent for parent in path.parents)
+                if member.isdir():
+                    dirs.add(cloud_dir / path)
+            new_dirs = self.create_directories(share_service, share_name, dirs)
+
+            # Bounds the number of file contents held in memory at once.
+            pending = threading.BoundedSemaphore(2 * constants.AZURE_FILES_UPLOAD_CONCURRENCY)
+            with ThreadPoolExecutor(constants.AZURE_FILES_UPLOAD_CONCURRENCY) as executor:
+                futures = []
+                for member, path in members:
+                    if member.isdir():
+                        continue
+                    fileobj = tar.extractfile(member)
+                    if fileobj is None:
+                        continue
+                    content = fileobj.read()
+                    pending.acquire()
+                    future = executor.submit(self.upload_file, share_service, share_name,
+                                             path, content,
+                                             check_existing=path.parent not in new_dirs)
+                    future.add_done_callback(lambda _: pending.release())
+                    futures.append(future)
+                uploaded = sum(future.result() for future in futures)
+        logging.info("Uploaded {} files, skipped {} unchanged files".format(
+            uploaded, len(futures) - uploaded))
+
+    # Create directories in batches, parents before children. Returns the directories
+    # that did not exist before.
+    def create_directories(self, share_service, share_name, dirs):
+        created = set()
+        levels = {}
+        for path in dirs:
+            levels.setdefault(len(path.parts), []).append(path)
+        with ThreadPoolExecutor(constants.AZURE_FILES_UPLOAD_CONCURRENCY) as executor:
+            for depth in sorted(levels):
+                batch = levels[depth]
+                for path, is_new in zip(batch, executor.map(
+                        lambda path: share_service.create_directory(share_name, str(path)),
+                        batch)):
+                    if is_new:
+                        created.add(path)
+        return created
+
+    # Upload a file unless the share already has it with the same size and MD5.
+    # Returns whether the file was uploaded.
+    def upload_file(self, share_service, share_name, path, content, check_existing=True):
+        content_md5 = base64.b64encode(hashlib.md5(content).digest()).decode('utf-8')
+        if check_existing:
+            try:
+                properties = share_service.get_file_properties(
+                    share_name, str(path.parent), path.name).properties
+                if properties.content_length == len(content) and \
+                        properties.content_settings.content_md5 == content_md5:
+                    return False
+            except AzureMissingResourceHttpError:
+                pass
+        share_service.create_file_from_bytes(
+            share_name, str(path.parent), path.name, content,
+            content_settings=ContentSettings(content_md5=content_md5))
+        return True
 
 # Get credentials for a service principal which has permissions to
 # create or access the storage account for Azure Files
-def get_azure_credentials(namespace):
+def get_azure_credentials(namespace, kube_manager=None):
+    kube_manager = kube_manager or KubeManager()
     secret_name = constants.AZURE_CREDS_SECRET_NAME
-    if not KubeManager().secret_exists(secret_name, namespace):
+    if not kube_manager.secret_exists(secret_name, namespace):
         raise Exception("Secret '{}' not found in namespace '{}'".format(secret_name, namespace))
 
-    v1 = client.CoreV1Api()
-    secret = v1.read_namespaced_secret(secret_name, namespace)
+    secret = kube_manager.api_v1.read_namespaced_secret(secret_name, namespace)
     sp_credentials = ServicePrincipalCredentials(
         client_id=get_plain_secret_value(secret.data, 'AZ_CLIENT_ID'),
         secret=get_plain_secret_value(secret.data, 'AZ_CLIENT_SECRET'),
@@ -148,9 +210,14 @@ def get_plain_secret_value(secret_data, key):
     secret_base64 = secret_data[key]
     return base64.b64decode(secret_base64).decode('utf-8')
 
+# Name of the secret with the storage account credentials for a build context
+def storage_creds_secret_name(context_hash):
+    return constants.AZURE_STORAGE_CREDS_SECRET_NAME_PREFIX + context_hash.lower()
+
 # Create a secret with the credentials to access the storage account for Azure Files
-def create_storage_creds_secret(namespace, context_hash, storage_account_name, storage_key):
-    secret_name = constants.AZURE_STORAGE_CREDS_SECRET_NAME_PREFIX + context_hash.lower()
+def create_storage_creds_secret(namespace, context_hash, storage_account_name, storage_key,
+                                kube_manager=None):
+    secret_name = storage_creds_secret_name(context_hash)
     logging.info(
         "Creating secret '{}' in namespace '{}'"
         .format(secret_name, namespace)
@@ -161,18 +228,17 @@ def create_storage_creds_secret(namespace, context_hash, storage_account_name, s
             'azurestorageaccountname': storage_account_name,
             'azurestorageaccountkey': storage_key
         })
-    v1 = client.CoreV1Api()
-    v1.create_namespaced_secret(namespace, secret)
+    (kube_manager or KubeManager()).api_v1.create_namespaced_secret(namespace, secret)
 
 # Delete the secret with the credentials to access the storage account for Azure Files
-def delete_storage_creds_secret(namespace, context_hash):
-    secret_name = constants.AZURE_STORAGE_CREDS_SECRET_NAME_PREFIX + context_hash.lower()
+def delete_storage_creds_secret(namespace, context_hash, kube_manager=None):
+    secret_name = storage_creds_secret_name(context_hash)
     logging.info(
         "Deleting secret '{}' from namespace '{}'"
         .format(secret_name, namespace)
     )
-    v1 = client.CoreV1Api()
-    v1.delete_namespaced_secret(secret_name, namespace, body=None)
+    (kube_manager or KubeManager()).api_v1.delete_namespaced_secret(secret_name, namespace,
+                                                                    body=None)
 
 # Verify that we are working with an Azure Container Registry
 def is_acr_registry(registry):
@@ -203,10 +269,35 @@ def add_acr_config(kube_manager, pod_spec, namespace):
     else:
         pod_spec.volumes = [volume]
 
-# Mount Azure Files shared folder so the pod can access its files with a local path
+# Pod spec mutator mounting the Azure Files shared folder of the context source's
+# current build context, see add_azure_files_for_context
+def get_azure_files_mutator(context_source):
+    @pod_spec_dependent
+    def mutator(kube_manager, pod_spec, namespace):
+        add_azure_files_for_context(kube_manager, pod_spec, namespace,
+                                    context_source.context_hash)
+    return mutator
+
+# Mount Azure Files shared folder so the pod can access its files with a local path.
+# The build context is the one the Kaniko container's --context argument points to,
+# as set by StorageContextSource.generate_pod_spec.
+@pod_spec_dependent
 def add_azure_files(kube_manager, pod_spec, namespace):
-    context_hash = pod_spec.containers[0].args[1].split(':')[-1]
-    secret_name = constants.AZURE_STORAGE_CREDS_SECRET_NAME_PREFIX + context_hash.lower()
+    context_hash = None
+    for arg in pod_spec.containers[0].args or []:
+        if arg.startswith('--context='):
+            dir_name = PurePosixPath(arg[len('--context='):]).name
+            if dir_name.startswith('build_'):
+                context_hash = dir_name[len('build_'):]
+    if context_hash is None:
+        raise ValueError("The pod spec has no Azure Files build context to mount")
+    add_azure_files_for_context(kube_manager, pod_spec, namespace, context_hash)
+
+# Mount Azure Files shared folder so the pod can access its files with a local path.
+# context_hash is the hash the storage credentials secret was created for
+# (StorageContextSource.context_hash).
+def add_azure_files_for_context(kube_manager, pod_spec, namespace, context_hash):
+    secret_name = storage_creds_secret_name(context_hash)
     if not kube_manager.secret_exists(secret_name, namespace):
         raise Exception("Secret '{}' not found in namespace '{}'".format(secret_name, namespace))
 
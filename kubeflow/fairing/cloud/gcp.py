@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import google.auth
 from google.cloud import storage
 from google.cloud.exceptions import NotFound
@@ -21,11 +23,60 @@ class GCSUploader(object):
                          blob_name,
                          bucket_name,
                          file_to_upload):
+        """Upload a file to a GCS bucket, unless the blob already exists.
+
+        Blob names are expected to be derived from the content hash, so an existing
+        blob holds the same content. Files larger than CONTEXT_UPLOAD_PART_SIZE are
+        uploaded as parallel parts that are then composed into the blob.
+
+        :param blob_name: GCS object name
+        :param bucket_name: Bucket to upload to
+        :param file_to_upload: File to upload
+
+        """
         bucket = self.get_or_create_bucket(bucket_name)
         blob = bucket.blob(blob_name)
-        blob.upload_from_filename(file_to_upload)
+        if blob.exists():
+            logger.info("gs://{}/{} already exists, skipping upload".format(
+                bucket_name, blob_name))
+        elif os.path.getsize(file_to_upload) > constants.CONTEXT_UPLOAD_PART_SIZE:
+            self.composite_upload(bucket, blob, file_to_upload)
+        else:
+            blob.upload_from_filename(file_to_upload)
         return "gs://{}/{}".format(bucket_name, blob_name)
 
+    def composite_upload(self, bucket, blob, file_to_upload):
+        """Upload a file as parts in parallel and compose them into blob.
+
+        :param bucket: Bucket to upload to
+        :param blob: Blob to compose
+        :param file_to_upload: File to upload
+
+        """
+        size = os.path.getsize(file_to_upload)
+        # A single compose request accepts at most 32 source objects.
+        part_size = max(constants.CONTEXT_UPLOAD_PART_SIZE, -(-size // 32))
+        offsets = range(0, size, part_size)
+        parts = [bucket.blob('{}.part-{}'.format(blob.name, i)) for i in range(len(offsets))]
+
+        def upload_part(part, offset):
+            with open(file_to_upload, 'rb') as f:
+                f.seek(offset)
+                part.upload_from_file(f, size=min(part_size, size - offset))
+
+        try:
+            with ThreadPoolExecutor(constants.CONTEXT_UPLOAD_CONCURRENCY) as executor:
+                for future in [executor.submit(upload_part, part, offset)
+                               for part, offset in zip(parts, offsets)]:
+                    future.result()
+            blob.compose(parts)
+        finally:
+            for part in parts:
+                try:
+                    part.delete()
+                except NotFound:
+                    pass
+
     def get_or_create_bucket(self, bucket_name):
         try:
             bucket = self.storage_client.get_bucket(bucket_name)
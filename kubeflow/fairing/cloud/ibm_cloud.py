@@ -1,9 +1,10 @@
 import json
 import base64
 import ibm_boto3
+from ibm_boto3.s3.transfer import TransferConfig
 from ibm_botocore.exceptions import ClientError
-from kubernetes import client
 
+from kubeflow.fairing.cloud import aws
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.kubernetes.manager import KubeManager
 from kubeflow.fairing import utils
@@ -14,12 +15,14 @@ class COSUploader(object):
 
     :param namespace(str): namespace that IBM COS credential secret created in.
     :param cos_endpoint_url(str): IBM COS endpoint url, such as "https://s3..."
+    :param kube_manager: KubeManager reading the secret, a new one if None.
     """
     def __init__(self, namespace=None,
-                 cos_endpoint_url=constants.IBM_COS_DEFAULT_ENDPOINT):
+                 cos_endpoint_url=constants.IBM_COS_DEFAULT_ENDPOINT, kube_manager=None):
         self.namespace = namespace or utils.get_default_target_namespace()
 
-        aws_access_key_id, aws_secret_accesss_key = get_ibm_cos_credentials(self.namespace)
+        aws_access_key_id, aws_secret_accesss_key = get_ibm_cos_credentials(self.namespace,
+                                                                            kube_manager)
 
         self.client = ibm_boto3.client(
             "s3",
@@ -39,30 +42,47 @@ class COSUploader(object):
         except ClientError:
             self.client.create_bucket(Bucket=bucket_name)
 
+    def object_exists(self, bucket_name, blob_name):
+        """
+        Check whether an object exists in IBM Cloud Object Storage.
+
+        :param bucket_name(str): Bucket name.
+        :param blob_name(str): Object name.
+        """
+        return aws.object_exists(self.client, bucket_name, blob_name, client_error=ClientError)
+
     def upload_to_bucket(self, blob_name, bucket_name, file_to_upload):
         """
-        Uploaded file to IBM Cloud Object Storage.
+        Uploaded file to IBM Cloud Object Storage, unless the object already exists.
+        Large files use parallel multipart uploads.
 
         :param bucket_name(str): The path to the file to upload.
         :param bucket_name(str): The name of the bucket to upload to.
         :param bucket_name(str): The name of the key to upload to.
         """
         self.create_bucket(bucket_name)
-        self.client.upload_file(file_to_upload, bucket_name, blob_name)
+        if not self.object_exists(bucket_name, blob_name):
+            self.client.upload_file(file_to_upload, bucket_name, blob_name,
+                                    Config=TransferConfig(
+                                        multipart_threshold=constants.CONTEXT_UPLOAD_PART_SIZE,
+                                        multipart_chunksize=constants.CONTEXT_UPLOAD_PART_SIZE,
+                                        max_concurrency=constants.CONTEXT_UPLOAD_CONCURRENCY))
         return "s3://{}/{}".format(bucket_name, blob_name)
 
 
-def get_ibm_cos_credentials(namespace):
+def get_ibm_cos_credentials(namespace, kube_manager=None):
     """
     Get the IBM COS credential from secret.
 
     :param namespace(str): The namespace that IBM COS credential secret created in.
+    :param kube_manager: KubeManager reading the secret, a new one if None.
     """
+    kube_manager = kube_manager or KubeManager()
     secret_name = constants.IBM_COS_CREDS_SECRET_NAME
-    if not KubeManager().secret_exists(secret_name, namespace):
+    if not kube_manager.secret_exists(secret_name, namespace):
         raise Exception("Secret '{}' not found in namespace '{}'".format(secret_name, namespace))
 
-    secret = client.CoreV1Api().read_namespaced_secret(secret_name, namespace)
+    secret = kube_manager.api_v1.read_namespaced_secret(secret_name, namespace)
     creds_data = secret.data[constants.IBM_COS_CREDS_FILE_NAME]
     creds_json = base64.b64decode(creds_data).decode('utf-8')
 
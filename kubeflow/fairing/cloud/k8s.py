@@ -2,6 +2,8 @@ import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
 
+from kubeflow.fairing.cloud import aws
+
 
 class MinioUploader(object):
     def __init__(self, endpoint_url, minio_secret, minio_secret_key,
@@ -24,5 +26,7 @@ class MinioUploader(object):
 
     def upload_to_bucket(self, blob_name, bucket_name, file_to_upload):
         self.create_bucket(bucket_name)
-        self.client.upload_file(file_to_upload, bucket_name, blob_name)
+        if not aws.object_exists(self.client, bucket_name, blob_name):
+            self.client.upload_file(file_to_upload, bucket_name, blob_name,
+                                    Config=aws.upload_transfer_config())
         return "s3://{}/{}".format(bucket_name, blob_name)
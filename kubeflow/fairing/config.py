@@ -17,8 +17,10 @@ from kubeflow.fairing.deployers.kfserving.kfserving import KFServing
 
 from kubeflow.fairing.notebook import notebook_util
 
+from kubeflow.fairing import executor
 from kubeflow.fairing.constants import constants
 
+import copy
 import logging
 
 logging.basicConfig(
@@ -128,8 +130,12 @@ class Config(object):
                 self._deployer_name, list(deployer_map.keys())))
         return fn(**self._deployer_kwargs)
 
-    def run(self):
-        """ run the pipeline for job"""
+    def run(self, progress=None):
+        """ run the pipeline for job
+
+        :param progress: executor.Progress to report the stages of the run to (Default value = None)
+
+        """
         preprocessor = self.get_preprocessor()
         logging.info("Using preprocessor: %s", preprocessor)
         builder = self.get_builder(preprocessor)
@@ -137,12 +143,30 @@ class Config(object):
         deployer = self.get_deployer()
         logging.info("Using deployer: %s", deployer)
 
+        if progress is not None:
+            builder.progress = progress
         builder.build()
         pod_spec = builder.generate_pod_spec()
+        if progress is not None:
+            progress.update(executor.DEPLOYING)
         deployer.deploy(pod_spec)
 
         return preprocessor, builder, deployer
 
+    def run_async(self):
+        """ run the pipeline for job on the shared background executor
+
+        The run uses a copy of the current configuration, so the configuration can be
+        changed for the next run once this returns.
+
+        :returns: a concurrent.futures.Future of (preprocessor, builder, deployer), its
+            `progress` attribute tells which stage the run is in
+
+        """
+        progress = executor.Progress()
+        snapshot = copy.copy(self)
+        return executor.submit(lambda: snapshot.run(progress=progress), progress=progress)
+
     def deploy(self, pod_spec):
         """deploy the job
 
@@ -28,15 +28,95 @@ AZURE_ACR_CREDS_SECRET_NAME = 'acrcreds'
 # by using Azure credentials to get those storage credentials.
 AZURE_STORAGE_CREDS_SECRET_NAME_PREFIX = 'storage-credentials-'
 AZURE_FILES_SHARED_FOLDER = 'fairing-builds'
+AZURE_FILES_UPLOAD_COMPLETE_MARKER = '.fairing-upload-complete'
+AZURE_FILES_UPLOAD_CONCURRENCY = 16
 
 DEFAULT_USER_AGENT = 'kubeflow-fairing/{VERSION}'
 
+# Number of builds and submissions run concurrently by build_async/submit_async.
+ASYNC_MAX_WORKERS = int(os.environ.get('FAIRING_ASYNC_MAX_WORKERS', 4))
+
+# Bulk submission constants
+# Client-side rate limit of bulk submissions, and retries of calls the API server throttles.
+BULK_SUBMIT_QPS = 20
+BULK_SUBMIT_BURST = 40
+BULK_SUBMIT_MAX_WORKERS = 16
+BULK_SUBMIT_MAX_RETRIES = 5
+BULK_SUBMIT_MAX_BACKOFF_SECONDS = 30
+
 # Job Constants
 JOB_DEFAULT_NAME = 'fairing-job-'
 JOB_DEPLOPYER_TYPE = 'job'
+JOB_SUCCEEDED = 'Succeeded'
+JOB_FAILED = 'Failed'
+JOB_TIMED_OUT = 'TimedOut'
+JOB_CREATED = 'Created'
+JOB_SCHEDULED = 'Scheduled'
+JOB_IMAGE_PULLED = 'ImagePulled'
+JOB_RUNNING = 'Running'
+# Phases a job goes through before it succeeds or fails, in order.
+JOB_PHASES = (JOB_CREATED, JOB_SCHEDULED, JOB_IMAGE_PULLED, JOB_RUNNING)
+# Seconds between checks of a job's status while waiting for it, besides its watch events.
+JOB_WAIT_POLL_SECONDS = 10
+# Seconds a finished job is kept before the cluster deletes it, 0 to keep it.
+JOB_TTL_SECONDS_AFTER_FINISHED = int(os.environ.get('FAIRING_JOB_TTL_SECONDS', 24 * 3600))
+# Server side timeout of a single watch request, watches are resumed after it.
+WATCH_TIMEOUT_SECONDS = 60
+# Labels set on every resource a deployer creates.
+FAIRING_DEPLOYER_LABEL = 'fairing-deployer'
+FAIRING_ID_LABEL = 'fairing-id'
+# Label set on the jobs of the cluster builders.
+FAIRING_BUILDER_LABEL = 'fairing-builder'
+# Seconds before a failed informer watch is restarted.
+INFORMER_RESTART_SECONDS = 5
+# Read size of followed logs, and seconds before a pod's log is followed again.
+LOG_STREAM_CHUNK_BYTES = 64 * 1024
+LOG_RETRY_SECONDS = 2
+# How long to wait for the remaining logs once a job has finished.
+LOG_DRAIN_TIMEOUT_SECONDS = 10
+# Age past which the garbage collector deletes a finished job, seconds between its
+# runs, and number of jobs listed per call.
+GC_MAX_AGE_SECONDS = 24 * 3600
+GC_INTERVAL_SECONDS = 600
+GC_LIST_PAGE_SIZE = 100
+
+# Seconds the pod spec changes of a mutator are reused for the same namespace, 0 to
+# run the mutators on every deploy.
+MUTATOR_CACHE_TTL_SECONDS = int(os.environ.get('FAIRING_MUTATOR_CACHE_TTL_SECONDS', 300))
+
+# Apply constants
+# Field manager of the objects fairing applies server side.
+APPLY_FIELD_MANAGER = 'kubeflow-fairing'
+# Kinds applied before the others, tier by tier; the remaining kinds come last.
+APPLY_ORDER = (
+    ('Namespace',),
+    ('CustomResourceDefinition',),
+    ('ServiceAccount', 'Secret', 'ConfigMap', 'PersistentVolumeClaim', 'ClusterRole',
+     'ClusterRoleBinding', 'Role', 'RoleBinding', 'Service'),
+)
+# Discovery attempts of a kind that is not served yet, e.g. of a CRD just created.
+APPLY_DISCOVERY_RETRIES = 5
+APPLY_DISCOVERY_RETRY_SECONDS = 1
+
+# Sweep Constants
+SWEEP_LABEL = 'fairing-sweep-id'
+SWEEP_TRIAL_LABEL = 'fairing-trial'
+SWEEP_CONFIG_MAP_DEFAULT_NAME = 'fairing-sweep-'
+SWEEP_TRIAL_INDEX_ENV = 'FAIRING_TRIAL_INDEX'
+SWEEP_PARAMS_ENV = 'FAIRING_TRIAL_PARAMS'
+SWEEP_PARAMS_FILE_ENV = 'FAIRING_TRIAL_PARAMS_FILE'
+SWEEP_PARAMS_MOUNT_PATH = '/etc/fairing/params'
+SWEEP_PARAMS_FILE_NAME = 'params.json'
+# Index of the pod of an Indexed-completion job, as an annotation and an environment variable.
+JOB_COMPLETION_INDEX_ANNOTATION = 'batch.kubernetes.io/job-completion-index'
+JOB_COMPLETION_INDEX_ENV = 'JOB_COMPLETION_INDEX'
+# Prefix of the log line a trial reports its result with.
+SWEEP_TRIAL_RESULT_PREFIX = 'FAIRING_TRIAL_RESULT '
 
 # Serving Constants
 SERVING_DEPLOPYER_TYPE = 'serving'
+# Seconds a prediction request may take, as the requests timeout.
+PREDICT_TIMEOUT_SECONDS = 60
 
 #TFJob Constants
 TF_JOB_VERSION = os.environ.get('TF_JOB_VERSION', 'v1')
@@ -67,8 +147,27 @@ KFSERVING_CONTAINER_NAME = 'user-container'
 PVC_DEFAULT_MOUNT_PATH = '/mnt'
 PVC_DEFAULT_VOLUME_NAME = 'fairing-volume-'
 
+# Build context upload constants
+# Contexts larger than the part size are uploaded in parts, in parallel.
+CONTEXT_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+CONTEXT_UPLOAD_CONCURRENCY = 8
+
+# Docker builder constants
+# Tag moved to the latest BuildKit build of an image, whose inline cache the next build uses.
+DOCKER_BUILDKIT_CACHE_TAG = 'fairing-buildcache'
+
 # Kaniko Constants
 KANIKO_IMAGE = 'gcr.io/kaniko-project/executor:v0.14.0'
+KANIKO_WARMER_IMAGE = 'gcr.io/kaniko-project/warmer:v0.14.0'
+KANIKO_CACHE_TTL = '336h'
+KANIKO_CACHE_DIR = '/cache'
+KANIKO_CACHE_VOLUME_NAME = 'kaniko-cache'
+KANIKO_CACHE_HOST_PATH = '/var/cache/fairing-kaniko'
+
+# Append builder wheelhouse constants
+WHEELHOUSE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'fairing', 'wheelhouse')
+WHEELHOUSE_PLATFORM = 'manylinux2014_x86_64'
+WHEELHOUSE_TARGET_DIR = '/opt/fairing/site-packages'
 
 #Fairing Logging Constants
 FAIRING_LOG_LEVEL = os.environ.get('FAIRING_LOG_LEVEL', 'INFO').upper()
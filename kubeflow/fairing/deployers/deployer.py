@@ -18,3 +18,15 @@ class DeployerInterface(object):
     def get_logs(self):
         """Streams the logs for the training job"""
         raise NotImplementedError('TrainingInterface.train')
+
+    def wait(self, timeout=None):
+        """Waits for the deployed job to finish
+
+        :param timeout: seconds to wait, None waits forever
+
+        """
+        raise NotImplementedError('DeployerInterface.wait')
+
+    def status(self):
+        """Returns the status of the deployed job"""
+        raise NotImplementedError('DeployerInterface.status')
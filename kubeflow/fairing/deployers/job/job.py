@@ -1,12 +1,15 @@
 import logging
 import json
+import threading
+import time
 import uuid
 
 from kubernetes import client as k8s_client
 
 from kubeflow.fairing import utils
 from kubeflow.fairing.constants import constants
-from kubeflow.fairing.kubernetes.manager import KubeManager
+from kubeflow.fairing.kubernetes.manager import JobStatus, KubeManager
+from kubeflow.fairing.kubernetes.mutators import run_mutators
 from kubeflow.fairing.deployers.deployer import DeployerInterface
 
 
@@ -20,7 +23,8 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
                  cleanup=True, labels=None, job_name=None,
                  stream_log=True, deployer_type=constants.JOB_DEPLOPYER_TYPE,
                  pod_spec_mutators=None, annotations=None, config_file=None,
-                 context=None, client_configuration=None, persist_config=True, verify_ssl=True):
+                 context=None, client_configuration=None, persist_config=True, verify_ssl=True,
+                 ttl_seconds_after_finished=constants.JOB_TTL_SECONDS_AFTER_FINISHED):
         """
 
         :param namespace: k8s namespace where the training's components will be deployed.
@@ -40,6 +44,8 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
         :param client_configuration: The kubernetes.client.Configuration to set configs to.
         :param persist_config: If True, config file will be updated when changed
         :param verify_ssl: use ssl verify or not, set in the client config
+        :param ttl_seconds_after_finished: seconds the cluster keeps the job once finished
+               before deleting it, None or 0 to keep it
         """
         if namespace is None:
             self.namespace = utils.get_default_target_namespace()
@@ -64,6 +70,10 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
         self.set_anotations(annotations)
         self.pod_spec_mutators = pod_spec_mutators or []
         self.verify_ssl=verify_ssl
+        self.ttl_seconds_after_finished = ttl_seconds_after_finished or None
+        self.created_at = None
+        self._subscription = None
+        self._image_pulled_times = {}
 
     def set_anotations(self, annotations):
         self.annotations = {}
@@ -89,17 +99,18 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
         """
         self.job_id = str(uuid.uuid1())
         self.labels['fairing-id'] = self.job_id
-        for fn in self.pod_spec_mutators:
-            fn(self.backend, pod_spec, self.namespace)
+        run_mutators(self.backend, pod_spec, self.namespace, self.pod_spec_mutators)
         pod_template_spec = self.generate_pod_template_spec(pod_spec)
         pod_template_spec.spec.restart_policy = 'Never'
         pod_template_spec.spec.containers[0].name = 'fairing-job'
         self.deployment_spec = self.generate_deployment_spec(pod_template_spec)
         if self.output:
-            api = k8s_client.ApiClient()
+            api = self.backend.api_client
             job_output = api.sanitize_for_serialization(self.deployment_spec)
             print(json.dumps(job_output))
 
+        self._subscription = None
+        self._image_pulled_times = {}
         name = self.create_resource()
         logger.warning("The {} {} launched.".format(self.deployer_type, name))
 
@@ -108,9 +119,141 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
 
         return name
 
+    def deploy_all(self, pod_specs, labels=None, rate_limiter=None):
+        """deploy one job per pod spec, creating them concurrently
+
+        Logs are not streamed and the jobs are not cleaned up.
+
+        :param pod_specs: pod specs of the training jobs
+        :param labels: optional list of extra labels for each job, in the order of pod_specs
+        :param rate_limiter: bulk.TokenBucket to share with other submissions (Default value = None)
+        :returns: bulk.BulkResult: names of the created jobs and the failures
+
+        """
+        base_labels = self.labels
+        specs = []
+        try:
+            for index, pod_spec in enumerate(pod_specs):
+                # Each spec gets its own labels, generate_deployment_spec keeps a reference.
+                self.labels = dict(base_labels)
+                self.labels.update(labels[index] if labels else {})
+                self.labels['fairing-id'] = str(uuid.uuid1())
+                run_mutators(self.backend, pod_spec, self.namespace, self.pod_spec_mutators)
+                pod_template_spec = self.generate_pod_template_spec(pod_spec)
+                pod_template_spec.spec.restart_policy = 'Never'
+                pod_template_spec.spec.containers[0].name = 'fairing-job'
+                specs.append(self.generate_deployment_spec(pod_template_spec))
+        finally:
+            self.labels = base_labels
+        result = self.backend.create_jobs(self.namespace, specs, rate_limiter=rate_limiter)
+        logger.warning("Launched {} of {} {}s.".format(len(result.created), len(specs),
+                                                       self.deployer_type))
+        for index, e in result.failures:
+            logger.error("Failed to launch {} {}: {}".format(self.deployer_type, index, e))
+        return result
+
+    def deploy_indexed(self, pod_spec, params, parallelism=None):
+        """deploy a single Indexed-completion job running one pod per parameter dict
+
+        The parameters are stored in one ConfigMap, owned by the job, whose entries
+        are mounted in every pod. Each pod reads the entry of its JOB_COMPLETION_INDEX,
+        see kubeflow.fairing.utils.get_trial_params(). Logs are not streamed. As
+        backoffLimit is 0, a failed pod fails the whole job. Indexed completion needs
+        Kubernetes 1.21 or later, on older API servers a RuntimeError is raised and
+        nothing is left behind.
+
+        :param pod_spec: pod spec shared by every pod of the job
+        :param params: list of dicts of JSON serializable parameters, one per pod
+        :param parallelism: number of pods running at once, all of them if None
+        :returns: name of the created job
+
+        """
+        self.job_id = str(uuid.uuid1())
+        self.labels['fairing-id'] = self.job_id
+        config_map = self.backend.api_v1.create_namespaced_config_map(
+            self.namespace, k8s_client.V1ConfigMap(
+                metadata=k8s_client.V1ObjectMeta(
+                    generate_name=constants.SWEEP_CONFIG_MAP_DEFAULT_NAME,
+                    labels=self.labels),
+                data={"trial-{}.json".format(index): json.dumps(trial_params)
+                      for index, trial_params in enumerate(params)}))
+        try:
+            run_mutators(self.backend, pod_spec, self.namespace, self.pod_spec_mutators)
+            pod_template_spec = self.generate_pod_template_spec(pod_spec)
+            pod_template_spec.spec.restart_policy = 'Never'
+            pod_template_spec.spec.containers[0].name = 'fairing-job'
+            self._mount_indexed_params(pod_template_spec.spec, config_map.metadata.name)
+            job = self.generate_deployment_spec(pod_template_spec)
+            job.spec.completions = len(params)
+            job.spec.parallelism = min(parallelism or len(params), len(params))
+            # The client's V1JobSpec predates completionMode, it is set on the serialized job.
+            self.deployment_spec = self.backend.api_client.sanitize_for_serialization(job)
+            self.deployment_spec['spec']['completionMode'] = 'Indexed'
+
+            self._subscription = None
+            self._image_pulled_times = {}
+            name = self._create_indexed_job()
+        except Exception:
+            self.backend.api_v1.delete_namespaced_config_map(config_map.metadata.name,
+                                                             self.namespace)
+            raise
+        self.backend.api_v1.patch_namespaced_config_map(
+            config_map.metadata.name, self.namespace,
+            {'metadata': {'ownerReferences': [{
+                'apiVersion': 'batch/v1', 'kind': 'Job', 'name': name,
+                'uid': self._created_job.metadata.uid}]}})
+        logger.warning("The indexed {} {} launched with {} completions.".format(
+            self.deployer_type, name, len(params)))
+        return name
+
+    def _create_indexed_job(self):
+        """Create the indexed job, checking the API server kept its completionMode.
+
+        API servers older than 1.21 silently drop the field and would run every
+        completion with the parameters of index 0.
+        """
+        # The response is read raw, V1Job would drop completionMode as well.
+        response = self.backend.api_instance.create_namespaced_job(
+            self.namespace, self.deployment_spec, _preload_content=False)
+        created = json.loads(response.data)
+        if created['spec'].get('completionMode') != 'Indexed':
+            self.backend.api_instance.delete_namespaced_job(
+                created['metadata']['name'], self.namespace,
+                body=k8s_client.V1DeleteOptions(propagation_policy='Background'))
+            raise RuntimeError("The API server does not support Indexed jobs, "
+                               "Kubernetes 1.21 or later is required.")
+        self._created_job = self.backend.api_client.deserialize(response, 'V1Job')
+        self.created_at = self._created_job.metadata.creation_timestamp
+        return self._created_job.metadata.name
+
+    @staticmethod
+    def _mount_indexed_params(pod_spec, config_map_name):
+        """Mount every trial's parameters and point each pod to those of its index."""
+        container = pod_spec.containers[0]
+        index = "$({})".format(constants.JOB_COMPLETION_INDEX_ENV)
+        container.env = (container.env or []) + [
+            k8s_client.V1EnvVar(
+                name=constants.JOB_COMPLETION_INDEX_ENV,
+                value_from=k8s_client.V1EnvVarSource(
+                    field_ref=k8s_client.V1ObjectFieldSelector(
+                        field_path="metadata.annotations['{}']".format(
+                            constants.JOB_COMPLETION_INDEX_ANNOTATION)))),
+            k8s_client.V1EnvVar(name=constants.SWEEP_TRIAL_INDEX_ENV, value=index),
+            k8s_client.V1EnvVar(name=constants.SWEEP_PARAMS_FILE_ENV,
+                                value="{}/trial-{}.json".format(
+                                    constants.SWEEP_PARAMS_MOUNT_PATH, index))]
+        pod_spec.volumes = (pod_spec.volumes or []) + [k8s_client.V1Volume(
+            name='fairing-trial-params',
+            config_map=k8s_client.V1ConfigMapVolumeSource(name=config_map_name))]
+        container.volume_mounts = (container.volume_mounts or []) + [
+            k8s_client.V1VolumeMount(name='fairing-trial-params',
+                                     mount_path=constants.SWEEP_PARAMS_MOUNT_PATH,
+                                     read_only=True)]
+
     def create_resource(self):
         """ create job"""
         self._created_job = self.backend.create_job(self.namespace, self.deployment_spec)
+        self.created_at = self._created_job.metadata.creation_timestamp
         return self._created_job.metadata.name
 
     def generate_pod_template_spec(self, pod_spec):
@@ -149,6 +292,7 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
             parallelism=self.runs,
             completions=self.runs,
             backoff_limit=0,
+            ttl_seconds_after_finished=self.ttl_seconds_after_finished,
         )
 
         return k8s_client.V1Job(
@@ -163,21 +307,130 @@ class Job(DeployerInterface): #pylint:disable=too-many-instance-attributes
 
     def get_logs(self):
         """ get logs from the deployed job"""
+        self.stream_job_logs()
+
+        if self.cleanup:
+            self.do_cleanup()
+
+    def stream_job_logs(self):
+        """ stream the logs of the deployed job until they end"""
         self.backend.log(self._created_job.metadata.name,
                          self._created_job.metadata.namespace,
                          self.labels,
                          container="fairing-job")
 
+    def created_name(self):
+        """ name of the deployed job"""
+        return self._created_job.metadata.name
+
+    def wait(self, timeout=None, stream_logs=False):
+        """Waits for the deployed job to finish, following it with the namespace's watches.
+
+        The job is cleaned up once finished if cleanup is set.
+
+        :param timeout: seconds to wait, None waits forever
+        :param stream_logs: whether to stream the job's logs while waiting, on a background
+            thread (Default value = False)
+        :returns: JobStatus: the status once finished, or when the timeout expired
+
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        log_thread = None
+        if stream_logs:
+            # Streaming only returns once the logs end, so it runs beside the loop
+            # enforcing the deadline; a hung job does not block past the timeout.
+            log_thread = threading.Thread(target=self.stream_job_logs, daemon=True,
+                                          name='fairing-logs-' + self.created_name())
+            log_thread.start()
+        subscription = self._subscribe()
+        status = self.status()
+        while not self._done(status):
+            remaining = deadline - time.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return status
+            seen = subscription.changes
+            poll = constants.JOB_WAIT_POLL_SECONDS
+            subscription.wait_for(lambda sub: sub.changes != seen,
+                                  min(poll, remaining) if remaining is not None else poll)
+            status = self.status()
+        if log_thread is not None:
+            # Let the end of the logs be printed.
+            drain = constants.LOG_DRAIN_TIMEOUT_SECONDS
+            log_thread.join(min(drain, max(deadline - time.time(), 0))
+                            if deadline is not None else drain)
+        logger.warning("The {} {} {}.".format(self.deployer_type, status.name,
+                                              status.phase.lower()))
+        self.backend.job_informer(self.namespace).unsubscribe(subscription)
+        self._subscription = None
         if self.cleanup:
             self.do_cleanup()
+        return status
+
+    def status(self):
+        """Status of the deployed job and the time each of its phases was reached.
+
+        :returns: JobStatus
+
+        """
+        subscription = self._subscribe()
+        pods = list(subscription.pods.values())
+        phase_times = [(constants.JOB_CREATED, self.created_at)]
+        for phase, pod_time in ((constants.JOB_SCHEDULED, self._scheduled_at),
+                                (constants.JOB_IMAGE_PULLED, self._image_pulled_at),
+                                (constants.JOB_RUNNING, self._running_at)):
+            times = [pod_time(pod) for pod in pods]
+            if not times or None in times:
+                break
+            phase_times.append((phase, max(times)))
+        finished = self._finished(subscription)
+        if finished is not None:
+            phase_times.append(finished)
+        return JobStatus(self.created_name(), phase_times[-1][0], phase_times)
+
+    def _done(self, status):
+        """Whether wait() returns with the status."""
+        return status.finished
+
+    def _subscribe(self):
+        if self._subscription is None:
+            self._subscription = self.backend.job_informer(self.namespace).subscribe(
+                self.job_id)
+        return self._subscription
+
+    def _finished(self, subscription):
+        """(JOB_SUCCEEDED or JOB_FAILED, datetime) once the job finished, else None."""
+        result = subscription.wait(timeout=0)
+        if result is None:
+            return None
+        return result.status, result.completion_time
+
+    @staticmethod
+    def _scheduled_at(pod):
+        for condition in (pod.status and pod.status.conditions) or []:
+            if condition.type == 'PodScheduled' and condition.status == 'True':
+                return condition.last_transition_time
+        return None
+
+    def _image_pulled_at(self, pod):
+        """Time the image of the pod was pulled, from the pod's events."""
+        name = pod.metadata.name
+        if self._image_pulled_times.get(name) is None and self._scheduled_at(pod) is not None:
+            self._image_pulled_times[name] = self.backend.pod_event_time(
+                name, self.namespace, 'Pulled')
+        return self._image_pulled_times.get(name)
+
+    @staticmethod
+    def _running_at(pod):
+        for status in (pod.status and pod.status.container_statuses) or []:
+            state = status.state.running or status.state.terminated
+            if state is not None:
+                return state.started_at
+        return None
 
     def do_cleanup(self):
-        """ clean up the pods after job finished"""
+        """ delete the job, its pods are deleted in the background"""
         logger.warning("Cleaning up job {}...".format(self._created_job.metadata.name))
-        client_config=k8s_client.Configuration()
-        client_config.verify_ssl=self.verify_ssl
-        api_client=k8s_client.ApiClient(configuration=client_config)
-        k8s_client.BatchV1Api(api_client=api_client).delete_namespaced_job(
+        self.backend.api_instance.delete_namespaced_job(
             self._created_job.metadata.name,
             self._created_job.metadata.namespace,
-            body=k8s_client.V1DeleteOptions(propagation_policy='Foreground'))
+            body=k8s_client.V1DeleteOptions(propagation_policy='Background'))
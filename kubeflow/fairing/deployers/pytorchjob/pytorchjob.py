@@ -7,6 +7,8 @@ from kubeflow.pytorchjob import V1PyTorchJobSpec
 
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.deployers.job.job import Job
+from kubeflow.fairing.kubernetes.logs import LogAggregator
+from kubeflow.fairing.kubernetes.manager import parse_time
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +20,8 @@ class PyTorchJob(Job):
                  runs=1, job_name=None, stream_log=True, labels=None,
                  pod_spec_mutators=None, cleanup=False, annotations=None,
                  config_file=None, context=None, client_configuration=None,
-                 persist_config=True):
+                 persist_config=True, log_dir=None,
+                 ttl_seconds_after_finished=constants.JOB_TTL_SECONDS_AFTER_FINISHED):
         """
 
         :param namespace: k8s namespace where the training's components
@@ -38,6 +41,10 @@ class PyTorchJob(Job):
         :param context: kubernetes context
         :param client_configuration: The kubernetes.client.Configuration to set configs to.
         :param persist_config: If True, config file will be updated when changed
+        :param log_dir: directory receiving the log of each replica as <replica>.log
+               while the logs are streamed (Default value = None)
+        :param ttl_seconds_after_finished: seconds the cluster keeps the job once finished
+               before deleting it, None or 0 to keep it
         """
         super(PyTorchJob, self).__init__(namespace, runs, job_name=job_name, stream_log=stream_log,
                                          deployer_type=constants.PYTORCH_JOB_DEPLOYER_TYPE,
@@ -45,7 +52,9 @@ class PyTorchJob(Job):
                                          labels=labels, annotations=annotations,
                                          config_file=config_file, context=context,
                                          client_configuration=client_configuration,
-                                         persist_config=persist_config)
+                                         persist_config=persist_config,
+                                         ttl_seconds_after_finished=ttl_seconds_after_finished)
+        self.log_dir = log_dir
         self.distribution = {
             'Master': master_count,
             'Worker': worker_count,
@@ -55,6 +64,7 @@ class PyTorchJob(Job):
         """ create a pytorchjob training"""
         self.created_pytorchjob = self.backend.create_pytorch_job(
             self.namespace, self.deployment_spec)
+        self.created_at = parse_time(self.created_pytorchjob['metadata'].get('creationTimestamp'))
         return self.created_pytorchjob['metadata']['name']
 
     def generate_deployment_spec(self, pod_template_spec):
@@ -86,11 +96,17 @@ class PyTorchJob(Job):
             metadata=k8s_client.V1ObjectMeta(name=self.job_name,
                                              generate_name=constants.PYTORCH_JOB_DEFAULT_NAME,
                                              labels=self.labels),
-            spec=V1PyTorchJobSpec(pytorch_replica_specs=pytorch_replica_specs)
+            spec=V1PyTorchJobSpec(pytorch_replica_specs=pytorch_replica_specs,
+                                  ttl_seconds_after_finished=self.ttl_seconds_after_finished)
         )
 
         return pytorchjob
 
+    def deploy_indexed(self, pod_spec, params, parallelism=None):
+        """ Indexed completion is a mode of V1Jobs, use deploy_all instead"""
+        raise ValueError("Indexed completion is only supported for V1 Jobs, "
+                         "use {}.deploy_all instead.".format(type(self).__name__))
+
     def set_container_name(self, pod_template_spec):
         """Sets the name of the main container to `pytorch`.
             This is required for PytorchJob
@@ -101,17 +117,32 @@ class PyTorchJob(Job):
         pod_template_spec.spec.containers[0].name = 'pytorch'
 
     def get_logs(self):
-        """ get logs"""
-        name = self.created_pytorchjob['metadata']['name']
+        """ get the logs of every replica, prefixed with the replica"""
+        self.stream_job_logs()
+
+        if self.cleanup:
+            self.do_cleanup()
+
+    def stream_job_logs(self):
+        """ stream the logs of every replica until they all end"""
         namespace = self.created_pytorchjob['metadata']['namespace']
+        aggregator = LogAggregator(self.backend, namespace, container="pytorch",
+                                   replica_labels=('pytorch-replica-type',
+                                                   'pytorch-replica-index'),
+                                   output_dir=self.log_dir)
+        aggregator.follow(self.job_id, replicas=sum(self.distribution.values()))
+
+    def created_name(self):
+        """ name of the deployed PyTorchJob"""
+        return self.created_pytorchjob['metadata']['name']
 
-        labels = {
-            'pytorch-replica-index': '0',
-            'pytorch-replica-type': 'worker',
-            'pytorch-job-name': name
-        }
-        self.backend.log(name, namespace, labels, container="pytorch")
+    def do_cleanup(self):
+        """ delete the PyTorchJob"""
+        name = self.created_name()
+        logger.warning("Cleaning up PyTorchJob {}...".format(name))
+        self.backend.delete_pytorch_job(name, self.namespace)
 
-        if self.cleanup:
-            logger.warning("Cleaning up PyTorchJob {}...".format(name))
-            self.backend.delete_pytorch_job(name, self.namespace)
+    def _subscribe(self):
+        # The PyTorchJob finishes through its conditions, followed with a watch of its kind.
+        self.backend.job_informer(self.namespace).watch_custom_jobs(constants.PYTORCH_JOB_KIND)
+        return super(PyTorchJob, self)._subscribe()
@@ -7,6 +7,7 @@ from kubernetes.client.rest import ApiException
 
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.deployers.job.job import Job
+from kubeflow.fairing.kubernetes.mutators import run_mutators
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,8 @@ class Serving(Job):
         :param config_file: kubernetes config file
         :param verify_ssl: use ssl verify or not, set in the client config
         """
-        super(Serving, self).__init__(namespace, runs,
+        # The service keeps running once available, delete() removes it.
+        super(Serving, self).__init__(namespace, runs, cleanup=False,
                                       deployer_type=constants.SERVING_DEPLOPYER_TYPE,
                                       labels=labels,
                                       config_file=config_file,
@@ -54,12 +56,9 @@ class Serving(Job):
         self.pod_spec_mutators = pod_spec_mutators or []
         self.use_seldon=use_seldon
 
-        client_config=k8s_client.Configuration()
-        client_config.verify_ssl=verify_ssl
-        api_client=k8s_client.ApiClient(configuration=client_config)
-        self.v1_api = k8s_client.CoreV1Api(api_client=api_client)
-        self.apps_v1 = k8s_client.AppsV1Api(api_client=api_client)
-        self.api_instance = k8s_client.ExtensionsV1beta1Api(api_client=api_client)
+        self.v1_api = self.backend.api_v1
+        self.apps_v1 = self.backend.api_app
+        self.api_instance = self.backend.api_extension
         self.input_deployment_name=deployment_name
         self.input_service_name=service_name
 
@@ -71,8 +70,7 @@ class Serving(Job):
         """
         self.job_id = str(uuid.uuid1())
         self.labels['fairing-id'] = self.job_id
-        for fn in self.pod_spec_mutators:
-            fn(self.backend, pod_spec, self.namespace)
+        run_mutators(self.backend, pod_spec, self.namespace, self.pod_spec_mutators)
         pod_template_spec = self.generate_pod_template_spec(pod_spec)
 # #        pod_template_spec.spec.containers[0].command = ["seldon-core-microservice",
 # #                                                        self.serving_class, "REST",
@@ -101,13 +99,16 @@ class Serving(Job):
         if self.input_service_name is not None: self.service_spec.metadata.name=self.input_service_name
 
         if self.output:
-            api = k8s_client.ApiClient()
+            api = self.backend.api_client
             job_output = api.sanitize_for_serialization(self.deployment_spec)
             logger.warning(json.dumps(job_output))
             service_output = api.sanitize_for_serialization(self.service_spec)
             logger.warning(json.dumps(service_output))
 
+        self._subscription = None
+        self._image_pulled_times = {}
         self.deployment = self.apps_v1.create_namespaced_deployment(self.namespace, self.deployment_spec)
+        self.created_at = self.deployment.metadata.creation_timestamp
         self.service = self.v1_api.create_namespaced_service(self.namespace, self.service_spec)
 
         if self.service_type == "LoadBalancer":
@@ -196,3 +197,33 @@ class Serving(Job):
             logger.error(e)
             logger.error("Not able to delete deployment: {}/{}"\
                          .format(self.deployment.metadata.namespace, self.deployment.metadata.name))
+
+    def created_name(self):
+        """ name of the deployment"""
+        return self.deployment.metadata.name
+
+    def stream_job_logs(self):
+        """ stream the logs of a pod of the deployment"""
+        self.backend.log(self.deployment.metadata.name, self.namespace, self.labels,
+                         container=self.deployment.spec.template.spec.containers[0].name)
+
+    def wait(self, timeout=None, stream_logs=False):
+        """Waits for the deployment to become available, following its pods with the
+        namespace's watches.
+
+        :param timeout: seconds to wait, None waits forever
+        :param stream_logs: whether to stream the logs of a pod while waiting, on a
+            background thread (Default value = False)
+        :returns: JobStatus: the status once every pod runs and the deployment is
+            available, or when the timeout expired; as deployments do not finish,
+            status() reaches JOB_RUNNING at most
+
+        """
+        return super(Serving, self).wait(timeout=timeout, stream_logs=stream_logs)
+
+    def _done(self, status):
+        if status.phase != constants.JOB_RUNNING:
+            return False
+        deployment = self.apps_v1.read_namespaced_deployment_status(
+            self.deployment.metadata.name, self.namespace)
+        return (deployment.status.available_replicas or 0) >= (deployment.spec.replicas or 1)
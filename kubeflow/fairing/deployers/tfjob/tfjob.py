@@ -7,6 +7,8 @@ from kubeflow.tfjob import V1TFJobSpec
 
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing.deployers.job.job import Job
+from kubeflow.fairing.kubernetes.logs import LogAggregator
+from kubeflow.fairing.kubernetes.manager import parse_time
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,9 @@ class TfJob(Job):
     def __init__(self, namespace=None, worker_count=1, ps_count=0,
                  chief_count=1, runs=1, job_name=None, stream_log=True,
                  labels=None, pod_spec_mutators=None, cleanup=False, annotations=None,
-                 config_file=None, context=None, client_configuration=None, persist_config=True):
+                 config_file=None, context=None, client_configuration=None, persist_config=True,
+                 log_dir=None,
+                 ttl_seconds_after_finished=constants.JOB_TTL_SECONDS_AFTER_FINISHED):
         """
 
         :param namespace: k8s namespace where the training's components
@@ -38,13 +42,19 @@ class TfJob(Job):
         :param context: kubernetes context
         :param client_configuration: The kubernetes.client.Configuration to set configs to.
         :param persist_config: If True, config file will be updated when changed
+        :param log_dir: directory receiving the log of each replica as <replica>.log
+               while the logs are streamed (Default value = None)
+        :param ttl_seconds_after_finished: seconds the cluster keeps the job once finished
+               before deleting it, None or 0 to keep it
         """
         super(TfJob, self).__init__(namespace, runs, job_name=job_name, stream_log=stream_log,
                                     deployer_type=constants.TF_JOB_DEPLOYER_TYPE, labels=labels,
                                     pod_spec_mutators=pod_spec_mutators, cleanup=cleanup,
                                     annotations=annotations, config_file=config_file,
                                     context=context, client_configuration=client_configuration,
-                                    persist_config=persist_config)
+                                    persist_config=persist_config,
+                                    ttl_seconds_after_finished=ttl_seconds_after_finished)
+        self.log_dir = log_dir
         self.distribution = {
             'Worker': worker_count,
             'PS': ps_count,
@@ -54,6 +64,7 @@ class TfJob(Job):
     def create_resource(self):
         """ create a tfjob training"""
         self.created_tfjob = self.backend.create_tf_job(self.namespace, self.deployment_spec)
+        self.created_at = parse_time(self.created_tfjob['metadata'].get('creationTimestamp'))
         return self.created_tfjob['metadata']['name']
 
     def generate_deployment_spec(self, pod_template_spec):
@@ -89,11 +100,17 @@ class TfJob(Job):
             metadata=k8s_client.V1ObjectMeta(name=self.job_name,
                                              generate_name=constants.TF_JOB_DEFAULT_NAME,
                                              labels=self.labels),
-            spec=V1TFJobSpec(tf_replica_specs=tf_replica_specs)
+            spec=V1TFJobSpec(tf_replica_specs=tf_replica_specs,
+                             ttl_seconds_after_finished=self.ttl_seconds_after_finished)
         )
 
         return tfjob
 
+    def deploy_indexed(self, pod_spec, params, parallelism=None):
+        """ Indexed completion is a mode of V1Jobs, use deploy_all instead"""
+        raise ValueError("Indexed completion is only supported for V1 Jobs, "
+                         "use {}.deploy_all instead.".format(type(self).__name__))
+
     def set_container_name(self, pod_template_spec):
         """Sets the name of the main container to `tensorflow`.
             This is required for TfJobs
@@ -104,17 +121,31 @@ class TfJob(Job):
         pod_template_spec.spec.containers[0].name = 'tensorflow'
 
     def get_logs(self):
-        """ get logs"""
-        name = self.created_tfjob['metadata']['name']
+        """ get the logs of every replica, prefixed with the replica"""
+        self.stream_job_logs()
+
+        if self.cleanup:
+            self.do_cleanup()
+
+    def stream_job_logs(self):
+        """ stream the logs of every replica until they all end"""
         namespace = self.created_tfjob['metadata']['namespace']
+        aggregator = LogAggregator(self.backend, namespace, container="tensorflow",
+                                   replica_labels=('tf-replica-type', 'tf-replica-index'),
+                                   output_dir=self.log_dir)
+        aggregator.follow(self.job_id, replicas=sum(self.distribution.values()))
 
-        labels = {
-            'tf-replica-index': '0',
-            'tf-replica-type': 'worker',
-            'tf-job-name': name
-        }
-        self.backend.log(name, namespace, labels, container="tensorflow")
+    def created_name(self):
+        """ name of the deployed TFJob"""
+        return self.created_tfjob['metadata']['name']
 
-        if self.cleanup:
-            logger.warning("Cleaning up TFJob {}...".format(name))
-            self.backend.delete_tf_job(name, self.namespace)
+    def do_cleanup(self):
+        """ delete the TFJob"""
+        name = self.created_name()
+        logger.warning("Cleaning up TFJob {}...".format(name))
+        self.backend.delete_tf_job(name, self.namespace)
+
+    def _subscribe(self):
+        # The TFJob finishes through its conditions, followed with a watch of its kind.
+        self.backend.job_informer(self.namespace).watch_custom_jobs(constants.TF_JOB_KIND)
+        return super(TfJob, self)._subscribe()
@@ -0,0 +1,113 @@
+"""Shared executor running builds and submissions in the background.
+
+Operations submitted here return a concurrent.futures.Future with an extra
+`progress` attribute, a Progress that can be queried while the operation runs.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kubeflow.fairing.constants import constants
+
+QUEUED = 'queued'
+RUNNING = 'running'
+BUILDING = 'building'
+UPLOADING_CONTEXT = 'uploading context'
+PUSHING = 'pushing'
+DEPLOYING = 'deploying'
+DONE = 'done'
+FAILED = 'failed'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Progress(object):
+    """Stage of a build or submission, updated as it goes.
+
+    :param stage: initial stage (Default value = QUEUED)
+    """
+
+    def __init__(self, stage=QUEUED):
+        self._lock = threading.Lock()
+        self._history = [(stage, time.time())]
+
+    def update(self, stage):
+        """Move to a new stage.
+
+        :param stage: the new stage, e.g. BUILDING or PUSHING
+        """
+        with self._lock:
+            self._history.append((stage, time.time()))
+
+    @property
+    def stage(self):
+        with self._lock:
+            return self._history[-1][0]
+
+    @property
+    def history(self):
+        """List of (stage, time.time() the stage was entered) tuples."""
+        with self._lock:
+            return list(self._history)
+
+    def durations(self):
+        """Seconds spent in each stage, in order; the current stage counts until now.
+
+        :returns: list of (stage, seconds) tuples
+        """
+        history = self.history
+        ends = [entered for _, entered in history[1:]] + [time.time()]
+        return [(stage, end - entered)
+                for (stage, entered), end in zip(history, ends)
+                if stage not in (DONE, FAILED)]
+
+    @property
+    def elapsed(self):
+        """Seconds since the first stage, or until DONE/FAILED once finished."""
+        with self._lock:
+            first, last = self._history[0], self._history[-1]
+        end = last[1] if last[0] in (DONE, FAILED) else time.time()
+        return end - first[1]
+
+    def __repr__(self):
+        return "Progress(stage={!r}, elapsed={:.1f}s)".format(self.stage, self.elapsed)
+
+
+def get_executor():
+    """The executor shared by every background build and submission."""
+    global _executor  #pylint:disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=constants.ASYNC_MAX_WORKERS,
+                                           thread_name_prefix='fairing')
+        return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the shared executor.
+
+    :param fn: the callable to run
+    :param progress: Progress to attach to the future and to move to RUNNING,
+        DONE or FAILED, a new one if not given
+    :returns: a Future with a `progress` attribute
+    """
+    progress = kwargs.pop('progress', None)
+    if progress is None:
+        progress = Progress()
+    elif progress.stage != QUEUED:
+        progress.update(QUEUED)
+
+    def run():
+        progress.update(RUNNING)
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            progress.update(FAILED)
+            raise
+        progress.update(DONE)
+        return result
+
+    future = get_executor().submit(run)
+    future.progress = progress
+    return future
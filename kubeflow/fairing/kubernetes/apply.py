@@ -0,0 +1,197 @@
+import json
+import logging
+import threading
+import time
+
+import yaml
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes import bulk
+
+logger = logging.getLogger(__name__)
+
+MODES = ('create', 'apply', 'patch', 'replace', 'delete')
+
+
+def parse_specs(specs):
+    """Parses the specs once.
+
+    :param specs: dicts, or YAML strings which may hold several documents
+    :returns: list of dicts, empty documents left out
+    """
+    objects = []
+    for spec in specs:
+        if isinstance(spec, dict):
+            objects.append(spec)
+        else:
+            objects.extend(doc for doc in yaml.safe_load_all(spec) if doc)
+    return objects
+
+
+def order_tiers(objects, mode):
+    """Groups the objects into tiers applied one after the other.
+
+    Namespaces come first, then CRDs, then the kinds of constants.APPLY_ORDER,
+    then every other kind; deletions go the other way round.
+
+    :param objects: the parsed objects
+    :param mode: the apply mode
+    :returns: list of lists of indexes of the objects
+    """
+    rank = {kind: tier for tier, kinds in enumerate(constants.APPLY_ORDER) for kind in kinds}
+    last = len(constants.APPLY_ORDER)
+    tiers = {}
+    for index, obj in enumerate(objects):
+        tiers.setdefault(rank.get(obj.get('kind'), last), []).append(index)
+    return [tiers[tier] for tier in sorted(tiers, reverse=mode == 'delete')]
+
+
+class ResourceResolver(object):
+    """Plural names and scopes of kinds, from the API server's discovery documents.
+
+    Each group version is discovered once and cached.
+
+    :param api_client: ApiClient to query
+    """
+
+    def __init__(self, api_client):
+        self.api_client = api_client
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, api_version, kind):
+        """Plural name of a kind, and whether its objects are namespaced.
+
+        A kind that is not served yet, e.g. of a CRD that was just created, is
+        looked up again a few times before giving up.
+
+        :param api_version: apiVersion of the object, e.g. 'apps/v1'
+        :param kind: kind of the object, e.g. 'Deployment'
+        :returns: (plural, namespaced) tuple
+        """
+        for attempt in range(constants.APPLY_DISCOVERY_RETRIES):
+            with self._lock:
+                resources = self._resources.get(api_version)
+            if resources is None:
+                resources = self._discover(api_version)
+            if kind in resources:
+                return resources[kind]
+            with self._lock:
+                self._resources.pop(api_version, None)
+            if attempt + 1 < constants.APPLY_DISCOVERY_RETRIES:
+                time.sleep(constants.APPLY_DISCOVERY_RETRY_SECONDS)
+        raise RuntimeError("Kind {} is not served by the API server in {}".format(
+            kind, api_version))
+
+    def _discover(self, api_version):
+        try:
+            document = self.api_client.call_api(
+                group_version_path(api_version), 'GET',
+                header_params={'Accept': 'application/json'},
+                response_type='object', auth_settings=['BearerToken'],
+                _return_http_data_only=True)
+        except client.rest.ApiException as e:
+            if e.status != 404:
+                raise
+            document = {}
+        resources = {resource['kind']: (resource['name'], resource['namespaced'])
+                     for resource in document.get('resources') or []
+                     if '/' not in resource['name']}
+        if resources:
+            with self._lock:
+                self._resources[api_version] = resources
+        return resources
+
+
+def group_version_path(api_version):
+    """Root path of a group version, '/api/v1' for the core group."""
+    if '/' not in api_version:
+        return '/api/' + api_version
+    return '/apis/' + api_version
+
+
+def is_built_in(api_version):
+    """Whether a group version is served by Kubernetes itself rather than a CRD:
+    the core group, groups without a domain such as apps, and the *.k8s.io groups."""
+    group = api_version.rpartition('/')[0]
+    return '.' not in group or group.endswith('.k8s.io')
+
+
+class Applier(object):
+    """Creates, applies, patches, replaces or deletes many objects quickly.
+
+    The objects are parsed once and grouped into tiers, see order_tiers(); each
+    tier is sent with concurrent, rate limited calls once the previous one
+    succeeded. Paths come from the resolver's cached discovery. The 'apply' mode
+    uses server-side apply, which creates or updates objects alike. The 'patch'
+    mode sends strategic merge patches for built-in kinds, as the client's
+    patch_namespaced_* calls do, and merge patches for custom resources, which
+    do not support strategic merge.
+
+    :param api_client: ApiClient making the calls
+    :param resolver: ResourceResolver of the ApiClient
+    :param default_namespace: namespace of the namespaced objects that have none
+    :param rate_limiter: bulk.TokenBucket to share with other callers, a new one if None
+    """
+
+    def __init__(self, api_client, resolver, default_namespace=None, rate_limiter=None):
+        self.api_client = api_client
+        self.resolver = resolver
+        self.default_namespace = default_namespace
+        self.rate_limiter = rate_limiter or bulk.TokenBucket()
+
+    def run(self, specs, mode='apply'):
+        """Sends the specs to the API server.
+
+        :param specs: dicts, or YAML strings which may hold several documents
+        :param mode: 'create', 'apply', 'patch', 'replace' or 'delete'
+        :returns: list of the resulting objects as dicts, in the order of the specs
+        """
+        if mode not in MODES:
+            raise ValueError("Unknown mode %s, valid modes: %s." % (mode, ", ".join(MODES)))
+        objects = parse_specs(specs)
+        results = [None] * len(objects)
+        for tier in order_tiers(objects, mode):
+            result = bulk.run_all(lambda index: self._send(objects[index], mode), tier,
+                                  rate_limiter=self.rate_limiter)
+            if not result.succeeded:
+                index, e = result.failures[0]
+                obj = objects[tier[index]]
+                raise RuntimeError("Failed to {} {} of {} objects, {} {}: {}".format(
+                    mode, len(result.failures), len(objects), obj.get('kind'),
+                    obj.get('metadata', {}).get('name'), e))
+            for index, obj in zip(tier, result.names):
+                results[index] = obj
+        return results
+
+    def _send(self, obj, mode):
+        api_version, kind = obj['apiVersion'], obj['kind']
+        plural, namespaced = self.resolver.resolve(api_version, kind)
+        metadata = obj.get('metadata') or {}
+        path = group_version_path(api_version)
+        if namespaced:
+            path += '/namespaces/' + (metadata.get('namespace') or self.default_namespace)
+        path += '/' + plural
+        if mode != 'create':
+            if not metadata.get('name'):
+                raise RuntimeError(
+                    "Cannot get the name in the spec for the operation %s." % mode)
+            path += '/' + metadata['name']
+
+        patch_type = ('application/strategic-merge-patch+json' if is_built_in(api_version)
+                      else 'application/merge-patch+json')
+        method, content_type, body, query = {
+            'create': ('POST', 'application/json', obj, []),
+            'replace': ('PUT', 'application/json', obj, []),
+            'patch': ('PATCH', patch_type, obj, []),
+            # JSON is YAML, and a string body is sent as it is.
+            'apply': ('PATCH', 'application/apply-patch+yaml', json.dumps(obj),
+                      [('fieldManager', constants.APPLY_FIELD_MANAGER), ('force', 'true')]),
+            'delete': ('DELETE', 'application/json', {'propagationPolicy': 'Background'}, []),
+        }[mode]
+        return self.api_client.call_api(
+            path, method, query_params=query,
+            header_params={'Accept': 'application/json', 'Content-Type': content_type},
+            body=body, response_type='object', auth_settings=['BearerToken'],
+            _return_http_data_only=True)
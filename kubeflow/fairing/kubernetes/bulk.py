@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """Client-side rate limiter shared by concurrent API calls.
+
+    Up to `burst` calls go through at once, then `qps` calls per second. When the
+    API server answers 429 (e.g. its priority and fairness queues are full), every
+    caller is paused for the time the server asked for.
+
+    :param qps: sustained calls per second
+    :param burst: calls allowed at once after an idle period
+    """
+
+    def __init__(self, qps=constants.BULK_SUBMIT_QPS, burst=constants.BULK_SUBMIT_BURST):
+        self.qps = float(qps)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a call may be made."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst,
+                                   self._tokens + (now - self._updated) * self.qps)
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.qps
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Holds every caller back for the given number of seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class BulkResult(object):
+    """Outcome of a bulk submission or deletion.
+
+    :param names: name of each resource in the order of the specs, None for the
+        specs that failed
+    :param failures: list of (index of the spec, exception) tuples
+    """
+
+    def __init__(self, names, failures):
+        self.names = names
+        self.failures = failures
+
+    @property
+    def created(self):
+        """Names of the resources the calls succeeded for."""
+        return [name for name in self.names if name is not None]
+
+    @property
+    def succeeded(self):
+        return not self.failures
+
+    def __repr__(self):
+        return "BulkResult(created={}, failed={})".format(len(self.created),
+                                                          len(self.failures))
+
+
+def run_all(func, items, rate_limiter=None,
+            max_workers=constants.BULK_SUBMIT_MAX_WORKERS,
+            max_retries=constants.BULK_SUBMIT_MAX_RETRIES):
+    """Calls func on every item concurrently, within the rate limit, retrying
+    calls the API server throttles.
+
+    :param func: callable making one API call for an item and returning a name
+    :param items: the items
+    :param rate_limiter: TokenBucket to share with other callers, a new one if None
+    :param max_workers: number of concurrent calls
+    :param max_retries: times a call answered with 429 is retried
+    :returns: BulkResult
+
+    """
+    rate_limiter = rate_limiter or TokenBucket()
+
+    def call(item):
+        for attempt in range(max_retries + 1):
+            rate_limiter.acquire()
+            try:
+                return func(item)
+            except client.rest.ApiException as e:
+                if e.status != 429 or attempt == max_retries:
+                    raise
+                delay = _retry_after(e, attempt)
+                logger.info("API server throttled the call, retrying in {}s".format(delay))
+                rate_limiter.pause(delay)
+        return None
+
+    names = [None] * len(items)
+    failures = []
+    if not items:
+        return BulkResult(names, failures)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+        futures = [pool.submit(call, item) for item in items]
+        for index, future in enumerate(futures):
+            try:
+                names[index] = future.result()
+            except Exception as e:  #pylint:disable=broad-except
+                failures.append((index, e))
+    return BulkResult(names, failures)
+
+
+def _retry_after(e, attempt):
+    """Seconds to wait before retrying, from the Retry-After header if any."""
+    retry_after = (e.headers or {}).get('Retry-After')
+    try:
+        return max(1, int(retry_after))
+    except (TypeError, ValueError):
+        return min(2 ** attempt, constants.BULK_SUBMIT_MAX_BACKOFF_SECONDS)
@@ -0,0 +1,138 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Kinds kept by NamespaceCache, with their resource and the client model of their list.
+CACHED_KINDS = {
+    'secret': ('secrets', 'V1SecretList'),
+    'config_map': ('configmaps', 'V1ConfigMapList'),
+    'service_account': ('serviceaccounts', 'V1ServiceAccountList'),
+}
+
+# Asks the API server (1.15 or later) for the metadata of the objects only, so that
+# e.g. the data of secrets is neither transferred nor kept in memory. Older servers
+# fall back to plain JSON.
+METADATA_LIST_ACCEPT = ('application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,'
+                        'application/json')
+METADATA_WATCH_ACCEPT = ('application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1,'
+                         'application/json')
+
+_QUERY_PARAMS = {
+    'label_selector': 'labelSelector',
+    'field_selector': 'fieldSelector',
+    'resource_version': 'resourceVersion',
+    'timeout_seconds': 'timeoutSeconds',
+}
+
+
+def metadata_list_function(api_client, resource, list_type):
+    """A CoreV1Api-like namespaced list function fetching the metadata of the objects only.
+
+    It can be watched with kubernetes.watch.Watch, whose events then hold objects
+    of the kind with only their metadata set.
+
+    :param api_client: ApiClient to call
+    :param resource: plural resource name, e.g. 'secrets'
+    :param list_type: client model the listing is deserialized to, e.g. 'V1SecretList'
+    :returns: function of (namespace, watch=False, **kwargs)
+    """
+    def list_metadata(namespace, watch=False, _preload_content=True, **kwargs):
+        query_params = [(_QUERY_PARAMS[key], value) for key, value in kwargs.items()
+                        if value is not None]
+        if watch:
+            query_params.append(('watch', True))
+        return api_client.call_api(
+            '/api/v1/namespaces/{namespace}/' + resource, 'GET',
+            path_params={'namespace': namespace},
+            query_params=query_params,
+            header_params={'Accept': METADATA_WATCH_ACCEPT if watch else METADATA_LIST_ACCEPT},
+            response_type=list_type,
+            auth_settings=['BearerToken'],
+            _return_http_data_only=True,
+            _preload_content=_preload_content)
+    # kubernetes.watch.Watch finds the type of the watched objects in the docstring.
+    list_metadata.__doc__ = ":return: {}".format(list_type)
+    return list_metadata
+
+
+class NamespaceCache(object):
+    """Names of the secrets, config maps and service accounts of a namespace.
+
+    A background watch per kind keeps the names up to date, so that existence
+    checks are answered in memory; only the metadata of the objects is fetched.
+    Until a kind is listed, or if watching it fails (e.g. for lack of RBAC
+    permissions), contains() returns None and callers fall back to asking the
+    API server.
+
+    :param kube_manager: KubeManager whose client is watched
+    :param namespace: the namespace to cache
+    """
+
+    def __init__(self, kube_manager, namespace):
+        self.kube_manager = kube_manager
+        self.namespace = namespace
+        self._names = {}
+        self._lock = threading.Lock()
+        self._synced = {kind: threading.Event() for kind in CACHED_KINDS}
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Starts watching every cached kind in background threads."""
+        for kind, (resource, list_type) in CACHED_KINDS.items():
+            list_func = metadata_list_function(self.kube_manager.api_client, resource,
+                                               list_type)
+            thread = threading.Thread(
+                target=self._watch, args=(kind, list_func),
+                name='fairing-cache-{}-{}'.format(self.namespace, kind), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Stops the watches; contains() answers None from then on."""
+        self._stop.set()
+        with self._lock:
+            self._names = {}
+        for synced in self._synced.values():
+            synced.clear()
+
+    def wait_until_synced(self, timeout=None):
+        """Waits until every kind has been listed.
+
+        :param timeout: seconds to wait, None to wait forever
+        :returns: bool: True if every kind is synced
+        """
+        return all(synced.wait(timeout) for synced in self._synced.values())
+
+    def contains(self, kind, name):
+        """Whether an object of the kind with the name exists in the namespace.
+
+        :param kind: 'secret', 'config_map' or 'service_account'
+        :param name: name of the object
+        :returns: True or False, or None if the kind is not synced
+        """
+        with self._lock:
+            if not self._synced[kind].is_set():
+                return None
+            return name in self._names[kind]
+
+    def _watch(self, kind, list_func):
+        try:
+            for event_type, obj in self.kube_manager._watch_events(  #pylint:disable=protected-access
+                    list_func, self.namespace, stop=self._stop):
+                with self._lock:
+                    if self._stop.is_set():
+                        return
+                    if event_type == 'LISTED':
+                        self._names[kind] = {item.metadata.name for item in obj.items}
+                        self._synced[kind].set()
+                    elif event_type == 'DELETED':
+                        self._names[kind].discard(obj.metadata.name)
+                    else:
+                        self._names[kind].add(obj.metadata.name)
+        except Exception as e:  #pylint:disable=broad-except
+            logger.warning("Stopped caching {} names of namespace {}: {}".format(
+                kind, self.namespace, e))
+            self._synced[kind].clear()
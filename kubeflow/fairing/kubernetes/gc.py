@@ -0,0 +1,162 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes import bulk
+from kubeflow.fairing.kubernetes.manager import CUSTOM_JOB_KINDS, parse_time
+
+logger = logging.getLogger(__name__)
+
+# Labels of the jobs fairing creates: deployed trainings and image builds.
+COLLECTED_LABELS = (constants.FAIRING_DEPLOYER_LABEL, constants.FAIRING_BUILDER_LABEL)
+
+
+class GarbageCollector(object):
+    """Deletes the finished fairing jobs of a namespace once they are old enough.
+
+    Jobs are also given a ttlSecondsAfterFinished, but clusters without the TTL
+    controller ignore it, and jobs submitted before it was set have none. The
+    collector covers both: it lists the V1Jobs, TFJobs and PyTorchJobs labelled
+    fairing-deployer or fairing-builder a page at a time, and deletes those that
+    succeeded or failed more than max_age seconds ago with concurrent, rate
+    limited calls. Their pods are deleted in the background by the cluster.
+
+    :param kube_manager: KubeManager whose client lists and deletes the jobs
+    :param namespace: the namespace to collect
+    :param max_age: seconds since a job finished before it is deleted
+    :param interval: seconds between collections once started
+    :param rate_limiter: bulk.TokenBucket to share with other callers, a new one if None
+    """
+
+    def __init__(self, kube_manager, namespace, max_age=constants.GC_MAX_AGE_SECONDS,  #pylint:disable=too-many-arguments
+                 interval=constants.GC_INTERVAL_SECONDS, rate_limiter=None):
+        self.kube_manager = kube_manager
+        self.namespace = namespace
+        self.max_age = max_age
+        self.interval = interval
+        self.rate_limiter = rate_limiter or bulk.TokenBucket()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Collects every `interval` seconds in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='fairing-gc-' + self.namespace)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def collect(self):
+        """Deletes the jobs that finished more than max_age seconds ago.
+
+        :returns: bulk.BulkResult: names of the deleted jobs and the failures
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.max_age)
+        names, failures = [], []
+        for delete, expired in self._expired_batches(cutoff):
+            result = bulk.run_all(delete, expired, rate_limiter=self.rate_limiter)
+            failures.extend((len(names) + index, e) for index, e in result.failures)
+            names.extend(result.names)
+        if names:
+            logger.info("Deleted {} finished jobs of namespace {}".format(
+                len([name for name in names if name is not None]), self.namespace))
+        return bulk.BulkResult(names, failures)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.collect()
+                for _, e in result.failures:
+                    logger.warning("Could not delete a job of namespace {}: {}".format(
+                        self.namespace, e))
+            except Exception as e:  #pylint:disable=broad-except
+                logger.warning("Garbage collection of namespace {} failed: {}".format(
+                    self.namespace, e))
+            self._stop.wait(self.interval)
+
+    def _expired_batches(self, cutoff):
+        """Yields (delete function, names of expired jobs) per listed page."""
+        for label in COLLECTED_LABELS:
+            token = None
+            while True:
+                jobs = self.kube_manager.api_instance.list_namespaced_job(
+                    self.namespace, label_selector=label,
+                    limit=constants.GC_LIST_PAGE_SIZE, _continue=token)
+                expired = [job.metadata.name for job in jobs.items
+                           if _before(_job_finished_at(job), cutoff)]
+                if expired:
+                    yield self._delete_job, expired
+                token = jobs.metadata._continue  #pylint:disable=protected-access
+                if not token:
+                    break
+        custom_api = client.CustomObjectsApi(api_client=self.kube_manager.api_client)
+        for kind, (group, version, plural) in CUSTOM_JOB_KINDS.items():
+            try:
+                # CustomObjectsApi has no paging, the listing is split into batches.
+                jobs = custom_api.list_namespaced_custom_object(
+                    group, version, self.namespace, plural,
+                    label_selector=constants.FAIRING_DEPLOYER_LABEL)
+            except client.rest.ApiException as e:
+                if e.status == 404:
+                    # The operator of the kind is not installed.
+                    continue
+                raise
+            expired = [job['metadata']['name'] for job in jobs.get('items') or []
+                       if _before(_custom_job_finished_at(job), cutoff)]
+            for start in range(0, len(expired), constants.GC_LIST_PAGE_SIZE):
+                yield (self._custom_job_deleter(custom_api, kind),
+                       expired[start:start + constants.GC_LIST_PAGE_SIZE])
+
+    def _delete_job(self, name):
+        try:
+            self.kube_manager.api_instance.delete_namespaced_job(
+                name, self.namespace,
+                body=client.V1DeleteOptions(propagation_policy='Background'))
+        except client.rest.ApiException as e:
+            if e.status != 404:
+                raise
+        return name
+
+    def _custom_job_deleter(self, custom_api, kind):
+        group, version, plural = CUSTOM_JOB_KINDS[kind]
+
+        def delete(name):
+            try:
+                custom_api.delete_namespaced_custom_object(
+                    group, version, self.namespace, plural, name,
+                    client.V1DeleteOptions(propagation_policy='Background'))
+            except client.rest.ApiException as e:
+                if e.status != 404:
+                    raise
+            return name
+        return delete
+
+
+def _before(finished_at, cutoff):
+    return finished_at is not None and finished_at < cutoff
+
+
+def _job_finished_at(job):
+    """Time a V1Job completed or failed, None while it runs."""
+    status = job.status
+    for condition in (status and status.conditions) or []:
+        if condition.status == 'True' and condition.type in ('Complete', 'Failed'):
+            return status.completion_time or condition.last_transition_time
+    return None
+
+
+def _custom_job_finished_at(job):
+    """Time a TFJob or PyTorchJob succeeded or failed, None while it runs."""
+    status = job.get('status') or {}
+    for condition in status.get('conditions') or []:
+        if condition.get('status') == 'True' and \
+                condition.get('type') in (constants.JOB_SUCCEEDED, constants.JOB_FAILED):
+            return parse_time(status.get('completionTime') or
+                              condition.get('lastTransitionTime'))
+    return None
@@ -0,0 +1,221 @@
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+
+logger = logging.getLogger(__name__)
+
+
+def _identity(obj):
+    """(kind, name, labels) of a client model, or of a TFJob or PyTorchJob dict."""
+    if isinstance(obj, dict):
+        metadata = obj['metadata']
+        return obj.get('kind'), metadata['name'], metadata.get('labels')
+    return type(obj).__name__, obj.metadata.name, obj.metadata.labels
+
+
+class JobSubscription(object):
+    """Pods and job of one fairing deployment, as seen by a JobInformer.
+
+    `future` resolves to a JobResult once the job of the deployment succeeds or
+    fails: its V1Job, or its TFJob or PyTorchJob once the informer watches their kind.
+
+    :param fairing_id: value of the fairing-id label of the deployment
+    :param job_result: callable returning the JobResult of a finished V1Job given the
+        job and the time.time() the subscription started, None while it runs
+    :param callback: optional callable invoked with (event type, object) for every
+        change to the deployment's pods and job
+    """
+
+    def __init__(self, fairing_id, job_result, callback=None):
+        self.fairing_id = fairing_id
+        self.job_result = job_result
+        self.callback = callback
+        self.job = None
+        self.pods = {}
+        # Pods deleted while subscribed, e.g. before they could start.
+        self.deleted_pods = {}
+        # Number of changes seen, to wait for the next one.
+        self.changes = 0
+        self.future = Future()
+        self._start = time.time()
+        self._changed = threading.Condition()
+
+    @property
+    def status(self):
+        """JOB_SUCCEEDED or JOB_FAILED once finished, else the phases of the pods."""
+        if self.future.done():
+            return self.future.result().status
+        with self._changed:
+            return sorted(pod.status.phase for pod in self.pods.values()
+                          if pod.status is not None)
+
+    def wait(self, timeout=None):
+        """Waits for the deployment's job to finish.
+
+        :param timeout: seconds to wait, None waits forever
+        :returns: JobResult, None if the job is still running
+        """
+        try:
+            return self.future.result(timeout)
+        except FutureTimeoutError:
+            return None
+
+    def wait_for(self, predicate, timeout=None):
+        """Waits until predicate(subscription) returns a truthy value.
+
+        :param predicate: callable taking this subscription, called on every change
+        :param timeout: seconds to wait, None waits forever
+        :returns: the last value returned by predicate
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: predicate(self), timeout)
+
+    def _dispatch(self, event_type, obj):
+        with self._changed:
+            if isinstance(obj, (client.V1Job, dict)):
+                self.job = obj
+                result = self.job_result(obj, self._start)
+                if result is not None and not self.future.done():
+                    self.future.set_result(result)
+            elif event_type == 'DELETED':
+                self.pods.pop(obj.metadata.name, None)
+                self.deleted_pods[obj.metadata.name] = obj
+            else:
+                self.pods[obj.metadata.name] = obj
+            self.changes += 1
+            self._changed.notify_all()
+        if self.callback is not None:
+            try:
+                self.callback(event_type, obj)
+            except Exception as e:  #pylint:disable=broad-except
+                logger.warning("Callback of {} failed: {}".format(self.fairing_id, e))
+
+
+class JobInformer(object):
+    """One pod watch and one job watch of a namespace, shared by every fairing job.
+
+    Only objects labelled fairing-deployer are watched; their events are
+    dispatched to the JobSubscriptions of their fairing-id label, so that
+    following many jobs costs two watches, and one more per kind of custom job
+    watched with watch_custom_jobs.
+
+    :param kube_manager: KubeManager whose client is watched
+    :param namespace: the namespace to watch
+    """
+
+    def __init__(self, kube_manager, namespace):
+        self.kube_manager = kube_manager
+        self.namespace = namespace
+        # Reentrant, as subscriptions are replayed and their callbacks run with it held.
+        self._lock = threading.RLock()
+        # Latest objects per fairing-id, replayed to late subscribers.
+        self._objects = {}
+        self._subscriptions = {}
+        self._custom_kinds = set()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Starts the pod and job watches in background threads."""
+        self._start_watch(self.kube_manager.api_v1.list_namespaced_pod, client.V1Pod.__name__)
+        self._start_watch(self.kube_manager.api_instance.list_namespaced_job,
+                          client.V1Job.__name__)
+        return self
+
+    def watch_custom_jobs(self, kind):
+        """Also watches the TFJobs or PyTorchJobs of the namespace, so that the futures
+        of their subscriptions resolve once they finish. The watch is started once per kind.
+
+        :param kind: constants.TF_JOB_KIND or constants.PYTORCH_JOB_KIND
+        :returns: this informer
+        """
+        with self._lock:
+            if kind in self._custom_kinds:
+                return self
+            self._custom_kinds.add(kind)
+        self._start_watch(functools.partial(self.kube_manager.list_custom_jobs, kind), kind)
+        return self
+
+    def _start_watch(self, list_func, kind):
+        thread = threading.Thread(target=self._watch, args=(list_func, kind),
+                                  name='fairing-informer-' + self.namespace, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def subscribe(self, fairing_id, callback=None):
+        """Follows the pods and job of a deployment.
+
+        :param fairing_id: value of the fairing-id label of the deployment
+        :param callback: optional callable invoked with (event type, object) for every change
+        :returns: JobSubscription
+        """
+        subscription = JobSubscription(
+            fairing_id, self.kube_manager._job_result, callback)  #pylint:disable=protected-access
+        # Replayed under the lock: the watch threads store newer objects under it
+        # before dispatching them, so they cannot be overwritten by the replay.
+        with self._lock:
+            self._subscriptions.setdefault(fairing_id, []).append(subscription)
+            for obj in list(self._objects.get(fairing_id, {}).values()):
+                subscription._dispatch('ADDED', obj)  #pylint:disable=protected-access
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.fairing_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.fairing_id, None)
+
+    def _watch(self, list_func, kind):
+        while not self._stop.is_set():
+            try:
+                for event_type, obj in self.kube_manager._watch_events(  #pylint:disable=protected-access
+                        list_func, self.namespace, stop=self._stop,
+                        label_selector=constants.FAIRING_DEPLOYER_LABEL):
+                    if event_type == 'LISTED':
+                        self._sync(kind, obj['items'] if isinstance(obj, dict) else obj.items)
+                    else:
+                        self._handle(event_type, obj)
+            except Exception as e:  #pylint:disable=broad-except
+                logger.warning("Watch of namespace {} failed, restarting: {}".format(
+                    self.namespace, e))
+                self._stop.wait(constants.INFORMER_RESTART_SECONDS)
+
+    def _sync(self, kind, items):
+        """Handles a listing: objects of the kind missing from it were deleted meanwhile."""
+        listed = {(kind, _identity(item)[1]) for item in items}
+        with self._lock:
+            stale = [obj for objects in self._objects.values() for key, obj in objects.items()
+                     if key[0] == kind and key not in listed]
+        for obj in stale:
+            self._handle('DELETED', obj)
+        for item in items:
+            self._handle('ADDED', item)
+
+    def _handle(self, event_type, obj):
+        kind, name, labels = _identity(obj)
+        fairing_id = (labels or {}).get(constants.FAIRING_ID_LABEL)
+        if fairing_id is None:
+            return
+        key = (kind, name)
+        with self._lock:
+            objects = self._objects.setdefault(fairing_id, {})
+            if event_type == 'DELETED':
+                objects.pop(key, None)
+                if not objects:
+                    self._objects.pop(fairing_id, None)
+            else:
+                objects[key] = obj
+            subscriptions = list(self._subscriptions.get(fairing_id, []))
+        for subscription in subscriptions:
+            subscription._dispatch(event_type, obj)  #pylint:disable=protected-access
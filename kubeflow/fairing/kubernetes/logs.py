@@ -0,0 +1,174 @@
+import logging
+import os
+import threading
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+
+logger = logging.getLogger(__name__)
+
+FINISHED_PHASES = ('Succeeded', 'Failed')
+
+
+def timestamp_key(timestamp):
+    """Sortable form of an RFC 3339 timestamp of the kubelet, whose fraction
+    of a second has a variable number of digits."""
+    seconds, _, fraction = timestamp.rstrip('Z').partition('.')
+    return seconds, fraction.ljust(9, '0')
+
+
+class LogAggregator(object):
+    """Follows the logs of every replica pod of a distributed job at once.
+
+    Each pod is followed by a thread of its own as soon as it runs. Lines are
+    prefixed with the replica they come from, e.g. "[worker-1]", and optionally
+    written to one file per replica. The logs are requested with timestamps, so
+    that a stream that is resumed, because the connection dropped or the
+    container restarted, does not repeat the lines already seen.
+
+    :param kube_manager: KubeManager whose client reads the logs
+    :param namespace: namespace of the job
+    :param container: container of the pods whose logs are followed
+    :param replica_labels: pod labels naming the replica, joined with '-' in the prefix
+    :param output_dir: directory receiving a <replica>.log file per replica, None to not
+        write files
+    :param stream_logs: whether to print the lines (Default value = True)
+    :param line_handler: optional callable invoked with (replica, line) for every line
+    """
+
+    def __init__(self, kube_manager, namespace, container, replica_labels=(),  #pylint:disable=too-many-arguments
+                 output_dir=None, stream_logs=True, line_handler=None):
+        self.kube_manager = kube_manager
+        self.namespace = namespace
+        self.container = container
+        self.replica_labels = replica_labels
+        self.output_dir = output_dir
+        self.stream_logs = stream_logs
+        self.line_handler = line_handler
+        self._threads = {}
+        self._finished = set()
+        self._files = {}
+        self._changed = threading.Condition()
+        self._output_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def follow(self, fairing_id, replicas=1, timeout=None):
+        """Follows the logs of a deployment's pods until every replica's log ended.
+
+        :param fairing_id: value of the fairing-id label of the deployment
+        :param replicas: number of pods to follow before the logs can end
+        :param timeout: seconds to follow the logs, None for no limit
+        :returns: bool: True if every replica's log ended before the timeout
+        """
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        informer = self.kube_manager.job_informer(self.namespace)
+        subscription = informer.subscribe(fairing_id, callback=self._on_event)
+        try:
+            with self._changed:
+                return self._changed.wait_for(lambda: self._ended(replicas), timeout)
+        finally:
+            informer.unsubscribe(subscription)
+            self._stop.set()
+            with self._output_lock:
+                for f in self._files.values():
+                    f.close()
+                self._files = {}
+
+    def _ended(self, replicas):
+        return len(self._threads) >= replicas and len(self._finished) == len(self._threads)
+
+    def _on_event(self, event_type, obj):
+        if not isinstance(obj, client.V1Pod) or event_type == 'DELETED':
+            return
+        if obj.status is None or obj.status.phase not in ('Running',) + FINISHED_PHASES:
+            return
+        with self._changed:
+            if obj.metadata.name in self._threads or self._stop.is_set():
+                return
+            thread = threading.Thread(target=self._follow_pod,
+                                      args=(obj.metadata.name, self._replica(obj)),
+                                      name='fairing-log-' + obj.metadata.name, daemon=True)
+            self._threads[obj.metadata.name] = thread
+            thread.start()
+
+    def _replica(self, pod):
+        labels = pod.metadata.labels or {}
+        values = [labels[label] for label in self.replica_labels if label in labels]
+        return '-'.join(values) if values else pod.metadata.name
+
+    def _follow_pod(self, pod_name, replica):
+        """Streams a pod's log until the pod finished or is gone, across restarts."""
+        try:
+            restarts, last = None, None
+            while not self._stop.is_set():
+                try:
+                    pod = self.kube_manager.api_v1.read_namespaced_pod(pod_name, self.namespace)
+                except client.rest.ApiException as e:
+                    if e.status != 404:
+                        logger.error("error following logs of {} {}".format(pod_name, e))
+                    return
+                status = next((s for s in pod.status.container_statuses or []
+                               if s.name == self.container), None)
+                if status is not None and status.restart_count != restarts:
+                    # A new container: its log starts over.
+                    restarts, last = status.restart_count, None
+                if status is None or status.state.waiting:
+                    if pod.status.phase in FINISHED_PHASES:
+                        return
+                    self._stop.wait(constants.LOG_RETRY_SECONDS)
+                    continue
+                last = self._stream(pod_name, replica, last)
+                if pod.status.phase in FINISHED_PHASES:
+                    return
+                self._stop.wait(constants.LOG_RETRY_SECONDS)
+        finally:
+            with self._changed:
+                self._finished.add(pod_name)
+                self._changed.notify_all()
+
+    def _stream(self, pod_name, replica, since):
+        """Streams the current container's log, skipping the lines up to `since`.
+
+        :returns: timestamp key of the last line seen
+        """
+        try:
+            tail = self.kube_manager.api_v1.read_namespaced_pod_log(
+                pod_name, self.namespace, container=self.container, follow=True,
+                timestamps=True, _preload_content=False)
+        except client.rest.ApiException as e:
+            logger.warning("error getting logs of {} {}".format(pod_name, e))
+            return since
+        last = since
+        pending = b''
+        try:
+            for chunk in tail.stream(constants.LOG_STREAM_CHUNK_BYTES):
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    last = self._emit(replica, line, since, last)
+        finally:
+            tail.release_conn()
+        if pending:
+            last = self._emit(replica, pending, since, last)
+        return last
+
+    def _emit(self, replica, line, since, last):
+        timestamp, _, text = line.decode('utf8', errors='replace').partition(' ')
+        key = timestamp_key(timestamp)
+        if since is not None and key <= since:
+            return last
+        with self._output_lock:
+            if self._stop.is_set():
+                return key
+            if self.stream_logs:
+                print("[{}] {}".format(replica, text))
+            if self.output_dir:
+                if replica not in self._files:
+                    self._files[replica] = open(
+                        os.path.join(self.output_dir, replica + '.log'), 'a')
+                self._files[replica].write(text + '\n')
+        if self.line_handler is not None:
+            self.line_handler(replica, text)
+        return key
@@ -1,6 +1,8 @@
 import logging
+import threading
+import time
+import dateutil.parser
 import retrying
-import yaml
 
 from kubernetes import client, config, watch
 from kfserving import KFServingClient
@@ -8,7 +10,11 @@ from kfserving import KFServingClient
 from kubeflow.tfjob import TFJobClient
 from kubeflow.pytorchjob import PyTorchJobClient
 
-from kubeflow.fairing.utils import is_running_in_k8s, camel_to_snake
+from kubeflow.fairing.kubernetes import bulk
+from kubeflow.fairing.kubernetes.apply import Applier, ResourceResolver, parse_specs
+from kubeflow.fairing.kubernetes.cache import NamespaceCache
+from kubeflow.fairing.kubernetes.informer import JobInformer
+from kubeflow.fairing.utils import is_running_in_k8s
 from kubeflow.fairing.constants import constants
 from kubeflow.fairing import utils
 
@@ -16,6 +22,172 @@ logger = logging.getLogger(__name__)
 
 MAX_STREAM_BYTES = 1024
 
+def parse_time(value):
+    """datetime of an RFC 3339 time of a custom resource, None if value is None."""
+    return dateutil.parser.isoparse(value) if value else None
+
+
+# Group, version and plural of the training job kinds created through CustomObjectsApi.
+CUSTOM_JOB_KINDS = {
+    constants.TF_JOB_KIND: (constants.TF_JOB_GROUP, constants.TF_JOB_VERSION,
+                            constants.TF_JOB_PLURAL),
+    constants.PYTORCH_JOB_KIND: (constants.PYTORCH_JOB_GROUP, constants.PYTORCH_JOB_VERSION,
+                                 constants.PYTORCH_JOB_PLURAL),
+}
+
+# Clients shared by every KubeManager of the process, keyed by _client_key.
+_clients = {}
+_clients_lock = threading.Lock()
+# NamespaceCaches started by KubeManager.cache_namespace, keyed by (ApiClient, namespace).
+_namespace_caches = {}
+# JobInformers started by KubeManager.job_informer, keyed by (ApiClient, namespace).
+_job_informers = {}
+# ResourceResolvers of apply_namespaced_objects, keyed by ApiClient.
+_resolvers = {}
+
+
+def _stream_lines(tail, echo, line_handler):
+    """Prints a pod log stream and passes each of its lines to line_handler.
+
+    Chunks are split on newlines before they are decoded, so a multibyte
+    character cut by a chunk boundary is decoded whole.
+    """
+    pending = b''
+    try:
+        for chunk in tail.stream(MAX_STREAM_BYTES):
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                _emit_line(line, echo, line_handler)
+    finally:
+        tail.release_conn()
+    if pending:
+        _emit_line(pending, echo, line_handler)
+
+
+def _emit_line(line, echo, line_handler):
+    text = line.decode('utf8', errors='replace')
+    if echo:
+        print(text.rstrip())
+    if line_handler is not None:
+        line_handler(text)
+
+
+def _resource_version(obj):
+    """resourceVersion of a client model, or of a custom object read as a dict."""
+    if isinstance(obj, dict):
+        return obj['metadata'].get('resourceVersion')
+    return obj.metadata.resource_version
+
+
+def _client_key(config_file, context, client_configuration, verify_ssl):
+    return (config_file, context, client_configuration, verify_ssl)
+
+
+def get_api_client(config_file=None, context=None, client_configuration=None,
+                   persist_config=True, verify_ssl=True):
+    """Returns the process-wide ApiClient for a kubeconfig and context.
+
+    The kubeconfig is loaded and the client created on first use, so that every
+    deployer and builder of the process shares one connection pool.
+
+    :param config_file: kubeconfig file, defaults to ~/.kube/config, or the in-cluster
+        config when running in Kubernetes
+    :param context: kubernetes context
+    :param client_configuration: The kubernetes.client.Configuration to set configs to.
+    :param persist_config: If True, config file will be updated when changed
+    :param verify_ssl: use ssl verify or not, set in the client config
+    :returns: kubernetes.client.ApiClient
+    """
+    key = _client_key(config_file, context, client_configuration, verify_ssl)
+    with _clients_lock:
+        api_client = _clients.get(key)
+        if api_client is None:
+            if config_file or not is_running_in_k8s():
+                config.load_kube_config(
+                    config_file=config_file,
+                    context=context,
+                    client_configuration=client_configuration,
+                    persist_config=persist_config)
+            else:
+                config.load_incluster_config()
+            client_config = client.Configuration()
+            client_config.verify_ssl = verify_ssl
+            api_client = client.ApiClient(configuration=client_config)
+            _clients[key] = api_client
+        return api_client
+
+
+class JobResult(object):
+    """Outcome of waiting for a Job with KubeManager.wait_for_job.
+
+    :param name: name of the job
+    :param namespace: namespace of the job
+    :param status: constants.JOB_SUCCEEDED, constants.JOB_FAILED or constants.JOB_TIMED_OUT
+    :param reason: reason of the job's terminal condition, if any
+    :param message: message of the job's terminal condition, if any
+    :param start_time: datetime the job controller started the job
+    :param completion_time: datetime the job reached its terminal condition
+    :param elapsed: seconds spent waiting for the job
+    """
+
+    def __init__(self, name, namespace, status, reason=None, message=None,  #pylint:disable=too-many-arguments
+                 start_time=None, completion_time=None, elapsed=None):
+        self.name = name
+        self.namespace = namespace
+        self.status = status
+        self.reason = reason
+        self.message = message
+        self.start_time = start_time
+        self.completion_time = completion_time
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        return self.status == constants.JOB_SUCCEEDED
+
+    @property
+    def duration(self):
+        """Seconds between the start and the completion of the job, if known."""
+        if self.start_time is None or self.completion_time is None:
+            return None
+        return (self.completion_time - self.start_time).total_seconds()
+
+    def __repr__(self):
+        return "JobResult(name={!r}, status={!r}, reason={!r}, elapsed={!r})".format(
+            self.name, self.status, self.reason, self.elapsed)
+
+
+class JobStatus(object):
+    """Progress of a deployed job, as returned by the deployers' status().
+
+    :param name: name of the job
+    :param phase: latest phase reached, one of constants.JOB_PHASES or
+        constants.JOB_SUCCEEDED/JOB_FAILED
+    :param phase_times: list of (phase, datetime the phase was reached) tuples,
+        in order; a phase counts as reached once every pod of the job reached it
+    """
+
+    def __init__(self, name, phase, phase_times):
+        self.name = name
+        self.phase = phase
+        self.phase_times = phase_times
+
+    @property
+    def finished(self):
+        return self.phase in (constants.JOB_SUCCEEDED, constants.JOB_FAILED)
+
+    def durations(self):
+        """Seconds from each phase to the next one.
+
+        :returns: list of (phase, seconds) tuples
+        """
+        return [(phase, (end - start).total_seconds())
+                for (phase, start), (_, end) in zip(self.phase_times, self.phase_times[1:])]
+
+    def __repr__(self):
+        return "JobStatus(name={!r}, phase={!r})".format(self.name, self.phase)
+
 
 class KubeManager(object):
     """Handles communication with Kubernetes' client."""
@@ -29,29 +201,49 @@ class KubeManager(object):
         :param context: kubernetes context
         :param client_configuration: The kubernetes.client.Configuration to set configs to.
         :param persist_config: If True, config file will be updated when changed
+        :param verify_ssl: use ssl verify or not, set in the client config
         """
         self.config_file = config_file
         self.context = context
         self.client_configuration = client_configuration
         self.persist_config = persist_config
-        if config_file or not is_running_in_k8s():
-            config.load_kube_config(
-                config_file=self.config_file,
-                context=self.context,
-                client_configuration=self.client_configuration,
-                persist_config=self.persist_config)
-        else:
-            config.load_incluster_config()
-        
-        # not verify ssl
-        self.verify_ssl=verify_ssl
-        client_config=client.Configuration()
-        client_config.verify_ssl=self.verify_ssl
-        api_client=client.ApiClient(configuration=client_config)
-        self.api_instance = client.BatchV1Api(api_client=api_client)
-        self.api_v1 = client.CoreV1Api(api_client=api_client)
-        self.api_extension = client.ExtensionsV1beta1Api(api_client=api_client)
-        self.api_app = client.AppsV1Api(api_client=api_client)
+        self.verify_ssl = verify_ssl
+        self.api_client = get_api_client(
+            config_file=self.config_file,
+            context=self.context,
+            client_configuration=self.client_configuration,
+            persist_config=self.persist_config,
+            verify_ssl=self.verify_ssl)
+        self.api_instance = client.BatchV1Api(api_client=self.api_client)
+        self.api_v1 = client.CoreV1Api(api_client=self.api_client)
+        self.api_extension = client.ExtensionsV1beta1Api(api_client=self.api_client)
+        self.api_app = client.AppsV1Api(api_client=self.api_client)
+
+    def _crd_client(self, client_class):
+        """The process-wide client_class instance (e.g. TFJobClient) for this kubeconfig.
+
+        The CRD clients load the kubeconfig and create their own ApiClient when
+        constructed, so they are created once and rebound to the shared ApiClient.
+
+        :param client_class: TFJobClient, PyTorchJobClient or KFServingClient
+        :returns: the shared client_class instance
+        """
+        key = (client_class,) + _client_key(self.config_file, self.context,
+                                             self.client_configuration, self.verify_ssl)
+        with _clients_lock:
+            crd_client = _clients.get(key)
+            if crd_client is None:
+                crd_client = client_class(
+                    config_file=self.config_file,
+                    context=self.context,
+                    client_configuration=self.client_configuration,
+                    persist_config=self.persist_config)
+                for attr in ('custom_api', 'core_api', 'api_instance'):
+                    api = getattr(crd_client, attr, None)
+                    if api is not None:
+                        setattr(crd_client, attr, type(api)(api_client=self.api_client))
+                _clients[key] = crd_client
+            return crd_client
 
     def create_job(self, namespace, job):
         """Creates a V1Job in the specified namespace.
@@ -64,6 +256,105 @@ class KubeManager(object):
         # api_instance = client.BatchV1Api()
         return self.api_instance.create_namespaced_job(namespace, job)
 
+    def create_jobs(self, namespace, specs, rate_limiter=None,
+                    max_workers=constants.BULK_SUBMIT_MAX_WORKERS):
+        """Creates many V1Jobs, TFJobs and PyTorchJobs concurrently.
+
+        The calls share this manager's client, go through a client-side rate limiter
+        and are retried when the API server throttles them.
+
+        :param namespace: The namespace
+        :param specs: V1Job, V1TFJob or V1PyTorchJob specs, or dicts of them
+        :param rate_limiter: bulk.TokenBucket to share with other submissions, a new
+            one if None
+        :param max_workers: number of concurrent calls
+        :returns: bulk.BulkResult: names of the created jobs and the failures
+
+        """
+        custom_api = client.CustomObjectsApi(api_client=self.api_client)
+
+        def create(spec):
+            kind = spec.get('kind') if isinstance(spec, dict) else spec.kind
+            if kind in CUSTOM_JOB_KINDS:
+                group, version, plural = CUSTOM_JOB_KINDS[kind]
+                created = custom_api.create_namespaced_custom_object(
+                    group, version, namespace, plural, spec)
+                return created['metadata']['name']
+            return self.api_instance.create_namespaced_job(namespace, spec).metadata.name
+
+        return bulk.run_all(create, specs, rate_limiter=rate_limiter,
+                            max_workers=max_workers)
+
+    def read_custom_job(self, kind, name, namespace):
+        """Read a TFJob or PyTorchJob.
+
+        :param kind: constants.TF_JOB_KIND or constants.PYTORCH_JOB_KIND
+        :param name: The job name
+        :param namespace: The namespace
+        :returns: dict: the job, with its status
+
+        """
+        group, version, plural = CUSTOM_JOB_KINDS[kind]
+        return client.CustomObjectsApi(api_client=self.api_client).get_namespaced_custom_object(
+            group, version, namespace, plural, name)
+
+    def custom_job_result(self, kind, name, namespace):
+        """JobResult of a TFJob or PyTorchJob that succeeded or failed, None while it runs.
+
+        :param kind: constants.TF_JOB_KIND or constants.PYTORCH_JOB_KIND
+        :param name: The job name
+        :param namespace: The namespace
+        :returns: JobResult or None
+
+        """
+        return self._custom_job_result(self.read_custom_job(kind, name, namespace))
+
+    def list_custom_jobs(self, kind, namespace, **kwargs):
+        """List the TFJobs or PyTorchJobs of a namespace, or watch them.
+
+        :param kind: constants.TF_JOB_KIND or constants.PYTORCH_JOB_KIND
+        :param namespace: The namespace
+        :param kwargs: selectors and watch arguments passed to CustomObjectsApi
+        :returns: dict: the list of jobs
+
+        """
+        group, version, plural = CUSTOM_JOB_KINDS[kind]
+        return client.CustomObjectsApi(api_client=self.api_client).list_namespaced_custom_object(
+            group, version, namespace, plural, **kwargs)
+
+    @staticmethod
+    def _custom_job_result(job):
+        """JobResult of a TFJob or PyTorchJob dict in a terminal condition, else None."""
+        status = job.get('status') or {}
+        for condition in status.get('conditions') or []:
+            if condition.get('status') != 'True' or \
+                    condition.get('type') not in (constants.JOB_SUCCEEDED, constants.JOB_FAILED):
+                continue
+            completion_time = status.get('completionTime') or condition.get('lastTransitionTime')
+            return JobResult(
+                job['metadata']['name'], job['metadata'].get('namespace'), condition['type'],
+                reason=condition.get('reason'),
+                message=condition.get('message'),
+                start_time=parse_time(status.get('startTime')),
+                completion_time=parse_time(completion_time))
+        return None
+
+    def pod_event_time(self, pod_name, namespace, reason):
+        """Time of the latest event of a pod with the given reason, e.g. 'Pulled'.
+
+        :param pod_name: The pod name
+        :param namespace: The namespace
+        :param reason: reason of the event
+        :returns: datetime of the event, None if there is none
+
+        """
+        events = self.api_v1.list_namespaced_event(
+            namespace, field_selector='involvedObject.name=' + pod_name)
+        times = [event.last_timestamp or event.event_time for event in events.items
+                 if event.reason == reason]
+        times = [t for t in times if t is not None]
+        return max(times) if times else None
+
     def create_tf_job(self, namespace, tfjob):
         """Create the provided TFJob in the specified namespace.
         The TFJob version is defined in TF_JOB_VERSION in fairing.constants.
@@ -74,11 +365,7 @@ class KubeManager(object):
         :returns: object: Created TFJob.
 
         """
-        tfjob_client = TFJobClient(
-            config_file=self.config_file,
-            context=self.context,
-            client_configuration=self.client_configuration,
-            persist_config=self.persist_config)
+        tfjob_client = self._crd_client(TFJobClient)
         try:
             return tfjob_client.create(tfjob, namespace=namespace)
         except client.rest.ApiException:
@@ -95,11 +382,7 @@ class KubeManager(object):
         :returns: object: The deleted TFJob.
 
         """
-        tfjob_client = TFJobClient(
-            config_file=self.config_file,
-            context=self.context,
-            client_configuration=self.client_configuration,
-            persist_config=self.persist_config)
+        tfjob_client = self._crd_client(TFJobClient)
         return tfjob_client.delete(name, namespace=namespace)
 
 
@@ -113,11 +396,7 @@ class KubeManager(object):
         :returns: object: Created TFJob.
 
         """
-        pytorchjob_client = PyTorchJobClient(
-            config_file=self.config_file,
-            context=self.context,
-            client_configuration=self.client_configuration,
-            persist_config=self.persist_config)
+        pytorchjob_client = self._crd_client(PyTorchJobClient)
         try:
             return pytorchjob_client.create(pytorchjob, namespace=namespace)
         except client.rest.ApiException:
@@ -134,11 +413,7 @@ class KubeManager(object):
         :returns: object: The deleted PyTorchJob.
 
         """
-        pytorchjob_client = PyTorchJobClient(
-            config_file=self.config_file,
-            context=self.context,
-            client_configuration=self.client_configuration,
-            persist_config=self.persist_config)
+        pytorchjob_client = self._crd_client(PyTorchJobClient)
         return pytorchjob_client.delete(name, namespace=namespace)
 
     def create_deployment(self, namespace, deployment):
@@ -160,11 +435,7 @@ class KubeManager(object):
         :returns: object: Created InferenceService.
 
         """
-        KFServing = KFServingClient(
-            config_file=self.config_file,
-            context=self.context,
-            client_configuration=self.client_configuration,
-            persist_config=self.persist_config)
+        KFServing = self._crd_client(KFServingClient)
         try:
             created_isvc = KFServing.create(isvc, namespace=namespace)
             isvc_name = created_isvc['metadata']['name']
@@ -184,11 +455,7 @@ class KubeManager(object):
         :returns: object: The deleted InferenceService.
 
         """
-        KFServing = KFServingClient(
-            config_file=self.config_file,
-            context=self.context,
-            client_configuration=self.client_configuration,
-            persist_config=self.persist_config)
+        KFServing = self._crd_client(KFServingClient)
         return KFServing.delete(name, namespace=namespace)
 
     def delete_job(self, name, namespace):
@@ -227,10 +494,75 @@ class KubeManager(object):
         :returns: bool: True if the secret exists, otherwise return False.
 
         """
-        # secrets = client.CoreV1Api().list_namespaced_secret(namespace)
-        secrets = self.api_v1.list_namespaced_secret(namespace)
-        secret_names = [secret.metadata.name for secret in secrets.items]
-        return name in secret_names
+        return self._object_exists('secret', name, namespace)
+
+    def config_map_exists(self, name, namespace):
+        """Check if the config map exists in the specified namespace.
+
+        :param name: The config map name
+        :param namespace: The namespace
+        :returns: bool: True if the config map exists, otherwise return False.
+
+        """
+        return self._object_exists('config_map', name, namespace)
+
+    def service_account_exists(self, name, namespace):
+        """Check if the service account exists in the specified namespace.
+
+        :param name: The service account name
+        :param namespace: The namespace
+        :returns: bool: True if the service account exists, otherwise return False.
+
+        """
+        return self._object_exists('service_account', name, namespace)
+
+    def _object_exists(self, kind, name, namespace):
+        """Answers from the namespace's cache if one is synced, else reads the object."""
+        with _clients_lock:
+            cache = _namespace_caches.get((self.api_client, namespace))
+        if cache is not None:
+            cached = cache.contains(kind, name)
+            if cached is not None:
+                return cached
+        try:
+            getattr(self.api_v1, 'read_namespaced_' + kind)(name, namespace)
+        except client.rest.ApiException as e:
+            if e.status == 404:
+                return False
+            raise
+        return True
+
+    def cache_namespace(self, namespace, timeout=None):
+        """Keeps the names of the namespace's secrets, config maps and service accounts
+        in memory, for every KubeManager sharing this manager's ApiClient.
+
+        The names are watched in the background, and the existence checks used by
+        the credential mutators stop calling the API server.
+
+        :param namespace: The namespace
+        :param timeout: seconds to wait for the names to be listed, None to not wait
+        :returns: NamespaceCache: the namespace's cache
+
+        """
+        key = (self.api_client, namespace)
+        with _clients_lock:
+            cache = _namespace_caches.get(key)
+            if cache is None:
+                cache = _namespace_caches[key] = NamespaceCache(self, namespace).start()
+        if timeout is not None:
+            cache.wait_until_synced(timeout)
+        return cache
+
+    def uncache_namespace(self, namespace):
+        """Stops the cache started by cache_namespace, if any.
+
+        :param namespace: The namespace
+
+        """
+        with _clients_lock:
+            cache = _namespace_caches.pop((self.api_client, namespace), None)
+        if cache is not None:
+            cache.stop()
 
     def create_secret(self, namespace, secret):
         """Create secret in the specified namespace.
@@ -289,8 +621,179 @@ class KubeManager(object):
         except client.rest.ApiException as e:
             logger.error("error getting status for {} {}".format(name, str(e)))
 
-    @retrying.retry(wait_fixed=1000, stop_max_attempt_number=20)
-    def log(self, name, namespace, selectors=None, container='', follow=True):
+    def wait_for_job(self, name, namespace, timeout=None, stream_logs=True,  #pylint:disable=too-many-arguments
+                     container='', line_handler=None):
+        """Waits for a V1Job to succeed or fail, following it with a watch.
+
+        Logs of the job's pods are streamed from a separate thread while waiting,
+        so the wait ends as soon as the job reaches a terminal condition.
+
+        :param name: The job name
+        :param namespace: The job namespace
+        :param timeout: seconds to wait before giving up, None waits forever
+        :param stream_logs: whether to print the logs of the job's pods (Default value = True)
+        :param container: The container for which to stream logs
+        :param line_handler: optional callable invoked with every complete log line,
+            logs are followed for it even if stream_logs is False
+        :returns: JobResult: how the job ended
+
+        """
+        start = time.time()
+        deadline = start + timeout if timeout else None
+        done = threading.Event()
+        log_thread = None
+        if stream_logs or line_handler is not None:
+            log_thread = threading.Thread(
+                target=self._follow_job_logs,
+                args=(name, namespace, container, done, stream_logs, line_handler))
+            log_thread.daemon = True
+            log_thread.start()
+
+        result = None
+        try:
+            for job in self._watch_objects(self.api_instance.list_namespaced_job,
+                                           namespace, deadline=deadline,
+                                           field_selector='metadata.name=' + name):
+                result = self._job_result(job, start)
+                if result is not None:
+                    break
+        finally:
+            done.set()
+        if result is None:
+            result = JobResult(name, namespace, constants.JOB_TIMED_OUT,
+                               elapsed=time.time() - start)
+        if log_thread is not None:
+            log_thread.join(constants.LOG_DRAIN_TIMEOUT_SECONDS)
+        logger.info("Job %s finished: %s", name, result)
+        return result
+
+    @staticmethod
+    def _job_result(job, start):
+        """JobResult for a job in a terminal condition, None while it is running.
+
+        TFJobs and PyTorchJobs, watched as dicts, are handled as well.
+        """
+        if isinstance(job, dict):
+            result = KubeManager._custom_job_result(job)
+            if result is not None:
+                result.elapsed = time.time() - start
+            return result
+        for condition in (job.status and job.status.conditions) or []:
+            if condition.status != 'True' or condition.type not in ('Complete', 'Failed'):
+                continue
+            return JobResult(
+                job.metadata.name, job.metadata.namespace,
+                constants.JOB_SUCCEEDED if condition.type == 'Complete'
+                else constants.JOB_FAILED,
+                reason=condition.reason,
+                message=condition.message,
+                start_time=job.status.start_time,
+                completion_time=job.status.completion_time or
+                condition.last_transition_time,
+                elapsed=time.time() - start)
+        return None
+
+    def _watch_objects(self, list_func, namespace, deadline=None, stop=None, **kwargs):
+        """Yields the listed objects, then every change to them.
+
+        :param list_func: namespaced list function of the kubernetes client
+        :param namespace: The namespace
+        :param deadline: time.time() after which to stop, None for no deadline
+        :param stop: optional threading.Event that stops the watch once set
+        :param kwargs: selectors passed to list_func
+
+        """
+        for event_type, obj in self._watch_events(list_func, namespace, deadline=deadline,
+                                                   stop=stop, **kwargs):
+            if event_type == 'LISTED':
+                for item in obj.items:
+                    yield item
+            else:
+                yield obj
+
+    def _watch_events(self, list_func, namespace, deadline=None, stop=None, **kwargs):  #pylint:disable=too-many-arguments
+        """Yields ('LISTED', list) for each listing, then (event type, object) for every change.
+
+        Each watch resumes from the last seen resourceVersion, so no change is
+        missed between watches; the objects are listed again if that version has
+        expired.
+
+        :param list_func: namespaced list function of the kubernetes client
+        :param namespace: The namespace
+        :param deadline: time.time() after which to stop, None for no deadline
+        :param stop: optional threading.Event that stops the watch once set
+        :param kwargs: selectors passed to list_func
+
+        """
+        resource_version = None
+        while not (stop is not None and stop.is_set()):
+            if resource_version is None:
+                listed = list_func(namespace, **kwargs)
+                resource_version = _resource_version(listed)
+                yield 'LISTED', listed
+            timeout_seconds = constants.WATCH_TIMEOUT_SECONDS
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                timeout_seconds = max(1, int(min(timeout_seconds, remaining)))
+            w = watch.Watch()
+            try:
+                for event in w.stream(list_func, namespace,
+                                      resource_version=resource_version,
+                                      timeout_seconds=timeout_seconds, **kwargs):
+                    if event['type'] == 'ERROR':
+                        if event['raw_object'].get('code') == 410:
+                            resource_version = None
+                            break
+                        raise client.rest.ApiException(
+                            status=event['raw_object'].get('code'),
+                            reason=event['raw_object'].get('message'))
+                    obj = event['object']
+                    resource_version = _resource_version(obj)
+                    yield event['type'], obj
+                    if stop is not None and stop.is_set():
+                        return
+            except client.rest.ApiException as e:
+                if e.status != 410:
+                    raise
+                resource_version = None
+            finally:
+                w.stop()
+
+    def _follow_job_logs(self, name, namespace, container, done, stream_logs,  #pylint:disable=too-many-arguments
+                         line_handler):
+        """Streams the logs of every pod of a job once it has started, until done is set."""
+        followed = set()
+        try:
+            for pod in self._watch_objects(self.api_v1.list_namespaced_pod, namespace,
+                                           stop=done, label_selector='job-name=' + name):
+                if pod.metadata.name in followed or \
+                        pod.status.phase not in ('Running', 'Succeeded', 'Failed'):
+                    continue
+                followed.add(pod.metadata.name)
+                self._stream_pod_log(pod.metadata.name, namespace, container,
+                                     stream_logs, line_handler)
+                if done.is_set():
+                    return
+        except client.rest.ApiException as e:
+            logger.error("error following logs of {} {}".format(name, str(e)))
+
+    def _stream_pod_log(self, pod_name, namespace, container, stream_logs, line_handler):  #pylint:disable=too-many-arguments
+        """Follows the log of a pod, passing complete lines to line_handler."""
+        try:
+            tail = self.api_v1.read_namespaced_pod_log(pod_name,
+                                                       namespace,
+                                                       follow=True,
+                                                       _preload_content=False,
+                                                       container=container)
+        except client.rest.ApiException as e:
+            logger.error("error getting logs of {} {}".format(pod_name, str(e)))
+            return
+        _stream_lines(tail, stream_logs, line_handler)
+
+    def log(self, name, namespace, selectors=None, container='', follow=True,
+            line_handler=None):
         """Get log of the specified pod.
 
         :param name: The pod name
@@ -300,145 +803,150 @@ class KubeManager(object):
         :param container: The container for which to stream logs.
         :param if: there is one container in the pod
         :param follow: True or False (Default value = True)
+        :param line_handler: optional callable invoked with every complete log line
         :returns: str: logs of the specified pod.
 
+        """
+        tail = self._open_log(name, namespace, selectors, container, follow)
+        if tail:
+            _stream_lines(tail, True, line_handler)
+
+    @retrying.retry(wait_fixed=1000, stop_max_attempt_number=20)
+    def _open_log(self, name, namespace, selectors, container, follow):  #pylint:disable=too-many-arguments
+        """Waits for the pod and opens its log stream.
+
+        Only this is retried, so lines already passed to a line_handler are
+        never streamed again.
         """
         tail = ''
-        label_selector_str = ', '.join("{}={}".format(k, v) for (k, v) in selectors.items())
-        # v1 = client.CoreV1Api()
-        # Retry to allow starting of pod
-        w = watch.Watch()
         try:
-            for event in w.stream(self.api_v1.list_namespaced_pod,
-                                  namespace=namespace,
-                                  label_selector=label_selector_str):
-                pod = event['object']
-                logger.debug("Event: %s %s %s",
-                             event['type'],
-                             pod.metadata.name,
-                             pod.status.phase)
-                if pod.status.phase == 'Pending':
-                    logger.warning('Waiting for {} to start...'.format(pod.metadata.name))
-                    continue
-                elif ((pod.status.phase == 'Running'
-                       and pod.status.container_statuses[0].ready)
-                      or pod.status.phase == 'Succeeded'):
-                    logger.info("Pod started running %s",
-                                pod.status.container_statuses[0].ready)
-                    tail = self.api_v1.read_namespaced_pod_log(pod.metadata.name,
-                                                      namespace,
-                                                      follow=follow,
-                                                      _preload_content=False,
-                                                      pretty='pretty',
-                                                      container=container)
-                    break
-                elif (event['type'] == 'DELETED'
-                      or pod.status.phase == 'Failed'
-                      or pod.status.container_statuses[0].state.waiting):
-                    logger.error("Failed to launch %s, reason: %s, message: %s",
-                                 pod.metadata.name,
-                                 pod.status.container_statuses[0].state.terminated.reason,
-                                 pod.status.container_statuses[0].state.terminated.message)
-                    tail = self.api_v1.read_namespaced_pod_log(pod.metadata.name,
-                                                      namespace,
-                                                      follow=follow,
-                                                      _preload_content=False,
-                                                      pretty='pretty',
-                                                      container=container)
-                    break
+            pod = self._wait_for_log_pod(namespace, selectors or {})
+            if pod is not None:
+                tail = self.api_v1.read_namespaced_pod_log(pod.metadata.name,
+                                                           namespace,
+                                                           follow=follow,
+                                                           _preload_content=False,
+                                                           pretty='pretty',
+                                                           container=container)
         except ValueError as v:
             logger.error("error getting status for {} {}".format(name, str(v)))
         except client.rest.ApiException as e:
             logger.error("error getting status for {} {}".format(name, str(e)))
-        if tail:
-            try:
-                for chunk in tail.stream(MAX_STREAM_BYTES):
-                    print(chunk.rstrip().decode('utf8'))
-            finally:
-                tail.release_conn()
+        return tail
 
+    def _wait_for_log_pod(self, namespace, selectors):
+        """Waits for a pod matching the selectors to have logs to read.
 
-    def apply_namespaced_object(self, spec, mode='create'): #pylint:disable=too-many-branches
-        """Run apply on the provided Kubernetes specs.
-
-        :param specs: The YAML specs to apply.
-        :param mode: 4 valid modes: create, patch, replace and delete.
-        :returns: applied resources.
+        Pods of fairing deployments are followed through the namespace's shared
+        JobInformer, other pods with a watch of their own. A pod deleted before it
+        has logs is returned as well, so that the wait ends.
         """
-
-        if mode not in ['create', 'patch', 'replace', 'delete']:
-            raise ValueError("Unknown mode %s, "
-                             "valid modes: create, patch, replace and delete." % mode)
-
-        if not isinstance(spec, dict):
-            spec = yaml.load(spec)
-
-        try:
-            namespace = spec["metadata"]["namespace"]
-        except KeyError:
-            namespace = utils.get_default_target_namespace()
-
-        kind = spec["kind"]
-        kind_snake = camel_to_snake(kind)
-        plural = spec["kind"].lower() + "s"
-
-        if mode in ['patch', 'replace', 'delete']:
+        fairing_id = selectors.get(constants.FAIRING_ID_LABEL)
+        if fairing_id is not None:
+            informer = self.job_informer(namespace)
+            subscription = informer.subscribe(fairing_id)
             try:
-                name = spec["metadata"]["name"]
-            except Exception:
-                raise RuntimeError("Cannot get the name in the spec for the operation %s." % mode)
-
-        if not "/" in spec["apiVersion"]:
-            group = None
-        else:
-            group, version = spec["apiVersion"].split("/", 1)
-
-        if group is None or group.lower() == "apps":
-            if group is None:
-                api = client.CoreV1Api()
-            else:
-                api = client.AppsV1Api()
-            method_name = mode + "_namespaced_" + kind_snake
-            if mode == 'create':
-                method_args = [namespace, spec]
-            elif mode == 'delete':
-                method_args = [name, namespace]
-            else:
-                method_args = [name, namespace, spec]
-        else:
-            api = client.CustomObjectsApi()
-            method_name = mode + "_namespaced_custom_object"
-
-            if mode == 'create':
-                method_args = [group, version, namespace, plural, spec]
-            elif mode == 'delete':
-                method_args = [group, version, namespace, plural, name, client.V1DeleteOptions()]
-            else:
-                method_args = [group, version, namespace, plural, name, spec]
-
-        apply_method = getattr(api, method_name)
+                return subscription.wait_for(
+                    lambda sub: next((pod for pod in list(sub.pods.values())
+                                      if self._pod_has_logs(pod)),
+                                     next(iter(list(sub.deleted_pods.values())), None)))
+            finally:
+                informer.unsubscribe(subscription)
 
+        label_selector_str = ', '.join("{}={}".format(k, v) for (k, v) in selectors.items())
+        w = watch.Watch()
         try:
-            result = apply_method(*method_args)
-        except client.rest.ApiException as e:
-            raise RuntimeError(
-                "Exception when calling %s->%s: %s\n" % api, apply_method, e)
-
-        return result
+            for event in w.stream(self.api_v1.list_namespaced_pod,
+                                  namespace=namespace,
+                                  label_selector=label_selector_str):
+                pod = event['object']
+                if event['type'] == 'DELETED' or self._pod_has_logs(pod):
+                    return pod
+        finally:
+            w.stop()
+        return None
+
+    @staticmethod
+    def _pod_has_logs(pod):
+        """Whether the pod started or failed, so that its logs can be read."""
+        logger.debug("Pod %s %s", pod.metadata.name, pod.status.phase)
+        statuses = pod.status.container_statuses or []
+        if pod.status.phase == 'Pending':
+            logger.warning('Waiting for {} to start...'.format(pod.metadata.name))
+            return False
+        if (pod.status.phase == 'Succeeded'
+                or (pod.status.phase == 'Running' and statuses and statuses[0].ready)):
+            logger.info("Pod %s started running", pod.metadata.name)
+            return True
+        if pod.status.phase == 'Failed' or (statuses and statuses[0].state.waiting):
+            state = None
+            if statuses:
+                state = statuses[0].state.waiting or statuses[0].state.terminated
+            logger.error("Failed to launch %s, reason: %s, message: %s",
+                         pod.metadata.name,
+                         state.reason if state else None,
+                         state.message if state else None)
+            return True
+        return False
+
+    def job_informer(self, namespace):
+        """The JobInformer of the namespace, shared by every KubeManager using this
+        manager's ApiClient and started on first use.
+
+        Following any number of fairing jobs through it costs one pod watch and
+        one job watch of the namespace.
+
+        :param namespace: The namespace
+        :returns: JobInformer: subscribe to it with the fairing-id label of a deployment
 
+        """
+        key = (self.api_client, namespace)
+        with _clients_lock:
+            informer = _job_informers.get(key)
+            if informer is None:
+                informer = _job_informers[key] = JobInformer(self, namespace).start()
+        return informer
+
+    def apply_namespaced_object(self, spec, mode='create'):
+        """Run apply on the provided Kubernetes spec.
+
+        The resource is returned as a dict for every kind, core kinds included,
+        where client models such as V1Service used to be returned for those.
+        Likewise, a call the API server rejects raises a RuntimeError carrying the
+        ApiException's message, where the ApiException itself used to be raised.
+
+        :param spec: The YAML spec or dict to apply, holding a single document; use
+            apply_namespaced_objects for several.
+        :param mode: 5 valid modes: create, apply (server side), patch, replace and delete.
+        :returns: dict: the applied resource.
+        :raises RuntimeError: if the API server rejects the call.
+        :raises ValueError: if the spec holds several documents or the mode is unknown.
+        """
+        objects = parse_specs([spec])
+        if len(objects) != 1:
+            raise ValueError("Expected a single object to apply, got {}, use "
+                             "apply_namespaced_objects instead.".format(len(objects)))
+        return self.apply_namespaced_objects(objects, mode=mode)[0]
 
-    def apply_namespaced_objects(self, specs, mode='create'):
+    def apply_namespaced_objects(self, specs, mode='create', rate_limiter=None):
         """Run apply on the provided Kubernetes specs.
 
-        :param specs:  A list of strings or dicts providing the YAML specs to apply.
-        :param mode: 4 valid modes: create, patch, replace and delete.
-        :returns:
-
-        """
-        results = []
+        The specs are parsed once and applied tier by tier, namespaces and CRDs
+        first, each tier with concurrent calls; see apply.Applier. Objects without
+        a namespace go to the default target namespace.
 
-        for spec in specs:
-            result = self.apply_namespaced_object(spec, mode=mode)
-            results.append(result)
+        :param specs:  A list of strings or dicts providing the YAML specs to apply,
+            a string may hold several documents.
+        :param mode: 5 valid modes: create, apply (server side), patch, replace and delete.
+        :param rate_limiter: bulk.TokenBucket to share with other callers (Default value = None)
+        :returns: list of dicts: the applied resources, in the order of the specs.
 
-        return results
+        """
+        with _clients_lock:
+            resolver = _resolvers.get(self.api_client)
+            if resolver is None:
+                resolver = _resolvers[self.api_client] = ResourceResolver(self.api_client)
+        applier = Applier(self.api_client, resolver,
+                          default_namespace=utils.get_default_target_namespace(),
+                          rate_limiter=rate_limiter)
+        return applier.run(specs, mode=mode)
@@ -0,0 +1,142 @@
+"""Runs pod spec mutators, reusing the changes they made to earlier pod specs.
+
+Mutators such as add_gcp_credentials_if_exists ask the API server about the
+namespace every time they run. The first time a mutator runs for a namespace,
+the change it makes to the pod spec is recorded as a patch; for the next
+MUTATOR_CACHE_TTL_SECONDS the patch is applied instead of running the mutator,
+so repeated deploys make no discovery calls. Lists the mutator appended to, e.g.
+env or volumes, are extended rather than replaced.
+
+Mutators whose change depends on the pod spec they get, and not only on the
+namespace, are marked with @pod_spec_dependent; their patches are only reused
+for identical pod specs.
+"""
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+
+logger = logging.getLogger(__name__)
+
+_api_client = client.ApiClient()
+# (patch, time it expires) keyed by _cache_key.
+_patches = {}
+_patches_lock = threading.Lock()
+_DELETED = object()
+
+
+def pod_spec_dependent(mutator):
+    """Marks a mutator whose change depends on the pod spec it gets."""
+    mutator.depends_on_pod_spec = True
+    return mutator
+
+
+def clear_cache():
+    """Forgets every recorded patch, e.g. after changing the namespace's secrets."""
+    with _patches_lock:
+        _patches.clear()
+
+
+def run_mutators(kube_manager, pod_spec, namespace, mutators,
+                 ttl=constants.MUTATOR_CACHE_TTL_SECONDS):
+    """Applies the mutators to the pod spec in place, in order.
+
+    :param kube_manager: KubeManager passed to the mutators
+    :param pod_spec: V1PodSpec to mutate
+    :param namespace: namespace the pod spec is deployed to
+    :param mutators: callables taking (kube_manager, pod_spec, namespace)
+    :param ttl: seconds a recorded patch is reused, 0 to always run the mutators
+    """
+    for mutator in mutators:
+        before = _api_client.sanitize_for_serialization(pod_spec)
+        key = _cache_key(kube_manager, mutator, namespace, before)
+        now = time.time()
+        with _patches_lock:
+            patch, expires = _patches.get(key, (None, 0))
+        if ttl and expires > now:
+            logger.debug("Reusing the changes of mutator {}".format(mutator))
+            if patch is not None:
+                _set_pod_spec(pod_spec, _apply(before, patch))
+            continue
+        mutator(kube_manager, pod_spec, namespace)
+        if ttl:
+            patch = _diff(before, _api_client.sanitize_for_serialization(pod_spec))
+            with _patches_lock:
+                for stale in [k for k, (_, expiry) in _patches.items() if expiry <= now]:
+                    del _patches[stale]
+                _patches[key] = (patch, now + ttl)
+
+
+def _cache_key(kube_manager, mutator, namespace, pod_spec):
+    key = (mutator, getattr(kube_manager, 'api_client', None), namespace)
+    if getattr(mutator, 'depends_on_pod_spec', False):
+        spec = json.dumps(pod_spec, sort_keys=True).encode('utf8')
+        key += (hashlib.sha256(spec).hexdigest(),)
+    return key
+
+
+def _set_pod_spec(pod_spec, data):
+    """Replaces the fields of pod_spec with those of the serialized data."""
+    patched = _api_client._ApiClient__deserialize(data, 'V1PodSpec')  #pylint:disable=protected-access
+    for attr in client.V1PodSpec.swagger_types:
+        setattr(pod_spec, attr, getattr(patched, attr))
+
+
+def _diff(before, after):
+    """Patch turning before into after, None if they are equal.
+
+    Patches are ('set', value), ('delete',), ('extend', items), ('dict', {key: patch})
+    or ('list', {index: patch}).
+    """
+    if before == after:
+        return None
+    if isinstance(after, dict) and isinstance(before, (dict, type(None))):
+        before = before or {}
+        patches = {}
+        for key in set(before) | set(after):
+            if key not in after:
+                patches[key] = ('delete',)
+            else:
+                patch = _diff(before.get(key), after[key])
+                if patch is not None:
+                    patches[key] = patch
+        return ('dict', patches)
+    if isinstance(after, list) and isinstance(before, (list, type(None))):
+        before = before or []
+        if len(before) == len(after):
+            return ('list', {index: _diff(old, new)
+                             for index, (old, new) in enumerate(zip(before, after))
+                             if old != new})
+        if len(after) > len(before) and after[:len(before)] == before:
+            return ('extend', after[len(before):])
+    return ('set', after)
+
+
+def _apply(value, patch):
+    op = patch[0]
+    if op == 'set':
+        return copy.deepcopy(patch[1])
+    if op == 'delete':
+        return _DELETED
+    if op == 'extend':
+        return list(value or []) + copy.deepcopy(patch[1])
+    if op == 'dict':
+        value = dict(value or {})
+        for key, key_patch in patch[1].items():
+            patched = _apply(value.get(key), key_patch)
+            if patched is _DELETED:
+                value.pop(key, None)
+            else:
+                value[key] = patched
+        return value
+    value = list(value or [])
+    for index, item_patch in patch[1].items():
+        if index < len(value):
+            value[index] = _apply(value[index], item_patch)
+    return value
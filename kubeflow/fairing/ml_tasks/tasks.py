@@ -1,7 +1,15 @@
+import copy
 import logging
 import json
+import time
+import uuid
 import numpy as np
+from kubernetes import client as k8s_client
+from kubeflow.fairing import executor
 from kubeflow.fairing.backends import KubernetesBackend
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.deployers.job.job import Job
+from kubeflow.fairing.ml_tasks import tensor
 from kubeflow.fairing.ml_tasks.utils import guess_preprocessor
 
 import requests
@@ -79,10 +87,215 @@ class TrainJob(BaseTask):
     def submit(self):
         """Submit a train job. """
         self._build()
+        self.builder.progress.update(executor.DEPLOYING)
         deployer = self._backend.get_training_deployer(
             pod_spec_mutators=self._pod_spec_mutators)
         return deployer.deploy(self.pod_spec)
 
+    def submit_async(self):
+        """Build and submit the train job on the shared background executor.
+
+        :returns: a concurrent.futures.Future of the submitted job's name, its
+            `progress` attribute tells which stage the submission is in
+
+        """
+        return executor.submit(self.submit, progress=self.builder.progress)
+
+
+class Sweep(BaseTask):
+    """Run one training entry point with many parameterizations.
+
+    The image is built and pushed once; every trial runs it as a separate Job, or
+    as a pod of one Indexed-completion Job, and reads its parameters with
+    kubeflow.fairing.utils.get_trial_params(), or from the FAIRING_TRIAL_PARAMS
+    environment variable (JSON) or FAIRING_TRIAL_PARAMS_FILE file if fairing is
+    not installed in the image. Trials report their result with
+    kubeflow.fairing.utils.report_trial_result(), gathered by results().
+
+    :param entry_point: An object or reference to the source code that has to be deployed.
+    :param params: list of dicts of JSON serializable parameters, one per trial.
+    :param params_source: how parameters reach the trials, 'env' to set them as
+           environment variables or 'configmap' to mount them from a ConfigMap, which
+           suits large parameter sets (Default value = 'env')
+    :param indexed: submit the trials as the pods of a single Indexed-completion Job,
+           one API call instead of one per trial, with parameters from a ConfigMap
+           whatever params_source is; a failed trial then fails the whole job and the
+           cluster must run Kubernetes 1.21 or later (Default value = False)
+    :param parallelism: number of trials of an indexed sweep running at once, all
+           of them if None
+    """
+
+    def __init__(self, entry_point, params, base_docker_image=None, docker_registry=None,  # pylint:disable=too-many-arguments
+                 input_files=None, backend=None, pod_spec_mutators=None, params_source='env',
+                 indexed=False, parallelism=None):
+        if params_source not in ('env', 'configmap'):
+            raise ValueError("params_source must be 'env' or 'configmap', got {}"
+                             .format(params_source))
+        self.params = list(params)
+        self.params_source = params_source
+        self.indexed = indexed
+        self.parallelism = parallelism
+        self.sweep_id = str(uuid.uuid1())
+        self.config_map_name = None
+        self.job_names = []
+        self._deployer = None
+        super().__init__(entry_point, base_docker_image, docker_registry,
+                         input_files, backend, pod_spec_mutators)
+
+    def submit(self):
+        """Build the image once and submit one train job per trial, or a single
+        indexed job running every trial.
+
+        The jobs are created concurrently, see Job.deploy_all and Job.deploy_indexed.
+
+        :returns: list of the submitted jobs' names, in the order of params for
+            one job per trial
+
+        """
+        deployer = self._backend.get_training_deployer(
+            pod_spec_mutators=self._pod_spec_mutators)
+        # Checked before building: trials are Kubernetes Jobs, which e.g. the
+        # GCPManagedBackend's deployer does not create.
+        if not isinstance(deployer, Job):
+            raise ValueError("Sweep needs a backend deploying Kubernetes Jobs, {} deploys with {}"
+                             .format(type(self._backend).__name__, type(deployer).__name__))
+        self._build()
+        self.builder.progress.update(executor.DEPLOYING)
+        self._deployer = deployer
+        # Trials run concurrently, so their logs are not streamed one after the other.
+        deployer.stream_log = False
+        deployer.labels[constants.SWEEP_LABEL] = self.sweep_id
+        if self.indexed:
+            self.job_names = [deployer.deploy_indexed(self.pod_spec, self.params,
+                                                      parallelism=self.parallelism)]
+            return self.job_names
+        if self.params_source == 'configmap':
+            self._create_config_map(deployer)
+
+        result = deployer.deploy_all(
+            [self._trial_pod_spec(index, trial_params)
+             for index, trial_params in enumerate(self.params)],
+            labels=[{constants.SWEEP_TRIAL_LABEL: str(index)}
+                    for index in range(len(self.params))])
+        if self.params_source == 'configmap':
+            self._own_config_map(deployer, result.created)
+        if not result.succeeded:
+            raise RuntimeError("Failed to submit {} of the {} trials of sweep {}: {}".format(
+                len(result.failures), len(self.params), self.sweep_id, result.failures[0][1]))
+        logger.warning("Submitted {} trials of sweep {}".format(len(result.names),
+                                                                self.sweep_id))
+        self.job_names = result.names
+        return result.names
+
+    def submit_async(self):
+        """Build and submit the sweep on the shared background executor.
+
+        :returns: a concurrent.futures.Future of the submitted jobs' names, its
+            `progress` attribute tells which stage the submission is in
+
+        """
+        return executor.submit(self.submit, progress=self.builder.progress)
+
+    def results(self, timeout=None):
+        """Wait for the submitted trials to finish and gather their results.
+
+        :param timeout: seconds to wait for the trials, None waits forever
+        :returns: list of what each trial reported with
+            kubeflow.fairing.utils.report_trial_result(), in the order of params,
+            None for the trials that did not succeed or reported nothing
+
+        """
+        if self._deployer is None:
+            raise RuntimeError("Sweep {} was not submitted".format(self.sweep_id))
+        manager = self._deployer.backend
+        namespace = self._deployer.namespace
+        deadline = time.time() + timeout if timeout is not None else None
+        for name in self.job_names:
+            remaining = max(deadline - time.time(), 1) if deadline is not None else None
+            manager.wait_for_job(name, namespace, timeout=remaining, stream_logs=False)
+
+        results = [None] * len(self.params)
+        pods = manager.api_v1.list_namespaced_pod(
+            namespace, label_selector="{}={}".format(constants.SWEEP_LABEL, self.sweep_id))
+        for pod in pods.items:
+            index = self._trial_index(pod)
+            if pod.status.phase != 'Succeeded' or index is None:
+                continue
+            log = manager.api_v1.read_namespaced_pod_log(
+                pod.metadata.name, namespace, container=pod.spec.containers[0].name)
+            reported = [line[len(constants.SWEEP_TRIAL_RESULT_PREFIX):]
+                        for line in log.splitlines()
+                        if line.startswith(constants.SWEEP_TRIAL_RESULT_PREFIX)]
+            if reported:
+                results[index] = json.loads(reported[-1])
+        return results
+
+    @staticmethod
+    def _trial_index(pod):
+        """Index of the trial a pod ran, from its labels or its completion index."""
+        index = (pod.metadata.labels or {}).get(constants.SWEEP_TRIAL_LABEL)
+        if index is None:
+            index = (pod.metadata.annotations or {}).get(
+                constants.JOB_COMPLETION_INDEX_ANNOTATION)
+        return int(index) if index is not None else None
+
+    def _create_config_map(self, deployer):
+        """Create a ConfigMap holding the parameters of every trial."""
+        config_map = k8s_client.V1ConfigMap(
+            metadata=k8s_client.V1ObjectMeta(
+                generate_name=constants.SWEEP_CONFIG_MAP_DEFAULT_NAME,
+                labels={constants.SWEEP_LABEL: self.sweep_id}),
+            data={"trial-{}.json".format(index): json.dumps(trial_params)
+                  for index, trial_params in enumerate(self.params)})
+        created = deployer.backend.api_v1.create_namespaced_config_map(deployer.namespace,
+                                                                       config_map)
+        self.config_map_name = created.metadata.name
+
+    def _own_config_map(self, deployer, job_names):
+        """Make the created trial jobs own the parameters' ConfigMap, so that it is
+        garbage collected with the last of them, or delete it if none was created."""
+        manager = deployer.backend
+        if not job_names:
+            manager.api_v1.delete_namespaced_config_map(self.config_map_name,
+                                                        deployer.namespace)
+            return
+        # bulk.run_all only keeps the names, the uids come from a single list call.
+        jobs = manager.api_instance.list_namespaced_job(
+            deployer.namespace,
+            label_selector="{}={}".format(constants.SWEEP_LABEL, self.sweep_id))
+        owners = [{'apiVersion': 'batch/v1', 'kind': 'Job', 'name': job.metadata.name,
+                   'uid': job.metadata.uid}
+                  for job in jobs.items if job.metadata.name in job_names]
+        manager.api_v1.patch_namespaced_config_map(
+            self.config_map_name, deployer.namespace,
+            {'metadata': {'ownerReferences': owners}})
+
+    def _trial_pod_spec(self, index, trial_params):
+        """Copy of the built pod spec carrying the parameters of one trial."""
+        pod_spec = copy.deepcopy(self.pod_spec)
+        container = pod_spec.containers[0]
+        env = [k8s_client.V1EnvVar(name=constants.SWEEP_TRIAL_INDEX_ENV, value=str(index))]
+        if self.params_source == 'configmap':
+            params_file = "{}/{}".format(constants.SWEEP_PARAMS_MOUNT_PATH,
+                                         constants.SWEEP_PARAMS_FILE_NAME)
+            env.append(k8s_client.V1EnvVar(name=constants.SWEEP_PARAMS_FILE_ENV,
+                                           value=params_file))
+            pod_spec.volumes = (pod_spec.volumes or []) + [k8s_client.V1Volume(
+                name='fairing-trial-params',
+                config_map=k8s_client.V1ConfigMapVolumeSource(
+                    name=self.config_map_name,
+                    items=[k8s_client.V1KeyToPath(key="trial-{}.json".format(index),
+                                                  path=constants.SWEEP_PARAMS_FILE_NAME)]))]
+            container.volume_mounts = (container.volume_mounts or []) + [
+                k8s_client.V1VolumeMount(name='fairing-trial-params',
+                                         mount_path=constants.SWEEP_PARAMS_MOUNT_PATH,
+                                         read_only=True)]
+        else:
+            env.append(k8s_client.V1EnvVar(name=constants.SWEEP_PARAMS_ENV,
+                                           value=json.dumps(trial_params)))
+        container.env = (container.env or []) + env
+        return pod_spec
+
 
 class PredictionEndpoint(BaseTask):
     """Create a prediction endpoint. """
@@ -105,25 +318,47 @@ class PredictionEndpoint(BaseTask):
         self.url = self._deployer.deploy(self.pod_spec)
         logger.warning("Prediction endpoint: {}".format(self.url))
 
-    def predict_nparray(self, data, feature_names=None):
+    def predict_nparray(self, data, feature_names=None, binary=False,
+                        timeout=constants.PREDICT_TIMEOUT_SECONDS):
         """Return the prediction result.
 
+        With binary set, the array is sent as the Seldon binData of the request,
+        encoded in the .npy format by kubeflow.fairing.ml_tasks.tensor without
+        converting its elements to Python floats. The model receives the bytes and
+        reads them with numpy.load(io.BytesIO(X)); if it answers with .npy bytes too
+        (e.g. written by numpy.save), the prediction is decoded straight into an array.
+
         :param data: Data to be predicted.
-        :param feature_names: Feature extracted from data (Default value = None)
+        :param feature_names: Feature extracted from data, only sent with JSON values
+               (Default value = None)
+        :param binary: send the data as a binary tensor rather than JSON values
+               (Default value = False)
+        :param timeout: seconds to wait for the endpoint to connect and to answer,
+               None waits forever (Default value = constants.PREDICT_TIMEOUT_SECONDS)
+        :returns: the endpoint's JSON response, or a numpy.ndarray when it answered
+                  with binData
 
         """
-        pdata = {
-            "data": {
-                "names": feature_names,
-                "tensor": {
-                    "shape": np.asarray(data.shape).tolist(),
-                    "values": data.flatten().tolist(),
-                },
+        if binary:
+            pdata = tensor.encode_bin_data(data)
+            # A JSON body, form encoding would escape a large part of the base64 text.
+            r = requests.post(self.url, json=pdata, timeout=timeout)
+        else:
+            pdata = {
+                "data": {
+                    "names": feature_names,
+                    "tensor": {
+                        "shape": np.asarray(data.shape).tolist(),
+                        "values": data.flatten().tolist(),
+                    },
+                }
             }
-        }
-        serialized_data = json.dumps(pdata)
-        r = requests.post(self.url, data={'json': serialized_data})
-        return json.loads(r.text)
+            serialized_data = json.dumps(pdata)
+            r = requests.post(self.url, data={'json': serialized_data}, timeout=timeout)
+        result = json.loads(r.text)
+        if isinstance(result, dict) and "binData" in result:
+            return tensor.decode_bin_data(result)
+        return result
 
     def delete(self):
         """Delete prediction endpoint. """
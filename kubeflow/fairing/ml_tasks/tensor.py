@@ -0,0 +1,58 @@
+"""Binary encoding of NumPy arrays sent to and received from prediction endpoints.
+
+Arrays are encoded in the standard .npy format: a short header holding the
+dtype, always little-endian, and the shape, followed by the raw buffer. A model
+served without fairing installed can read them with
+numpy.load(io.BytesIO(X)), and return numpy.save output the same way.
+"""
+import base64
+import io
+
+import numpy as np
+
+
+def encode_tensor(array):
+    """Encode an array without converting its elements to Python objects.
+
+    The array's buffer is copied once, into the returned bytes after the header.
+
+    :param array: array-like to encode
+    :returns: bytes in the .npy format
+    """
+    array = np.asarray(array)
+    if not array.flags.c_contiguous:
+        array = array.copy(order='C')
+    if array.dtype.hasobject:
+        raise TypeError("Arrays of Python objects cannot be sent as binary tensors")
+    if array.dtype.byteorder == '>':
+        array = array.astype(array.dtype.newbyteorder('<'))
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(array))
+    return header.getvalue() + memoryview(array.reshape(-1).view(np.uint8))
+
+
+def decode_tensor(buffer):
+    """Decode an array encoded by encode_tensor, without copying its data.
+
+    :param buffer: bytes-like in the .npy format
+    :returns: a read-only numpy.ndarray backed by the buffer
+    """
+    stream = io.BytesIO(buffer)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    array = np.frombuffer(buffer, dtype=dtype, offset=stream.tell(),
+                          count=int(np.prod(shape, dtype=np.int64)))
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def encode_bin_data(array):
+    """Seldon request holding an encoded array as binData."""
+    return {"binData": base64.b64encode(encode_tensor(array)).decode('ascii')}
+
+
+def decode_bin_data(response):
+    """Array held by the binData of a Seldon response."""
+    return decode_tensor(base64.b64decode(response["binData"]))
@@ -1,3 +1,4 @@
+import gzip
 import os
 import tarfile
 import logging
@@ -109,12 +110,17 @@ class BasePreProcessor(object):
             _, output_file = tempfile.mkstemp(prefix="/tmp/fairing_context_")
         logging.info("Creating docker context: %s", output_file)
         self.input_files = self.preprocess()
-        with tarfile.open(output_file, "w:gz", dereference=True) as tar:
-            for dst, src in self.context_map().items():
+        # The gzip header gets no file name nor mtime and the members are sorted, so an
+        # unchanged context gets the same checksum and is not uploaded again.
+        with open(output_file, 'wb') as raw, \
+                gzip.GzipFile(filename='', fileobj=raw, mode='wb', mtime=0) as gz, \
+                tarfile.open(fileobj=gz, mode='w', dereference=True) as tar:
+            for dst, src in sorted(self.context_map().items()):
                 logging.debug("Context: %s, Adding %s at %s", output_file,
                               src, dst)
                 # tar.add(src, filter=reset_tar_mtime, arcname=dst, recursive=False)
-                tar.add(src, filter=reset_tar_mtime, arcname=dst, recursive=True if os.path.isdir(src) else False)
+                tar.add(src, filter=reset_tar_mtime, arcname=dst,
+                        recursive=os.path.isdir(src))
         self._context_tar_path = output_file
         return output_file, utils.crc(self._context_tar_path)
 
@@ -1,8 +1,12 @@
+import hashlib
+import json
 import os
 import zlib
 import uuid
 import re
 
+from kubeflow.fairing.constants import constants
+
 def get_image(repository, name):
     """Get the full image name by integrating repository and image name.
 
@@ -44,6 +48,38 @@ def crc(file_name):
         prev = zlib.crc32(eachLine, prev)
     return "%X" % (prev & 0xFFFFFFFF)
 
+def sha256(file_name):
+    """Compute the sha256 hex digest of a file, reading it in chunks.
+
+    :param file_name: The file name that's for sha256 checksum.
+
+    """
+    sha = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def get_trial_params():
+    """Get the parameters of the current sweep trial.
+
+    :returns: dict of the trial's parameters, empty when not running in a sweep.
+
+    """
+    params_file = os.environ.get(constants.SWEEP_PARAMS_FILE_ENV)
+    if params_file:
+        with open(params_file) as f:
+            return json.load(f)
+    return json.loads(os.environ.get(constants.SWEEP_PARAMS_ENV, '{}'))
+
+def report_trial_result(result):
+    """Report the result of the current sweep trial, gathered by Sweep.results().
+
+    :param result: JSON serializable result, e.g. a dict of metrics.
+
+    """
+    print(constants.SWEEP_TRIAL_RESULT_PREFIX + json.dumps(result), flush=True)
+
 def random_tag():
     """Get a random tag."""
     return str(uuid.uuid4()).split('-')[0]
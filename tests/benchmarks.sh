@@ -0,0 +1,9 @@
+#!/bin/bash
+
+# Run the build/push benchmarks against the in-process fake registry.
+# Results are appended as JSON lines to $FAIRING_BENCHMARK_OUTPUT if set.
+
+python setup.py install
+pip install --upgrade pytest
+
+pytest -s tests/benchmarks
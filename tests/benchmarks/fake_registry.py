@@ -0,0 +1,359 @@
+"""An in-process stand-in for a Docker Registry v2 API.
+
+Implements the subset of the API used by containerregistry and the fairing
+builders: ping, bearer token exchange, blob HEAD/GET, chunked (POST/PATCH/PUT)
+and monolithic uploads, cross-repository mounts, manifests, tags/list and
+_catalog, whose listings carry an ETag and are answered with 304 when
+revalidated. Latency and bandwidth can be configured to model a remote registry.
+"""
+import collections
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MANIFEST_MIME = 'application/vnd.docker.distribution.manifest.v2+json'
+CONFIG_MIME = 'application/vnd.docker.container.image.v1+json'
+LAYER_MIME = 'application/vnd.docker.image.rootfs.diff.tar.gzip'
+
+_TOKEN = 'fake-registry-token'
+_ROUTE = re.compile(
+    r'^/v2/(?P<name>.+)/(?P<kind>blobs/uploads|blobs|manifests|tags)/?(?P<ref>[^/]*)$')
+
+
+def sha256(content):
+    """Return the 'sha256:'-prefixed digest of content."""
+    return 'sha256:' + hashlib.sha256(content).hexdigest()
+
+
+class FakeRegistry(object):
+    """A threaded HTTP server implementing the registry API in memory.
+
+    Use it as a context manager; `address` is then 'localhost:<port>', which
+    containerregistry talks to over plain http.
+
+    :param latency: seconds added to every request
+    :param bandwidth: bytes per second applied to request and response bodies,
+        or None for no limit
+    :param auth: whether to require the bearer token exchange
+    """
+
+    def __init__(self, latency=0, bandwidth=None, auth=True):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.auth = auth
+        self.requests = collections.Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self._blobs = {}
+        self._repo_blobs = collections.defaultdict(set)
+        self._manifests = collections.defaultdict(dict)
+        self._tags = collections.defaultdict(dict)
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self):
+        return 'localhost:{}'.format(self._server.server_address[1])
+
+    def __enter__(self):
+        registry = self
+
+        class Handler(_Handler):
+            pass
+        Handler.registry = registry
+        self._server = ThreadingHTTPServer(('localhost', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, unused_type, unused_value, unused_traceback):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.bytes_received = 0
+            self.bytes_sent = 0
+            self.not_modified = 0
+
+    def count_request(self, command, kind):
+        with self._lock:
+            self.requests[(command, kind)] += 1
+
+    def count_bytes(self, received=0, sent=0):
+        with self._lock:
+            self.bytes_received += received
+            self.bytes_sent += sent
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def throttle(self, size):
+        """Sleep for the configured latency plus the transfer time of size bytes."""
+        delay = self.latency
+        if self.bandwidth and size:
+            delay += float(size) / self.bandwidth
+        if delay:
+            time.sleep(delay)
+
+    def put_blob(self, repository, content):
+        digest = sha256(content)
+        with self._lock:
+            self._blobs[digest] = content
+            self._repo_blobs[repository].add(digest)
+        return digest
+
+    def has_blob(self, repository, digest):
+        with self._lock:
+            return digest in self._repo_blobs[repository]
+
+    def get_blob(self, repository, digest):
+        """Return the blob content, or None if the repository does not hold it."""
+        with self._lock:
+            if digest not in self._repo_blobs[repository]:
+                return None
+            return self._blobs[digest]
+
+    def mount_blob(self, repository, source, digest):
+        """Make a blob of source available in repository; False if source lacks it."""
+        with self._lock:
+            if digest not in self._repo_blobs[source]:
+                return False
+            self._repo_blobs[repository].add(digest)
+            return True
+
+    def start_upload(self, content):
+        upload = str(uuid.uuid4())
+        with self._lock:
+            self._uploads[upload] = content
+        return upload
+
+    def append_upload(self, upload, content):
+        """Append to an upload and return its size, or None if it is unknown."""
+        with self._lock:
+            if upload not in self._uploads:
+                return None
+            self._uploads[upload] += content
+            return len(self._uploads[upload])
+
+    def end_upload(self, upload):
+        """Remove an upload and return its content, or None if it is unknown."""
+        with self._lock:
+            return self._uploads.pop(upload, None)
+
+    def put_manifest(self, repository, reference, content, media_type=MANIFEST_MIME):
+        digest = sha256(content)
+        with self._lock:
+            self._manifests[repository][digest] = (content, media_type)
+            if not reference.startswith('sha256:'):
+                self._tags[repository][reference] = digest
+        return digest
+
+    def get_manifest(self, repository, reference):
+        with self._lock:
+            digest = self._tags[repository].get(reference, reference)
+            return digest, self._manifests[repository].get(digest)
+
+    def list_tags(self, repository):
+        with self._lock:
+            return sorted(self._tags[repository])
+
+    def list_repositories(self):
+        with self._lock:
+            return sorted(set(self._repo_blobs) | set(self._tags))
+
+    def seed_image(self, repository, tag, layers):
+        """Store an image made of the given gzipped layer blobs.
+
+        :param repository: repository path, e.g. 'base/python'
+        :param tag: tag to point at the image
+        :param layers: list of (gzipped_blob, diff_id) tuples
+        :returns: the manifest digest
+        """
+        config = json.dumps({
+            'architecture': 'amd64',
+            'os': 'linux',
+            'config': {'Env': ['PATH=/usr/local/bin:/usr/bin:/bin']},
+            'rootfs': {'type': 'layers',
+                       'diff_ids': [diff_id for _, diff_id in layers]},
+            'history': [{'created_by': 'fake'} for _ in layers],
+        }, sort_keys=True).encode('utf8')
+        manifest = json.dumps({
+            'schemaVersion': 2,
+            'mediaType': MANIFEST_MIME,
+            'config': {'mediaType': CONFIG_MIME, 'size': len(config),
+                       'digest': self.put_blob(repository, config)},
+            'layers': [{'mediaType': LAYER_MIME, 'size': len(blob),
+                        'digest': self.put_blob(repository, blob)}
+                       for blob, _ in layers],
+        }, sort_keys=True).encode('utf8')
+        return self.put_manifest(repository, tag, manifest)
+
+
+# A routed request: the repository name, the reference (digest, tag or upload
+# id) following the route kind, the query parameters and the request body.
+_Request = collections.namedtuple('_Request', ['name', 'ref', 'query', 'body'])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler bound to a FakeRegistry through the `registry` attr."""
+    registry = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):  # pylint:disable=redefined-builtin,unused-argument
+        pass
+
+    def _reply(self, status, body=b'', headers=None):
+        headers = headers or {}
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.registry.throttle(len(body))
+            self.wfile.write(body)
+            self.registry.count_bytes(sent=len(body))
+
+    def _reply_listing(self, payload, headers=None):
+        """Reply with a JSON listing, or 304 when the client holds its ETag."""
+        body = json.dumps(payload, sort_keys=True).encode('utf8')
+        etag = '"{}"'.format(sha256(body))
+        if self.headers.get('If-None-Match') == etag:
+            self.registry.count_not_modified()
+            return self._reply(304, b'', {'ETag': etag})
+        headers = dict(headers or {}, ETag=etag)
+        headers['Content-Type'] = 'application/json'
+        return self._reply(200, body, headers)
+
+    def _error(self, status, code):
+        self._reply(status, json.dumps({'errors': [{'code': code, 'message': code}]})
+                    .encode('utf8'), {'Content-Type': 'application/json'})
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        self.registry.throttle(len(body))
+        self.registry.count_bytes(received=len(body))
+        return body
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = self._body()
+        route = _ROUTE.match(url.path)
+        kind = route.group('kind') if route else url.path.strip('/') or 'root'
+        self.registry.count_request(self.command, kind)
+        self.registry.throttle(0)
+
+        if url.path == '/token':
+            return self._reply(200, json.dumps({'token': _TOKEN}).encode('utf8'),
+                               {'Content-Type': 'application/json'})
+        if self.registry.auth and \
+                self.headers.get('Authorization') != 'Bearer ' + _TOKEN:
+            return self._reply(401, b'', {
+                'WWW-Authenticate': 'Bearer realm="http://{}/token",service="fake"'
+                                    .format(self.registry.address)})
+        if url.path in ('/v2', '/v2/'):
+            return self._reply(200, b'{}')
+        if url.path == '/v2/_catalog':
+            return self._catalog(query)
+        if not route:
+            return self._error(404, 'NAME_UNKNOWN')
+        handler = getattr(self, '_{}_{}'.format(
+            kind.replace('/', '_'), self.command.lower()), None)
+        if handler is None:
+            return self._error(405, 'UNSUPPORTED')
+        return handler(_Request(route.group('name'), route.group('ref'), query, body))
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def _catalog(self, query):
+        repos = self.registry.list_repositories()
+        last, n = query.get('last'), int(query.get('n', 100))
+        if last:
+            repos = [r for r in repos if r > last]
+        page, headers = repos[:n], {}
+        if len(repos) > n:
+            headers['Link'] = '</v2/_catalog?n={}&last={}>; rel="next"'.format(n, page[-1])
+        return self._reply_listing({'repositories': page}, headers)
+
+    def _blobs_head(self, request):
+        if not self.registry.has_blob(request.name, request.ref):
+            return self._error(404, 'BLOB_UNKNOWN')
+        return self._reply(200, b'', {'Docker-Content-Digest': request.ref})
+
+    def _blobs_get(self, request):
+        content = self.registry.get_blob(request.name, request.ref)
+        if content is None:
+            return self._error(404, 'BLOB_UNKNOWN')
+        return self._reply(200, content, {'Docker-Content-Digest': request.ref})
+
+    def _blobs_uploads_post(self, request):
+        mount = request.query.get('mount')
+        if mount and self.registry.mount_blob(
+                request.name, request.query.get('from', ''), mount):
+            return self._reply(201, b'', {
+                'Location': '/v2/{}/blobs/{}'.format(request.name, mount)})
+        if 'digest' in request.query:
+            return self._finish_upload(request.name, request.query['digest'], request.body)
+        upload = self.registry.start_upload(request.body)
+        return self._reply(202, b'', {
+            'Location': '/v2/{}/blobs/uploads/{}'.format(request.name, upload),
+            'Range': '0-0'})
+
+    def _blobs_uploads_patch(self, request):
+        size = self.registry.append_upload(request.ref, request.body)
+        if size is None:
+            return self._error(404, 'BLOB_UPLOAD_UNKNOWN')
+        return self._reply(202, b'', {
+            'Location': '/v2/{}/blobs/uploads/{}'.format(request.name, request.ref),
+            'Range': '0-{}'.format(max(size - 1, 0))})
+
+    def _blobs_uploads_put(self, request):
+        content = self.registry.end_upload(request.ref)
+        if content is None:
+            return self._error(404, 'BLOB_UPLOAD_UNKNOWN')
+        return self._finish_upload(request.name, request.query.get('digest'),
+                                   content + request.body)
+
+    def _finish_upload(self, name, digest, content):
+        if digest != sha256(content):
+            return self._error(400, 'DIGEST_INVALID')
+        self.registry.put_blob(name, content)
+        return self._reply(201, b'', {'Location': '/v2/{}/blobs/{}'.format(name, digest),
+                                      'Docker-Content-Digest': digest})
+
+    def _manifests_get(self, request):
+        digest, entry = self.registry.get_manifest(request.name, request.ref)
+        if entry is None:
+            return self._error(404, 'MANIFEST_UNKNOWN')
+        content, media_type = entry
+        return self._reply(200, content, {'Content-Type': media_type,
+                                          'Docker-Content-Digest': digest})
+
+    _manifests_head = _manifests_get
+
+    def _manifests_put(self, request):
+        media_type = self.headers.get('Content-Type', MANIFEST_MIME)
+        digest = self.registry.put_manifest(request.name, request.ref, request.body,
+                                            media_type)
+        return self._reply(201, b'', {
+            'Location': '/v2/{}/manifests/{}'.format(request.name, digest),
+            'Docker-Content-Digest': digest})
+
+    def _tags_get(self, request):
+        return self._reply_listing({'name': request.name,
+                                    'tags': self.registry.list_tags(request.name)})
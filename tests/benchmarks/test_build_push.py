@@ -0,0 +1,219 @@
+"""End-to-end build/push and listing benchmarks against the in-process FakeRegistry.
+
+Each benchmark prints a report line and, when FAIRING_BENCHMARK_OUTPUT is set,
+appends it as JSON to that file so CI can compare runs. Latency and bandwidth
+of the fake registry come from FAIRING_BENCHMARK_LATENCY (seconds) and
+FAIRING_BENCHMARK_BANDWIDTH (bytes per second). The bounds asserted are loose
+enough for slow CI workers, they only trip on regressions.
+"""
+import gzip
+import io
+import json
+import os
+import resource
+import sys
+import tarfile
+from timeit import default_timer as timer
+
+import httplib2
+import pytest
+
+from containerregistry.client import docker_creds
+from containerregistry.client import docker_name
+from containerregistry.client import monitor
+from containerregistry.client.v2_2 import docker_image as v2_2_image
+from containerregistry.transport import transport_pool
+from kubeflow.fairing.builders.append.append import AppendBuilder
+from kubeflow.fairing.preprocessors.base import BasePreProcessor
+
+from tests.benchmarks.fake_registry import FakeRegistry, sha256
+
+MB = 1024 * 1024
+CONTEXT_SIZES = [1 * MB, 8 * MB, 32 * MB]
+BASE_LAYER_SIZE = 4 * MB
+LISTED_REPOSITORIES = 64
+LATENCY = float(os.environ.get('FAIRING_BENCHMARK_LATENCY', 0))
+BANDWIDTH = int(os.environ.get('FAIRING_BENCHMARK_BANDWIDTH', 0)) or None
+
+# Throughput below which a transfer counts as a regression, before the
+# simulated latency and bandwidth.
+MIN_MB_PER_S = 5
+SLACK_SECONDS = 5
+# Registry requests of an append build: pings, tokens, mounts, uploads, manifest.
+MAX_BUILD_PUSH_REQUESTS = 30
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak / MB if sys.platform == 'darwin' else peak / 1024.0
+
+
+def _report(name, **values):
+    values = dict(values, benchmark=name, peak_rss_mb=round(_peak_rss_mb(), 1))
+    print(json.dumps(values, sort_keys=True))
+    output = os.environ.get('FAIRING_BENCHMARK_OUTPUT')
+    if output:
+        with open(output, 'a') as f:
+            f.write(json.dumps(values, sort_keys=True) + '\n')
+
+
+def _max_seconds(transferred, requests):
+    """Time allowed for moving `transferred` bytes in `requests` round trips."""
+    seconds = SLACK_SECONDS + transferred / (MIN_MB_PER_S * MB) + requests * LATENCY
+    if BANDWIDTH:
+        seconds += transferred / BANDWIDTH
+    return seconds
+
+
+def _layer(size):
+    """A gzipped tarball holding one incompressible file of the given size."""
+    content = os.urandom(size)
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w') as tar:
+        info = tarfile.TarInfo('layer.bin')
+        info.size = size
+        tar.addfile(info, io.BytesIO(content))
+    tar_bytes = buf.getvalue()
+    return gzip.compress(tar_bytes), sha256(tar_bytes)
+
+
+@pytest.fixture(name='registry')
+def registry_fixture():
+    with FakeRegistry(latency=LATENCY, bandwidth=BANDWIDTH) as reg:
+        reg.seed_image('base/python', 'latest',
+                       [_layer(BASE_LAYER_SIZE), _layer(BASE_LAYER_SIZE)])
+        yield reg
+
+
+@pytest.fixture(name='operations')
+def operations_fixture():
+    aggregator = monitor.Aggregator()
+    monitor.Configure(aggregator)
+    yield aggregator
+    monitor.Configure(None)
+
+
+@pytest.mark.parametrize('size', CONTEXT_SIZES)
+def test_append_builder_build_and_push(registry, operations, tmpdir, monkeypatch, size):
+    context_file = tmpdir.join('payload.bin')
+    context_file.write_binary(os.urandom(size))
+    main = tmpdir.join('main.py')
+    main.write('print("hello")\n')
+    monkeypatch.chdir(str(tmpdir))
+
+    builder = AppendBuilder(
+        registry=registry.address,
+        base_image=registry.address + '/base/python:latest',
+        preprocessor=BasePreProcessor(input_files=['main.py', 'payload.bin'],
+                                      executable='main.py'))
+    registry.reset_counters()
+    start = timer()
+    builder.build()
+    elapsed = timer() - start
+
+    stats = operations.summary()
+    upload = stats.get('registry.blob_upload', {})
+    push_seconds = upload.get('seconds', 0.0)
+    requests = sum(registry.requests.values())
+    _report('append_build_push',
+            context_bytes=size,
+            seconds=round(elapsed, 3),
+            push_mb_per_s=round(upload.get('bytes_sent', 0) / MB / push_seconds, 1)
+            if push_seconds else None,
+            requests=requests,
+            blob_uploads=upload.get('count', 0))
+
+    name = docker_name.Tag(builder.image_tag)
+    assert registry.get_manifest(name.repository, name.tag)[1] is not None
+    # The new layer, the new config and the two base layers (which cannot be
+    # mounted across repositories) are uploaded; nothing is uploaded twice.
+    assert upload.get('count') == 4
+    assert stats['registry.ping']['count'] == 2
+    assert stats['registry.token']['count'] == 2
+    assert requests <= MAX_BUILD_PUSH_REQUESTS
+    assert elapsed <= _max_seconds(registry.bytes_received, requests)
+
+
+def test_from_registry_blob_pull(registry, operations):
+    transport = transport_pool.Http(httplib2.Http)
+    name = docker_name.Tag(registry.address + '/base/python:latest')
+    start = timer()
+    with v2_2_image.FromRegistry(name, docker_creds.Anonymous(), transport) as img:
+        pulled = sum(len(img.blob(digest)) for digest in img.fs_layers())
+    elapsed = timer() - start
+
+    requests = operations.summary()['http.GET']['count']
+    _report('from_registry_pull',
+            bytes=pulled,
+            seconds=round(elapsed, 3),
+            pull_mb_per_s=round(pulled / MB / elapsed, 1),
+            requests=requests)
+    assert operations.summary()['registry.blob_pull']['count'] == 2
+    assert elapsed <= _max_seconds(pulled, requests)
+
+
+@pytest.fixture(name='listed_registry')
+def listed_registry_fixture(registry):
+    for i in range(LISTED_REPOSITORIES):
+        registry.put_manifest('listed/repo{:03d}'.format(i), 'latest', b'{}')
+    v2_2_image.LISTING_CACHE.clear()
+    yield registry
+    v2_2_image.LISTING_CACHE.clear()
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_catalog_listing(listed_registry, prefetch):
+    transport = transport_pool.Http(httplib2.Http)
+    name = docker_name.Registry(listed_registry.address)
+    timings = []
+    with v2_2_image.FromRegistry(name, docker_creds.Anonymous(), transport) as img:
+        for _ in range(2):
+            listed_registry.reset_counters()
+            start = timer()
+            repositories = list(img.catalog(page_size=8, prefetch=prefetch))
+            timings.append((timer() - start, listed_registry.bytes_sent,
+                            listed_registry.not_modified))
+
+    cold, cold_bytes, _ = timings[0]
+    warm, warm_bytes, not_modified = timings[1]
+    pages = listed_registry.requests[('GET', 'v2/_catalog')]
+    _report('catalog_listing',
+            prefetch=prefetch,
+            repositories=len(repositories),
+            pages=pages,
+            cold_seconds=round(cold, 3),
+            warm_seconds=round(warm, 3),
+            cold_bytes=cold_bytes,
+            warm_bytes=warm_bytes)
+    assert len(repositories) == LISTED_REPOSITORIES + 1
+    # The second listing is revalidated page by page and transfers no listing.
+    assert not_modified == pages
+    assert warm_bytes < cold_bytes
+    assert cold <= _max_seconds(cold_bytes, pages)
+
+
+def test_list_tags(listed_registry):
+    transport = transport_pool.Http(httplib2.Http)
+    repositories = [docker_name.Repository('{}/listed/repo{:03d}'.format(
+        listed_registry.address, i)) for i in range(LISTED_REPOSITORIES)]
+    timings = []
+    for _ in range(2):
+        listed_registry.reset_counters()
+        start = timer()
+        tags = dict(v2_2_image.ListTags(repositories, docker_creds.Anonymous(), transport))
+        timings.append((timer() - start, listed_registry.bytes_sent,
+                        listed_registry.not_modified))
+
+    cold, cold_bytes, _ = timings[0]
+    warm, warm_bytes, not_modified = timings[1]
+    _report('list_tags',
+            repositories=len(tags),
+            cold_seconds=round(cold, 3),
+            warm_seconds=round(warm, 3),
+            cold_bytes=cold_bytes,
+            warm_bytes=warm_bytes)
+    assert all(payload['tags'] == ['latest'] for payload in tags.values())
+    assert not_modified == LISTED_REPOSITORIES
+    assert warm_bytes < cold_bytes
+    assert cold <= _max_seconds(cold_bytes, LISTED_REPOSITORIES)
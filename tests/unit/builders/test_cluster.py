@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes import client
+
+from kubeflow.fairing.builders.cluster.cluster import ClusterBuilder, KanikoCacheStats
+from kubeflow.fairing.builders.cluster.s3_context import S3ContextSource
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes.manager import JobResult, KubeManager
+from kubeflow.fairing.preprocessors.base import BasePreProcessor
+
+pytestmark = pytest.mark.usefixtures('offline_kube_manager')
+
+
+def new_builder(**kwargs):
+    context_source = S3ContextSource(aws_account='1234', bucket_name='bucket')
+    context_source.uploaded_context_url = 's3://bucket/context'
+    builder = ClusterBuilder(registry='example.com/project',
+                             context_source=context_source,
+                             preprocessor=BasePreProcessor(),
+                             namespace='kubeflow',
+                             **kwargs)
+    builder.manager.api_instance = MagicMock()
+    return builder
+
+
+def test_cache_args_are_added_for_every_context_source():
+    builder = new_builder()
+    pod_spec = builder.context_source.generate_pod_spec('example.com/project/img:1', True)
+    builder.add_cache_args(pod_spec)
+    args = pod_spec.containers[0].args
+    assert '--cache=true' in args
+    assert '--cache-repo=example.com/project/fairing-cache-kubeflow' in args
+    assert '--cache-ttl=' + constants.KANIKO_CACHE_TTL in args
+    assert not any(arg.startswith('--cache-dir') for arg in args)
+
+
+def test_cache_can_be_disabled():
+    builder = new_builder(cache=False)
+    pod_spec = builder.context_source.generate_pod_spec('example.com/project/img:1', True)
+    builder.add_cache_args(pod_spec)
+    assert not any(arg.startswith('--cache') for arg in pod_spec.containers[0].args)
+
+
+def test_warm_cache_mounts_cache_volume():
+    builder = new_builder(warm_cache=True, cache_repo='example.com/cache')
+    pod_spec = builder.context_source.generate_pod_spec('example.com/project/img:1', True)
+    builder.add_cache_args(pod_spec)
+    kaniko = pod_spec.containers[0]
+    assert '--cache-repo=example.com/cache' in kaniko.args
+    assert '--cache-dir=' + constants.KANIKO_CACHE_DIR in kaniko.args
+    assert kaniko.volume_mounts[0].mount_path == constants.KANIKO_CACHE_DIR
+    assert pod_spec.volumes[0].host_path.path == constants.KANIKO_CACHE_HOST_PATH
+
+
+def test_warm_base_images_creates_warmer_job():
+    builder = new_builder(warm_cache=True)
+    with patch.object(KubeManager, 'create_job') as create_job, \
+            patch.object(KubeManager, 'wait_for_job') as wait_for_job:
+        wait_for_job.return_value = JobResult('warmer', 'kubeflow', constants.JOB_SUCCEEDED)
+        create_job.return_value = client.V1Job(
+            metadata=client.V1ObjectMeta(name='warmer', namespace='kubeflow'))
+        builder.warm_base_images()
+    job = create_job.call_args[0][1]
+    warmer = job.spec.template.spec.containers[0]
+    assert warmer.image == constants.KANIKO_WARMER_IMAGE
+    assert '--image=' + constants.DEFAULT_BASE_IMAGE in warmer.args
+
+
+def test_kaniko_cache_stats():
+    stats = KanikoCacheStats()
+    for line in [
+            'INFO[0001] Found sha256:abcd in local cache',
+            'INFO[0002] Checking for cached layer example.com/cache:1234...',
+            'INFO[0002] Using caching version of cmd: RUN pip install -r requirements.txt',
+            'INFO[0003] No cached layer found for cmd COPY /app/ /app/',
+            'INFO[0004] Taking snapshot of full filesystem...']:
+        stats(line)
+    assert (stats.hits, stats.misses, stats.base_image_hits) == (1, 1, 1)
+
+
+def test_warmer_job_is_deleted_once_it_succeeded():
+    builder = new_builder(warm_cache=True)
+    with patch.object(KubeManager, 'create_job') as create_job, \
+            patch.object(KubeManager, 'wait_for_job') as wait_for_job:
+        create_job.return_value = client.V1Job(
+            metadata=client.V1ObjectMeta(name='warmer', namespace='kubeflow'))
+        wait_for_job.return_value = JobResult('warmer', 'kubeflow', constants.JOB_FAILED)
+        builder.warm_base_images()
+        builder.manager.api_instance.delete_namespaced_job.assert_not_called()
+
+        wait_for_job.return_value = JobResult('warmer', 'kubeflow', constants.JOB_SUCCEEDED)
+        builder.warm_base_images()
+    delete = builder.manager.api_instance.delete_namespaced_job
+    assert delete.call_args[0][:2] == ('warmer', 'kubeflow')
+    assert delete.call_args[1]['body'].propagation_policy == 'Background'
+
+
+def run_build(builder, wait_for_job):
+    builder.dockerfile_path = 'Dockerfile'
+    builder.preprocessor = MagicMock()
+    builder.preprocessor.context_tar_gz.return_value = ('/tmp/context.tar.gz', 'abc')
+    builder.context_source.cleanup = MagicMock()
+    with patch.object(S3ContextSource, 'prepare'), \
+            patch.object(KubeManager, 'create_job') as create_job, \
+            patch.object(KubeManager, 'wait_for_job', side_effect=wait_for_job):
+        create_job.return_value = client.V1Job(
+            metadata=client.V1ObjectMeta(name='fairing-builder-x', namespace='kubeflow'))
+        builder.build()
+    assert create_job.call_args[0][0] == 'kubeflow'
+
+
+def test_build_collects_cache_stats_without_streaming_logs():
+    builder = new_builder(stream_logs=False)
+
+    def wait_for_job(*args, **kwargs):  #pylint:disable=unused-argument
+        assert not kwargs['stream_logs']
+        kwargs['line_handler']('INFO[0002] Using caching version of cmd: RUN echo')
+        return JobResult('fairing-builder-x', 'kubeflow', constants.JOB_SUCCEEDED)
+
+    run_build(builder, wait_for_job)
+    assert builder.cache_stats.hits == 1
+    builder.context_source.cleanup.assert_called_once_with()
+
+
+def test_build_cleans_up_when_waiting_fails():
+    builder = new_builder(cleanup=True)
+
+    def wait_for_job(*args, **kwargs):  #pylint:disable=unused-argument
+        raise client.rest.ApiException(status=500)
+
+    with pytest.raises(client.rest.ApiException):
+        run_build(builder, wait_for_job)
+    builder.context_source.cleanup.assert_called_once_with()
+    assert builder.manager.api_instance.delete_namespaced_job.call_args[0][:2] == \
+        ('fairing-builder-x', 'kubeflow')
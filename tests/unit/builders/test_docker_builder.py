@@ -0,0 +1,54 @@
+import sys
+from unittest.mock import patch
+
+from kubeflow.fairing.builders.docker.docker import DockerBuilder
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.preprocessors.base import BasePreProcessor
+
+BUILDKIT_OUTPUT = [
+    '#1 [internal] load build definition from Dockerfile',
+    '#1 DONE 0.1s',
+    '#5 [1/3] FROM docker.io/library/python:3.6',
+    '#5 CACHED',
+    '#6 [2/3] RUN pip install -r requirements.txt',
+    '#6 0.512 Collecting six',
+    '#6 DONE 12.5s',
+    '#7 [3/3] COPY /app/ /app/',
+    '#7 DONE 0.3s',
+]
+
+
+def test_buildkit_build_uses_registry_cache_and_times_steps():
+    builder = DockerBuilder(registry='example.com/project', preprocessor=BasePreProcessor(),
+                            buildkit=True, push=False)
+    fake_docker = [sys.executable, '-c',
+                   'import sys; sys.stdin.buffer.read(); print({!r})'.format(
+                       '\n'.join(BUILDKIT_OUTPUT))]
+    with patch('kubeflow.fairing.builders.docker.docker.APIClient'), \
+            patch.object(DockerBuilder, 'buildkit_cmd', return_value=fake_docker):
+        builder.build()
+    assert builder.step_timings == [
+        ('FROM docker.io/library/python:3.6', 0.0),
+        ('RUN pip install -r requirements.txt', 12.5),
+        ('COPY /app/ /app/', 0.3)]
+
+    cache_image = 'example.com/project/{}:{}'.format(constants.DEFAULT_IMAGE_NAME,
+                                                     constants.DOCKER_BUILDKIT_CACHE_TAG)
+    cmd = builder.buildkit_cmd()
+    assert cmd[cmd.index('--cache-from') + 1] == cache_image
+    assert 'BUILDKIT_INLINE_CACHE=1' in cmd
+
+
+def test_buildkit_push_moves_cache_tag():
+    builder = DockerBuilder(registry='example.com/project', preprocessor=BasePreProcessor(),
+                            buildkit=True)
+    builder.image_tag = builder.full_image_name('abc')
+    with patch('kubeflow.fairing.builders.docker.docker.APIClient') as client:
+        builder.docker_client = client.return_value
+        builder.docker_client.push.return_value = []
+        builder.publish()
+    repository = 'example.com/project/{}'.format(constants.DEFAULT_IMAGE_NAME)
+    builder.docker_client.tag.assert_called_once_with(
+        builder.image_tag, repository, tag=constants.DOCKER_BUILDKIT_CACHE_TAG)
+    builder.docker_client.push.assert_called_with(
+        repository, tag=constants.DOCKER_BUILDKIT_CACHE_TAG, stream=True)
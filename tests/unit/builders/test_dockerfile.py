@@ -53,3 +53,75 @@ RUN if [ -e requirements.txt ];then pip install --no-cache -r requirements.txt;
 COPY /pre /pre
 CMD python main.py"""
     assert actual == expected
+
+
+def test_writedockerfile_with_pip_cache_mount():
+    _, tmp_file = tempfile.mkstemp()
+    dockerfile.write_dockerfile(
+        destination=tmp_file,
+        docker_command=["python", "main.py"],
+        path_prefix="/pre",
+        base_image="foo_bar",
+        install_reqs_before_copy=True,
+        backend="buildkit")
+    actual = open(tmp_file, 'r').read()
+    expected = """# syntax=docker/dockerfile:1
+FROM foo_bar
+WORKDIR /pre
+ENV FAIRING_RUNTIME 1
+COPY /pre/requirements.txt /pre
+RUN --mount=type=cache,target=/root/.cache/pip if [ -e requirements.txt ];then pip install -r requirements.txt; fi
+COPY /pre /pre
+CMD python main.py"""
+    assert actual == expected
+
+
+def test_writedockerfile_multi_stage():
+    _, tmp_file = tempfile.mkstemp()
+    dockerfile.write_dockerfile(
+        destination=tmp_file,
+        docker_command=["python", "main.py"],
+        path_prefix="/pre",
+        base_image="foo_bar",
+        install_reqs_before_copy=True,
+        backend="kaniko",
+        multi_stage=True)
+    actual = open(tmp_file, 'r').read()
+    expected = """FROM foo_bar AS fairing-deps
+WORKDIR /pre
+COPY /pre/requirements.txt /pre
+ENV PYTHONUSERBASE /opt/fairing-deps
+RUN pip install --user --no-cache -r requirements.txt
+FROM foo_bar
+WORKDIR /pre
+ENV FAIRING_RUNTIME 1
+ENV PYTHONUSERBASE /opt/fairing-deps
+ENV PATH /opt/fairing-deps/bin:$PATH
+COPY --from=fairing-deps /opt/fairing-deps /opt/fairing-deps
+COPY /pre /pre
+CMD python main.py"""
+    assert actual == expected
+
+
+def test_writedockerfile_multi_stage_mounts_wheels():
+    _, tmp_file = tempfile.mkstemp()
+    dockerfile.write_dockerfile(
+        destination=tmp_file,
+        path_prefix="/pre",
+        base_image="foo_bar",
+        install_reqs_before_copy=True,
+        backend="buildkit",
+        multi_stage=True)
+    actual = open(tmp_file, 'r').read()
+    expected = """# syntax=docker/dockerfile:1
+FROM foo_bar AS fairing-deps
+WORKDIR /pre
+COPY /pre/requirements.txt /pre
+RUN --mount=type=cache,target=/root/.cache/pip pip wheel --wheel-dir /tmp/fairing-wheels -r requirements.txt
+FROM foo_bar
+WORKDIR /pre
+ENV FAIRING_RUNTIME 1
+COPY /pre/requirements.txt /pre
+RUN --mount=type=bind,from=fairing-deps,source=/tmp/fairing-wheels,target=/tmp/fairing-wheels pip install --no-cache --no-index --find-links /tmp/fairing-wheels -r requirements.txt
+COPY /pre /pre"""
+    assert actual == expected
@@ -1,9 +1,15 @@
+import sys
+import threading
+import time
 from os.path import isfile
+from unittest.mock import patch
+
+from kubeflow.fairing import executor
 from kubeflow.fairing.preprocessors.base import BasePreProcessor
 from kubeflow.fairing.builders.podman.podman import PodmanBuilder
 
-MOCK_CMD_BUILD = 'podman build -t <image_tag> - < <context_file>'
-MOCK_CMD_PUSH = 'podman push <image_tag> --tls-verify=<tls_verify>'
+MOCK_CMD_BUILD = ['podman', 'build', '--layers=true', '-t', '<image_tag>', '-']
+MOCK_CMD_PUSH = ['podman', 'push', '<image_tag>', '--tls-verify=<tls_verify>']
 
 def test_podman_builder():
     """
@@ -20,13 +26,96 @@ def test_podman_builder():
     assert isfile(podmanBuilder.context_file)
 
     # Test if the podman build cmd is correct
-    mock_cmd_build = MOCK_CMD_BUILD \
-        .replace('<image_tag>', podmanBuilder.image_tag) \
-        .replace('<context_file>', podmanBuilder.context_file)
+    mock_cmd_build = [arg.replace('<image_tag>', podmanBuilder.image_tag)
+                      for arg in MOCK_CMD_BUILD]
     assert cmd_build == mock_cmd_build
 
     # Test if the podman push cmd is correct
-    mock_cmd_push = MOCK_CMD_PUSH \
-        .replace('<image_tag>', podmanBuilder.image_tag) \
-        .replace('<tls_verify>', str(podmanBuilder.tls_verify).lower())
+    mock_cmd_push = [arg.replace('<image_tag>', podmanBuilder.image_tag)
+                     .replace('<tls_verify>', str(podmanBuilder.tls_verify).lower())
+                     for arg in MOCK_CMD_PUSH]
     assert cmd_push == mock_cmd_push
+
+def test_podman_builder_parallel_stages():
+    """
+    test podman build cmd with parallel stages and no layer cache
+    """
+    podmanBuilder = PodmanBuilder(
+        registry="test-image-registry",
+        preprocessor=BasePreProcessor(),
+        layers=False,
+        jobs=4)
+    cmd_build = podmanBuilder.gen_cmd('build')
+    assert cmd_build[:4] == ['podman', 'build', '--layers=false', '--jobs=4']
+
+def test_podman_builder_streams_output_and_times_steps():
+    """
+    test podman output is streamed and build steps are timed
+    """
+    podmanBuilder = PodmanBuilder(
+        registry="test-image-registry",
+        preprocessor=BasePreProcessor(),
+        push=False)
+    fake_podman = [sys.executable, '-c',
+                   'import sys; sys.stdin.buffer.read();'
+                   'print("STEP 1: FROM python"); print("STEP 2/2: COPY /app/ /app/");'
+                   'print("--> abc")']
+    podmanBuilder.context_file, _ = podmanBuilder.preprocessor.context_tar_gz()
+    with patch.object(PodmanBuilder, 'gen_cmd', return_value=fake_podman):
+        podmanBuilder.build()
+    assert [step for step, _ in podmanBuilder.step_timings] == [
+        'FROM python', 'COPY /app/ /app/']
+    assert [stage for stage, _ in podmanBuilder.progress.durations()] == [
+        executor.QUEUED, executor.BUILDING]
+
+def test_podman_builder_multi_stage(tmpdir, monkeypatch):
+    """
+    test podman builds install the requirements in a separate stage
+    """
+    monkeypatch.chdir(str(tmpdir))
+    tmpdir.join('requirements.txt').write('six\n')
+    podmanBuilder = PodmanBuilder(
+        registry="test-image-registry",
+        preprocessor=BasePreProcessor(input_files=['requirements.txt']),
+        multi_stage=True)
+    podmanBuilder.gen_cmd('build')
+    dockerfile_path = next(src for src, dst in podmanBuilder.preprocessor.output_map.items()
+                           if dst == 'Dockerfile')
+    with open(dockerfile_path) as f:
+        lines = f.read().splitlines()
+    assert lines[0].endswith(' AS fairing-deps')
+    assert 'COPY --from=fairing-deps /opt/fairing-deps /opt/fairing-deps' in lines
+
+def test_podman_builder_cancel():
+    """
+    test cancelling a running podman build through BaseBuilder.cancel
+    """
+    podmanBuilder = PodmanBuilder(
+        registry="test-image-registry",
+        preprocessor=BasePreProcessor(),
+        push=False)
+    fake_podman = [sys.executable, '-c',
+                   'import sys, time; sys.stdin.buffer.read();'
+                   'print("STEP 1: FROM python", flush=True); time.sleep(60)']
+    podmanBuilder.context_file, _ = podmanBuilder.preprocessor.context_tar_gz()
+    errors = []
+
+    def started():
+        return podmanBuilder._current_step is not None  #pylint:disable=protected-access
+
+    def build():
+        try:
+            podmanBuilder.build()
+        except Exception as e:  #pylint:disable=broad-except
+            errors.append(e)
+
+    with patch.object(PodmanBuilder, 'gen_cmd', return_value=fake_podman):
+        thread = threading.Thread(target=build)
+        thread.start()
+        deadline = time.time() + 30
+        while not started() and time.time() < deadline:
+            time.sleep(0.05)
+        podmanBuilder.cancel()
+        thread.join(30)
+    assert not thread.is_alive()
+    assert 'Image build failed' in str(errors[0])
@@ -0,0 +1,48 @@
+import gzip
+import hashlib
+import os
+import tarfile
+from unittest.mock import patch
+
+from kubeflow.fairing.backends.backends import KubernetesBackend
+from kubeflow.fairing.builders.append.append import AppendBuilder
+from kubeflow.fairing.builders.append.wheelhouse import Wheelhouse
+from kubeflow.fairing.preprocessors.base import BasePreProcessor
+
+
+def fake_pip(wheelhouse, command, *args):
+    if command == 'install':
+        target = args[args.index('--target') + 1]
+        os.makedirs(os.path.join(target, 'six'))
+        with open(os.path.join(target, 'six', '__init__.py'), 'w') as f:
+            f.write('')
+
+
+def test_layer_is_built_once_per_requirements(tmpdir):
+    requirements = tmpdir.join('requirements.txt')
+    requirements.write('six==1.14.0\n')
+    wheelhouse = Wheelhouse(cache_dir=str(tmpdir.join('cache')), python_version='3.6')
+    with patch.object(Wheelhouse, '_pip', autospec=True, side_effect=fake_pip) as pip:
+        layer_file, diff_id = wheelhouse.layer(str(requirements))
+        assert wheelhouse.layer(str(requirements)) == (layer_file, diff_id)
+    assert pip.call_count == 2
+
+    with open(layer_file, 'rb') as f:
+        assert diff_id == 'sha256:' + hashlib.sha256(gzip.decompress(f.read())).hexdigest()
+    with tarfile.open(layer_file) as tar:
+        assert 'opt/fairing/site-packages/six/__init__.py' in tar.getnames()
+
+    requirements.write('six==1.15.0\n')
+    assert wheelhouse.key(str(requirements)) != os.path.basename(os.path.dirname(layer_file))
+    assert Wheelhouse(python_version='3.7').key(str(requirements)) != \
+        wheelhouse.key(str(requirements))
+
+
+def test_backend_with_wheelhouse_uses_append_builder():
+    wheelhouse = Wheelhouse()
+    backend = KubernetesBackend(namespace='kubeflow', wheelhouse=wheelhouse)
+    builder = backend.get_builder(BasePreProcessor(), 'python:3.6', 'example.com/project',
+                                  needs_deps_installation=True)
+    assert isinstance(builder, AppendBuilder)
+    assert builder.install_requirements
+    assert builder.wheelhouse is wheelhouse
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from kubeflow.fairing.builders.cluster.s3_context import S3ContextSource
+from kubeflow.fairing.cloud.aws import S3Uploader
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.preprocessors.base import BasePreProcessor
+
+
+def not_found(*args, **kwargs):
+    raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+
+@patch('boto3.client')
+def test_upload_is_skipped_when_object_exists(boto_client):
+    s3 = boto_client.return_value
+    url = S3Uploader('us-east-1').upload_to_bucket('fairing_builds/abc', 'bucket', 'ctx.tar.gz')
+    assert url == 's3://bucket/fairing_builds/abc'
+    s3.head_object.assert_called_once_with(Bucket='bucket', Key='fairing_builds/abc')
+    s3.upload_file.assert_not_called()
+
+
+@patch('boto3.client')
+def test_missing_object_is_uploaded_in_parallel_parts(boto_client):
+    s3 = boto_client.return_value
+    s3.head_object.side_effect = not_found
+    S3Uploader('us-east-1').upload_to_bucket('fairing_builds/abc', 'bucket', 'ctx.tar.gz')
+    args, kwargs = s3.upload_file.call_args
+    assert args == ('ctx.tar.gz', 'bucket', 'fairing_builds/abc')
+    assert kwargs['Config'].multipart_chunksize == constants.CONTEXT_UPLOAD_PART_SIZE
+    assert kwargs['Config'].max_concurrency == constants.CONTEXT_UPLOAD_CONCURRENCY
+
+
+@pytest.mark.usefixtures('offline_kube_manager')
+@patch('boto3.client')
+def test_unchanged_context_is_uploaded_once(boto_client, tmpdir, monkeypatch):
+    s3 = boto_client.return_value
+    uploaded = set()
+    s3.head_object.side_effect = lambda Bucket, Key: Key in uploaded or not_found()
+    s3.upload_file.side_effect = lambda path, bucket, key, Config: uploaded.add(key)
+    monkeypatch.chdir(str(tmpdir))
+    tmpdir.join('main.py').write('print("hello")\n')
+    tmpdir.mkdir('data').join('train.csv').write('1,2\n')
+    context_source = S3ContextSource(aws_account='1234', bucket_name='bucket')
+
+    urls = []
+    for _ in range(2):
+        preprocessor = BasePreProcessor(input_files=['main.py', 'data'], executable='main.py')
+        context_file, _ = preprocessor.context_tar_gz()
+        urls.append(context_source.upload_context(context_file))
+    assert urls[0] == urls[1]
+    s3.upload_file.assert_called_once()
@@ -1,12 +1,24 @@
 import base64
+import io
+import tarfile
 import uuid
 
-from unittest.mock import patch
-from kubernetes import client
+from unittest.mock import MagicMock, patch
+
+import pytest
+from azure.common import AzureMissingResourceHttpError
 from azure.common.credentials import ServicePrincipalCredentials
+from azure.storage.file.models import File
 
+from kubeflow.fairing.builders.cluster.azurestorage_context import StorageContextSource
+from kubeflow.fairing.kubernetes import mutators
 from kubeflow.fairing.kubernetes.manager import KubeManager
-from kubeflow.fairing.cloud.azure import get_azure_credentials
+from kubeflow.fairing.cloud.azure import AzureFileUploader, add_azure_files, \
+    get_azure_credentials, get_azure_files_mutator
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.preprocessors.base import BasePreProcessor
+
+pytestmark = pytest.mark.usefixtures('offline_kube_manager')
 
 TEST_CLIENT_ID = str(uuid.uuid4())
 TEST_CLIENT_SECRET = str(uuid.uuid4())
@@ -27,18 +39,14 @@ class MockSecret(object):
 
 # Test that credentials are parsed properly from the Kubernetes secrets.
 @patch.object(KubeManager, 'secret_exists')
-@patch.object(KubeManager, '__init__')
-@patch.object(client.CoreV1Api, 'read_namespaced_secret')
 @patch.object(ServicePrincipalCredentials, '__init__')
-def test_get_azure_credentials(credentials_init_mock,
-                               read_namespaced_secret_mock,
-                               manager_init_mock,
-                               secret_exists_mock):
+def test_get_azure_credentials(credentials_init_mock, secret_exists_mock, kube_manager):
     secret_exists_mock.return_value = True
-    manager_init_mock.return_value = None
-    read_namespaced_secret_mock.return_value = MockSecret()
+    kube_manager.api_v1.read_namespaced_secret.return_value = MockSecret()
     credentials_init_mock.return_value = None
-    credentials, subscription_id = get_azure_credentials('kubeflow')
+    credentials, subscription_id = get_azure_credentials('kubeflow', kube_manager)
+    kube_manager.api_v1.read_namespaced_secret.assert_called_once_with(
+        constants.AZURE_CREDS_SECRET_NAME, 'kubeflow')
     credentials_init_mock.assert_called_with(
         client_id=TEST_CLIENT_ID,
         secret=TEST_CLIENT_SECRET,
@@ -46,3 +54,142 @@ def test_get_azure_credentials(credentials_init_mock,
     )
     assert isinstance(credentials, ServicePrincipalCredentials)
     assert subscription_id == TEST_SUBSCRIPTION_ID
+
+
+class FakeShareService(object):
+    def __init__(self):
+        self.dirs = set()
+        self.files = {}
+        self.uploads = []
+        self.fail_on = None
+
+    def exists(self, unused_share_name, directory_name, file_name):
+        return '{}/{}'.format(directory_name, file_name) in self.files
+
+    def create_file_from_text(self, share_name, directory_name, file_name, text):
+        self.create_file_from_bytes(share_name, directory_name, file_name, text.encode())
+
+    def create_directory(self, unused_share_name, directory_name):
+        parent = directory_name.rpartition('/')[0]
+        assert not parent or parent in self.dirs
+        created = directory_name not in self.dirs
+        self.dirs.add(directory_name)
+        return created
+
+    def get_file_properties(self, unused_share_name, directory_name, file_name):
+        path = '{}/{}'.format(directory_name, file_name)
+        if path not in self.files:
+            raise AzureMissingResourceHttpError('Not found', 404)
+        return self.files[path]
+
+    def create_file_from_bytes(self, unused_share_name, directory_name, file_name, content,
+                               content_settings=None):
+        assert directory_name in self.dirs
+        path = '{}/{}'.format(directory_name, file_name)
+        if path.endswith(self.fail_on or '//'):
+            raise IOError('connection reset')
+        self.files[path] = File(file_name)
+        self.files[path].properties.content_length = len(content)
+        self.files[path].properties.content_settings = content_settings
+        self.uploads.append(path)
+
+
+def write_context(path, files):
+    with tarfile.open(str(path), 'w:gz') as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+
+# Test that context members are streamed to the share and unchanged files are skipped.
+@patch('kubeflow.fairing.cloud.azure.StorageManagementClient')
+def test_upload_tar_gz_contents(storage_client_mock, tmpdir):  #pylint:disable=unused-argument
+    uploader = AzureFileUploader('kubeflow', credentials=object(), subscription_id='id')
+    share = FakeShareService()
+    context = tmpdir.join('context.tar.gz')
+    files = {'Dockerfile': b'FROM python', 'app/main.py': b'print(1)',
+             'app/pkg/util.py': b'x = 1'}
+    write_context(context, files)
+
+    uploader.upload_tar_gz_contents(share, 'share', 'build_1', str(context))
+    assert sorted(share.uploads) == ['build_1/' + name for name in sorted(files)]
+
+    files['app/main.py'] = b'print(2)'
+    write_context(context, files)
+    share.uploads = []
+    uploader.upload_tar_gz_contents(share, 'share', 'build_1', str(context))
+    assert share.uploads == ['build_1/app/main.py']
+
+# Test that the build pod mounts the secret the context source created.
+def test_azure_files_secret_matches_context_source(tmp_path, kube_manager):
+    context_file = tmp_path / 'context.tar.gz'
+    context_file.write_bytes(b'fairing build context')
+    context_source = StorageContextSource(namespace='kubeflow')
+    context_source.manager = kube_manager
+    with patch.object(AzureFileUploader, '__init__', return_value=None), \
+            patch.object(AzureFileUploader, 'upload_to_share',
+                         return_value=('account', 'key')):
+        context_source.prepare(str(context_file))
+    create_secret = kube_manager.api_v1.create_namespaced_secret
+    created_name = create_secret.call_args[0][1].metadata.name
+
+    pod_spec = context_source.generate_pod_spec('example.azurecr.io/img:1234abcd', True)
+    kube_manager = MagicMock()
+    kube_manager.secret_exists.return_value = True
+    mutators.run_mutators(kube_manager, pod_spec, 'kubeflow',
+                          [get_azure_files_mutator(context_source)], ttl=0)
+    kube_manager.secret_exists.assert_called_once_with(created_name, 'kubeflow')
+    assert pod_spec.volumes[0].azure_file.secret_name == created_name
+
+
+# Test that an unchanged context is uploaded once, an interrupted upload being resumed.
+@patch('kubeflow.fairing.cloud.azure.StorageManagementClient')
+def test_interrupted_upload_is_resumed(storage_client_mock, tmpdir, monkeypatch):  #pylint:disable=unused-argument
+    monkeypatch.chdir(str(tmpdir))
+    for name in ('main.py', 'model.py', 'train.py'):
+        tmpdir.join(name).write('print("{}")\n'.format(name))
+    share = FakeShareService()
+    uploader = AzureFileUploader('kubeflow', credentials=object(), subscription_id='id')
+    context_source = StorageContextSource(namespace='kubeflow')
+
+    def prepare():
+        preprocessor = BasePreProcessor(input_files=['main.py', 'model.py', 'train.py'])
+        context_file, _ = preprocessor.context_tar_gz()
+        with patch('kubeflow.fairing.cloud.azure.AzureFileUploader', return_value=uploader), \
+                patch('kubeflow.fairing.cloud.azure.FileService', return_value=share), \
+                patch.object(uploader, 'create_storage_account_if_not_exists'), \
+                patch.object(uploader, 'create_share_if_not_exists'), \
+                patch.object(uploader, 'get_storage_credentials',
+                             return_value=('account', 'key')), \
+                patch('kubeflow.fairing.cloud.azure.create_storage_creds_secret'):
+            context_source.prepare(context_file)
+        return context_source.context_path
+
+    share.fail_on = 'train.py'
+    with pytest.raises(IOError):
+        prepare()
+    first = set(share.uploads)
+    assert first
+    share.fail_on = None
+    share.uploads = []
+    path = prepare()
+    assert not first & set(share.uploads)
+    assert share.uploads[-1].endswith(constants.AZURE_FILES_UPLOAD_COMPLETE_MARKER)
+
+    share.uploads = []
+    assert prepare() == path
+    assert share.uploads == []
+
+
+# Test that the three-argument mutator mounts the context the Kaniko pod builds.
+def test_add_azure_files_mounts_the_context_of_the_pod():
+    context_source = StorageContextSource(namespace='kubeflow')
+    context_source.context_path = '/mnt/azure/build_ABCD/'
+    pod_spec = context_source.generate_pod_spec('example.azurecr.io/img:1234abcd', True)
+    kube_manager = MagicMock()
+    kube_manager.secret_exists.return_value = True
+    add_azure_files(kube_manager, pod_spec, 'kubeflow')
+    secret_name = constants.AZURE_STORAGE_CREDS_SECRET_NAME_PREFIX + 'abcd'
+    kube_manager.secret_exists.assert_called_once_with(secret_name, 'kubeflow')
+    assert pod_spec.volumes[0].azure_file.secret_name == secret_name
@@ -1,8 +1,12 @@
 from unittest.mock import patch
+
+import pytest
+
 from kubeflow.fairing.builders.cluster.cos_context import COSContextSource
 
 NAMESPACE = 'default'
 
+@pytest.mark.usefixtures('offline_kube_manager')
 def test_ibm_cloud_builder(namespace=NAMESPACE):
     '''
     Test IBM Cloud Builder.
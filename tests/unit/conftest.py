@@ -0,0 +1,22 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kubeflow.fairing.kubernetes.manager import KubeManager
+
+
+@pytest.fixture
+def offline_kube_manager():
+    """KubeManagers are created without loading a kubeconfig."""
+    with patch.object(KubeManager, '__init__', return_value=None):
+        yield
+
+
+@pytest.fixture
+def kube_manager(offline_kube_manager):  #pylint:disable=redefined-outer-name,unused-argument
+    """KubeManager whose API clients are mocks."""
+    manager = KubeManager()
+    manager.api_client = MagicMock()
+    manager.api_instance = MagicMock()
+    manager.api_v1 = MagicMock()
+    return manager
@@ -0,0 +1,112 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+from containerregistry.client.v1 import docker_image_ as v1_image
+from containerregistry.client.v2_2 import append_ as append
+from containerregistry.client.v2_2 import docker_digest_ as docker_digest
+from containerregistry.client.v2_2 import docker_image_ as docker_image
+from containerregistry.client.v2_2 import save_ as save
+
+CONTENT = os.urandom(64 * 1024) + b'fairing' * 1024
+
+
+class EmptyImage(docker_image.DockerImage):
+
+    def manifest(self):
+        return json.dumps({'schemaVersion': 2, 'layers': [],
+                           'config': {'digest': 'sha256:0'}})
+
+    def config_file(self):
+        return json.dumps({'rootfs': {'type': 'layers', 'diff_ids': []}})
+
+    def blob(self, digest):
+        raise ValueError(digest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, unused_type, unused_value, unused_traceback):
+        pass
+
+
+class ZippedV1Image(v1_image.DockerImage):
+    """A v1 image only holding its layer compressed, without diff_ids."""
+
+    def top(self):
+        return 'top'
+
+    def repositories(self):
+        return {}
+
+    def json(self, layer_id):  #pylint:disable=unused-argument
+        return '{}'
+
+    def layer(self, layer_id):  #pylint:disable=unused-argument
+        return gzip.compress(CONTENT)
+
+    def ancestry(self, layer_id):
+        return [layer_id]
+
+    def diff_id(self, digest):
+        raise ValueError(digest)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, unused_type, unused_value, unused_traceback):
+        pass
+
+
+class UnzippedV1Image(ZippedV1Image):
+    """A v1 image holding its layer uncompressed, like FromTarball."""
+
+    def layer(self, layer_id):
+        raise AssertionError("the layer must not be gzipped to be hashed")
+
+    def uncompressed_layer(self, layer_id):  #pylint:disable=unused-argument
+        return CONTENT
+
+
+def expected(content):
+    return 'sha256:' + hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture(params=[7, 1024 * 1024], ids=['small-chunks', 'default-chunks'])
+def chunk_size(request, monkeypatch):
+    monkeypatch.setattr(docker_digest, '_CHUNK_SIZE', request.param)
+
+
+@pytest.mark.usefixtures('chunk_size')
+def test_sha256_uncompressed_bytes_and_file():
+    zipped = gzip.compress(CONTENT)
+    assert docker_digest.SHA256Uncompressed(zipped) == expected(CONTENT)
+    assert docker_digest.SHA256Uncompressed(io.BytesIO(zipped)) == expected(CONTENT)
+    assert docker_digest.SHA256Uncompressed(zipped, prefix='') == \
+        hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.mark.usefixtures('chunk_size')
+def test_sha256_uncompressed_concatenated_members():
+    zipped = gzip.compress(CONTENT[:1000]) + gzip.compress(CONTENT[1000:])
+    assert docker_digest.SHA256Uncompressed(zipped) == expected(CONTENT)
+
+
+def test_sha256_uncompressed_empty_layer():
+    assert docker_digest.SHA256Uncompressed(gzip.compress(b'')) == expected(b'')
+
+
+def test_appended_layer_diff_id():
+    zipped = gzip.compress(CONTENT)
+    layer = append.Layer(EmptyImage(), zipped)
+    assert layer.diff_ids() == [expected(CONTENT)]
+    assert layer.uncompressed_blob(layer.fs_layers()[0]) == CONTENT
+
+
+def test_saved_diff_id_hashes_the_layer_as_held():
+    assert save._diff_id(ZippedV1Image(), 'top') == expected(CONTENT)  #pylint:disable=protected-access
+    assert save._diff_id(UnzippedV1Image(), 'top') == expected(CONTENT)  #pylint:disable=protected-access
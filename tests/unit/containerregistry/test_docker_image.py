@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+
+import httplib2
+import pytest
+
+from containerregistry.client import docker_creds
+from containerregistry.client import docker_name
+from containerregistry.client.v2_2 import docker_http_ as docker_http
+from containerregistry.client.v2_2 import docker_image_ as docker_image
+
+REGISTRY = 'localhost:5000'
+
+
+class FakeTransport(object):
+    """An anonymous registry serving tags/list and a paginated _catalog."""
+
+    def __init__(self, repositories=(), page_size=2, delay=0):
+        self.repositories = list(repositories)
+        self.page_size = page_size
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def request(self, url, method, body=None, headers=None):  #pylint:disable=unused-argument
+        headers = headers or {}
+        with self._lock:
+            self.requests.append((url, headers.get('If-None-Match')))
+        path = url.split(REGISTRY, 1)[1]
+        if path == '/v2/':
+            return httplib2.Response({'status': '200'}), b''
+        if path.endswith('/tags/list'):
+            time.sleep(self.delay)
+            repository = path[len('/v2/'):-len('/tags/list')]
+            return self._json({'name': repository, 'tags': ['latest']}, headers)
+        if path.startswith('/v2/_catalog'):
+            start = int(path.split('last=')[1]) if 'last=' in path else 0
+            end = start + self.page_size
+            extra = {}
+            if end < len(self.repositories):
+                extra['link'] = '</v2/_catalog?n={}&last={}>; rel="next"'.format(
+                    self.page_size, end)
+            return self._json({'repositories': self.repositories[start:end]},
+                              headers, extra)
+        return httplib2.Response({'status': '404'}), b''
+
+    def count(self, suffix):
+        return len([url for url, _ in self.requests if suffix in url])
+
+    @staticmethod
+    def _json(payload, headers, extra=None):
+        content = json.dumps(payload).encode('utf8')
+        etag = '"{}"'.format(hash(content))
+        if headers.get('If-None-Match') == etag:
+            return httplib2.Response({'status': '304'}), b''
+        info = {'status': '200', 'etag': etag}
+        info.update(extra or {})
+        return httplib2.Response(info), content
+
+
+@pytest.fixture(autouse=True)
+def clear_listing_cache():
+    docker_image.LISTING_CACHE.clear()
+    yield
+    docker_image.LISTING_CACHE.clear()
+
+
+def repository(name):
+    return docker_name.Repository('{}/{}'.format(REGISTRY, name))
+
+
+def test_list_tags():
+    transport = FakeTransport()
+    names = ['app', 'base', 'cache', 'data', 'etl']
+    results = dict(docker_image.ListTags(
+        [repository(name) for name in names],
+        lambda _: docker_creds.Anonymous(), transport, threads=2))
+    assert sorted(str(repo) for repo in results) == \
+        ['{}/{}'.format(REGISTRY, name) for name in names]
+    assert all(payload['tags'] == ['latest'] for payload in results.values())
+
+
+def test_list_tags_stops_listing_when_the_caller_stops():
+    transport = FakeTransport(delay=0.05)
+    listing = docker_image.ListTags(
+        (repository('repo{}'.format(i)) for i in range(50)),
+        docker_creds.Anonymous(), transport, threads=2)
+    next(listing)
+    start = time.time()
+    listing.close()
+    assert time.time() - start < 0.5
+    time.sleep(0.2)
+    assert transport.count('/tags/list') <= 3
+
+
+def test_tags_are_revalidated_with_their_etag():
+    transport = FakeTransport()
+    for _ in range(2):
+        with docker_image.FromRegistry(repository('app'), docker_creds.Anonymous(),
+                                       transport) as img:
+            assert img.tags() == ['latest']
+    conditional = [etag for url, etag in transport.requests if url.endswith('/tags/list')]
+    assert conditional[0] is None
+    assert conditional[1] is not None
+
+
+def test_etag_cache_evicts_least_recently_used():
+    cache = docker_http.ETagCache(max_entries=2)
+    cache.put('a', '"1"', {}, b'a')
+    cache.put('b', '"2"', {}, b'b')
+    assert cache.get('a')[2] == b'a'
+    cache.put('c', '"3"', {}, b'c')
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_catalog_follows_pagination(prefetch):
+    names = ['repo{}'.format(i) for i in range(7)]
+    transport = FakeTransport(names, page_size=3)
+    with docker_image.FromRegistry(docker_name.Registry(REGISTRY),
+                                   docker_creds.Anonymous(), transport) as img:
+        assert list(img.catalog(page_size=3, prefetch=prefetch)) == names
+        assert transport.count('/_catalog') == 3
+
+        assert list(img.catalog(page_size=3, prefetch=prefetch)) == names
+    revalidated = [etag for url, etag in transport.requests if '/_catalog' in url][3:]
+    assert len(revalidated) == 3
+    assert all(etag is not None for etag in revalidated)
+
+
+def test_catalog_prefetch_stops_with_the_caller():
+    names = ['repo{}'.format(i) for i in range(10)]
+    transport = FakeTransport(names, page_size=2)
+    with docker_image.FromRegistry(docker_name.Registry(REGISTRY),
+                                   docker_creds.Anonymous(), transport) as img:
+        catalog = img.catalog(page_size=2)
+        assert [next(catalog), next(catalog)] == names[:2]
+        catalog.close()
+    time.sleep(0.1)
+    assert transport.count('/_catalog') <= 2
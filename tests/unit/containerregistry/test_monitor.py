@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from containerregistry.client import monitor_ as monitor
+
+
+class FailingSink(monitor.Sink):
+
+    def record(self, sample):
+        raise IOError("disk full")
+
+
+@pytest.fixture(autouse=True)
+def reset_monitor():
+    yield
+    monitor.Configure(None)
+
+
+def test_recording_aggregates_operations():
+    aggregator = monitor.Aggregator()
+    monitor.Configure(aggregator)
+    with monitor.Operation('blob_upload') as operation:
+        assert monitor.Current() is operation
+        operation.set_status(201)
+        operation.add_bytes(sent=10)
+        operation.add_retry()
+    with pytest.raises(ValueError):
+        with monitor.Operation('blob_upload'):
+            raise ValueError()
+    assert isinstance(monitor.Current(), monitor.Nop)
+
+    stats = aggregator.summary()['blob_upload']
+    assert (stats['count'], stats['errors'], stats['retries']) == (2, 1, 1)
+    assert stats['bytes_sent'] == 10
+    assert stats['statuses'] == {201: 1}
+
+
+def test_sink_errors_do_not_fail_the_operation():
+    aggregator = monitor.Aggregator()
+    monitor.Configure(monitor.Tee(FailingSink(), aggregator))
+    with monitor.Operation('manifest_put'):
+        pass
+    assert aggregator.summary()['manifest_put']['count'] == 1
+
+    monitor.Configure(FailingSink())
+    with monitor.Operation('manifest_put'):
+        pass
+
+
+def test_json_lines():
+    out = io.StringIO()
+    monitor.Configure(monitor.JsonLines(out))
+    with monitor.Operation('ping') as operation:
+        operation.set_status(200)
+    line = json.loads(out.getvalue())
+    assert (line['operation'], line['status'], line['error']) == ('ping', 200, None)
+
+
+def test_prometheus_textfile_concurrent_writes(tmpdir):
+    path = str(tmpdir.join('registry.prom'))
+    sink = monitor.PrometheusTextfile(path, interval=0)
+    monitor.Configure(sink)
+
+    def push():
+        for _ in range(50):
+            with monitor.Operation('blob_upload'):
+                pass
+
+    threads = [threading.Thread(target=push) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path) as f:
+        content = f.read()
+    assert 'registry_operation_total{operation="blob_upload"} 400' in content
+    assert os.listdir(str(tmpdir)) == ['registry.prom']
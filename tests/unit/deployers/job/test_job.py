@@ -0,0 +1,242 @@
+import datetime
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.deployers.job.job import Job
+from kubeflow.fairing.deployers.serving.serving import Serving
+from kubeflow.fairing.deployers.tfjob.tfjob import TfJob
+from kubeflow.fairing.kubernetes.informer import JobInformer
+from kubeflow.fairing.kubernetes.manager import KubeManager
+
+pytestmark = pytest.mark.usefixtures('offline_kube_manager')
+
+START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def at(seconds):
+    return START + datetime.timedelta(seconds=seconds)
+
+
+def labels():
+    return {constants.FAIRING_DEPLOYER_LABEL: 'job', constants.FAIRING_ID_LABEL: 'abc'}
+
+
+def new_job(**kwargs):
+    #pylint:disable=protected-access
+    job = Job(namespace='kubeflow', **kwargs)
+    job.backend = MagicMock()
+    job.backend._job_result = KubeManager._job_result
+    job.backend.pod_event_time.return_value = at(3)
+    informer = JobInformer(job.backend, 'kubeflow')
+    job.backend.job_informer.return_value = informer
+    job.job_id = 'abc'
+    job._created_job = client.V1Job(metadata=client.V1ObjectMeta(
+        name='fairing-job-x', namespace='kubeflow', creation_timestamp=at(0)))
+    job.created_at = at(0)
+    return job, informer
+
+
+def running_pod(ready=True):
+    return client.V1Pod(
+        metadata=client.V1ObjectMeta(name='fairing-job-x-1', labels=labels()),
+        status=client.V1PodStatus(
+            phase='Running',
+            conditions=[client.V1PodCondition(type='PodScheduled', status='True',
+                                              last_transition_time=at(1))],
+            container_statuses=[client.V1ContainerStatus(
+                name='fairing-job', restart_count=0, ready=ready, image='i', image_id='i',
+                state=client.V1ContainerState(
+                    running=client.V1ContainerStateRunning(started_at=at(4))))]))
+
+
+def completed_job():
+    return client.V1Job(
+        metadata=client.V1ObjectMeta(name='fairing-job-x', labels=labels()),
+        status=client.V1JobStatus(
+            start_time=at(0), completion_time=at(10),
+            conditions=[client.V1JobCondition(type='Complete', status='True')]))
+
+
+def test_status_reports_phase_timings():
+    #pylint:disable=protected-access
+    job, informer = new_job()
+    assert job.status().phase == constants.JOB_CREATED
+    informer._handle('ADDED', running_pod())
+    status = job.status()
+    assert status.phase == constants.JOB_RUNNING
+    informer._handle('MODIFIED', completed_job())
+    status = job.status()
+    assert status.finished
+    assert status.durations() == [(constants.JOB_CREATED, 1), (constants.JOB_SCHEDULED, 2),
+                                  (constants.JOB_IMAGE_PULLED, 1), (constants.JOB_RUNNING, 6)]
+    job.backend.pod_event_time.assert_called_once_with('fairing-job-x-1', 'kubeflow', 'Pulled')
+
+
+def test_wait_returns_on_completion_and_cleans_up():
+    #pylint:disable=protected-access
+    job, informer = new_job(cleanup=True)
+    informer._handle('ADDED', running_pod())
+    threading.Timer(0.1, informer._handle, ('MODIFIED', completed_job())).start()
+    status = job.wait(timeout=5)
+    assert status.phase == constants.JOB_SUCCEEDED
+    job.backend.api_instance.delete_namespaced_job.assert_called_once()
+    job.backend.log.assert_not_called()
+
+
+def test_wait_times_out():
+    job, _ = new_job(cleanup=True)
+    status = job.wait(timeout=0.1)
+    assert not status.finished
+    job.backend.api_instance.delete_namespaced_job.assert_not_called()
+
+
+def test_wait_streaming_logs_times_out_when_the_logs_hang():
+    job, _ = new_job()
+    hung = threading.Event()
+    job.backend.log.side_effect = lambda *args, **kwargs: hung.wait(10)
+    start = time.time()
+    status = job.wait(timeout=0.2, stream_logs=True)
+    assert not status.finished
+    assert time.time() - start < 5
+    job.backend.log.assert_called_once()
+    hung.set()
+
+
+def tfjob(condition=None):
+    return {'kind': constants.TF_JOB_KIND,
+            'metadata': {'name': 'fairing-tfjob-x', 'namespace': 'kubeflow',
+                         'creationTimestamp': '2020-01-01T00:00:00Z', 'labels': labels()},
+            'status': {'conditions': [{'type': condition, 'status': 'True',
+                                       'lastTransitionTime': '2020-01-01T00:00:10Z'}]
+                                     if condition else []}}
+
+
+def test_tfjob_finishes_through_the_watch_of_its_kind():
+    #pylint:disable=protected-access
+    job = TfJob(namespace='kubeflow')
+    job.backend = MagicMock()
+    job.backend._job_result = KubeManager._job_result
+    informer = JobInformer(job.backend, 'kubeflow')
+    job.backend.job_informer.return_value = informer
+    job.job_id = 'abc'
+    job.created_tfjob = tfjob()
+    job.created_at = at(0)
+
+    def watch_events(list_func, unused_namespace, stop=None, **unused_kwargs):
+        if list_func.args == (constants.TF_JOB_KIND,):
+            yield 'LISTED', {'items': [tfjob()]}
+        stop.wait()
+
+    job.backend._watch_events.side_effect = watch_events
+    threading.Timer(0.1, informer._handle, ('MODIFIED', tfjob(constants.JOB_SUCCEEDED))).start()
+    status = job.wait(timeout=5)
+    informer.stop()
+    assert status.phase == constants.JOB_SUCCEEDED
+    assert status.phase_times[-1][1] == at(10)
+    job.backend.custom_job_result.assert_not_called()
+
+
+def test_serving_waits_for_the_deployment_to_be_available():
+    #pylint:disable=protected-access
+    with patch('kubeflow.fairing.deployers.job.job.KubeManager'):
+        serving = Serving(namespace='kubeflow', use_seldon=False)
+    serving.backend._job_result = KubeManager._job_result
+    serving.backend.pod_event_time.return_value = at(3)
+    informer = JobInformer(serving.backend, 'kubeflow')
+    serving.backend.job_informer.return_value = informer
+    serving.job_id = 'abc'
+    serving.created_at = at(0)
+    serving.deployment = client.V1Deployment(metadata=client.V1ObjectMeta(
+        name='fairing-deployer-x', namespace='kubeflow', creation_timestamp=at(0)))
+
+    def deployment(available_replicas):
+        return client.V1Deployment(
+            spec=client.V1DeploymentSpec(replicas=1, selector=client.V1LabelSelector(),
+                                         template=client.V1PodTemplateSpec()),
+            status=client.V1DeploymentStatus(available_replicas=available_replicas))
+
+    serving.apps_v1.read_namespaced_deployment_status.side_effect = [deployment(None),
+                                                                      deployment(1)]
+    informer._handle('ADDED', running_pod(ready=False))
+    threading.Timer(0.1, informer._handle, ('MODIFIED', running_pod())).start()
+    status = serving.wait(timeout=5)
+    assert status.phase == constants.JOB_RUNNING
+    assert serving.apps_v1.read_namespaced_deployment_status.call_count == 2
+    assert serving.status().phase == constants.JOB_RUNNING
+
+
+def api_server(drops_completion_mode=False):
+    """create_namespaced_job answering the raw job the API server would create."""
+    def create(namespace, body, _preload_content):
+        created = dict(body, metadata=dict(body['metadata'], name='fairing-job-y',
+                                            namespace=namespace, uid='uid-1',
+                                            creationTimestamp='2020-01-01T00:00:00Z'))
+        if drops_completion_mode:
+            created['spec'] = {k: v for k, v in body['spec'].items() if k != 'completionMode'}
+        response = MagicMock()
+        response.data = json.dumps(created)
+        return response
+    return create
+
+
+def new_indexed_job():
+    job, _ = new_job()
+    job.backend.api_client = client.ApiClient()
+    job.backend.api_v1.create_namespaced_config_map.return_value = client.V1ConfigMap(
+        metadata=client.V1ObjectMeta(name='fairing-sweep-abc'))
+    job.backend.api_instance.create_namespaced_job.side_effect = api_server()
+    return job
+
+
+def pod_spec():
+    return client.V1PodSpec(containers=[client.V1Container(name='model', image='i')])
+
+
+def test_deploy_indexed_submits_one_job_for_every_trial():
+    job = new_indexed_job()
+    params = [{'lr': 0.1}, {'lr': 0.01}, {'lr': 0.001}]
+    assert job.deploy_indexed(pod_spec(), params, parallelism=2) == 'fairing-job-y'
+    assert job.created_at == START
+
+    config_map = job.backend.api_v1.create_namespaced_config_map.call_args[0][1]
+    assert sorted(config_map.data) == ['trial-0.json', 'trial-1.json', 'trial-2.json']
+    spec = job.backend.api_instance.create_namespaced_job.call_args[0][1]['spec']
+    assert spec['completionMode'] == 'Indexed'
+    assert (spec['completions'], spec['parallelism']) == (3, 2)
+    env = {e['name']: e for e in spec['template']['spec']['containers'][0]['env']}
+    assert env[constants.SWEEP_PARAMS_FILE_ENV]['value'] == \
+        '/etc/fairing/params/trial-$(JOB_COMPLETION_INDEX).json'
+    assert constants.JOB_COMPLETION_INDEX_ANNOTATION in \
+        env[constants.JOB_COMPLETION_INDEX_ENV]['valueFrom']['fieldRef']['fieldPath']
+    owner = job.backend.api_v1.patch_namespaced_config_map.call_args[0][2]
+    assert owner['metadata']['ownerReferences'][0]['uid'] == 'uid-1'
+    job.backend.api_v1.delete_namespaced_config_map.assert_not_called()
+
+
+def test_deploy_indexed_fails_when_the_server_drops_the_completion_mode():
+    job = new_indexed_job()
+    job.backend.api_instance.create_namespaced_job.side_effect = \
+        api_server(drops_completion_mode=True)
+    with pytest.raises(RuntimeError):
+        job.deploy_indexed(pod_spec(), [{'lr': 0.1}, {'lr': 0.01}])
+    assert job.backend.api_instance.delete_namespaced_job.call_args[0][:2] == \
+        ('fairing-job-y', 'kubeflow')
+    job.backend.api_v1.delete_namespaced_config_map.assert_called_once_with(
+        'fairing-sweep-abc', 'kubeflow')
+
+
+def test_deploy_indexed_deletes_the_config_map_when_the_job_is_not_created():
+    job = new_indexed_job()
+    job.backend.api_instance.create_namespaced_job.side_effect = \
+        client.rest.ApiException(status=403)
+    with pytest.raises(client.rest.ApiException):
+        job.deploy_indexed(pod_spec(), [{'lr': 0.1}])
+    job.backend.api_v1.delete_namespaced_config_map.assert_called_once_with(
+        'fairing-sweep-abc', 'kubeflow')
+    job.backend.api_v1.patch_namespaced_config_map.assert_not_called()
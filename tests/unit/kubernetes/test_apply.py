@@ -0,0 +1,120 @@
+import json
+import threading
+
+import pytest
+
+from kubeflow.fairing.kubernetes.apply import Applier, ResourceResolver
+
+DISCOVERY = {
+    '/api/v1': [('namespaces', 'Namespace', False), ('services', 'Service', True),
+                ('pods', 'Pod', True), ('pods/log', 'Pod', True)],
+    '/apis/apps/v1': [('deployments', 'Deployment', True)],
+    '/apis/apiextensions.k8s.io/v1': [('customresourcedefinitions',
+                                       'CustomResourceDefinition', False)],
+    '/apis/kubeflow.org/v1': [('tfjobs', 'TFJob', True)],
+}
+
+MANIFESTS = '''
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: web
+---
+apiVersion: kubeflow.org/v1
+kind: TFJob
+metadata:
+  name: train
+  namespace: team
+---
+apiVersion: v1
+kind: Service
+metadata:
+  name: web
+'''
+
+
+class FakeApiClient(object):
+    """Serves discovery documents and records every other call."""
+
+    def __init__(self):
+        self.calls = []
+        self.discovered = []
+        self._lock = threading.Lock()
+
+    def call_api(self, path, method, query_params=None, header_params=None, body=None,
+                 **unused_kwargs):
+        if method == 'GET':
+            self.discovered.append(path)
+            return {'resources': [{'name': name, 'kind': kind, 'namespaced': namespaced}
+                                  for name, kind, namespaced in DISCOVERY[path]]}
+        with self._lock:
+            self.calls.append((method, path, query_params, header_params['Content-Type'],
+                               body))
+        return {'path': path}
+
+
+def test_apply_orders_tiers_and_resolves_paths_once():
+    api_client = FakeApiClient()
+    applier = Applier(api_client, ResourceResolver(api_client), default_namespace='kubeflow')
+    namespace = {'apiVersion': 'v1', 'kind': 'Namespace', 'metadata': {'name': 'team'}}
+    crd = {'apiVersion': 'apiextensions.k8s.io/v1', 'kind': 'CustomResourceDefinition',
+           'metadata': {'name': 'tfjobs.kubeflow.org'}}
+
+    results = applier.run([MANIFESTS, crd, namespace], mode='apply')
+
+    assert [result['path'] for result in results] == [
+        '/apis/apps/v1/namespaces/kubeflow/deployments/web',
+        '/apis/kubeflow.org/v1/namespaces/team/tfjobs/train',
+        '/api/v1/namespaces/kubeflow/services/web',
+        '/apis/apiextensions.k8s.io/v1/customresourcedefinitions/tfjobs.kubeflow.org',
+        '/api/v1/namespaces/team']
+    paths = [call[1] for call in api_client.calls]
+    assert paths[0] == '/api/v1/namespaces/team'
+    assert paths[1].endswith('/customresourcedefinitions/tfjobs.kubeflow.org')
+    assert paths[2] == '/api/v1/namespaces/kubeflow/services/web'
+    assert sorted(api_client.discovered) == sorted(DISCOVERY)
+    method, _, query, content_type, body = api_client.calls[0]
+    assert (method, content_type) == ('PATCH', 'application/apply-patch+yaml')
+    assert ('force', 'true') in query
+    assert json.loads(body) == namespace
+
+
+def test_delete_goes_the_other_way_round():
+    api_client = FakeApiClient()
+    applier = Applier(api_client, ResourceResolver(api_client), default_namespace='kubeflow')
+    namespace = {'apiVersion': 'v1', 'kind': 'Namespace', 'metadata': {'name': 'team'}}
+    applier.run([namespace, MANIFESTS], mode='delete')
+    assert api_client.calls[-1][:2] == ('DELETE', '/api/v1/namespaces/team')
+
+
+def test_patch_uses_strategic_merge_for_built_in_kinds_only():
+    api_client = FakeApiClient()
+    applier = Applier(api_client, ResourceResolver(api_client), default_namespace='kubeflow')
+    applier.run([MANIFESTS], mode='patch')
+    content_types = {path.rsplit('/', 2)[1]: content_type
+                     for _, path, _, content_type, _ in api_client.calls}
+    assert content_types == {'deployments': 'application/strategic-merge-patch+json',
+                             'services': 'application/strategic-merge-patch+json',
+                             'tfjobs': 'application/merge-patch+json'}
+
+
+def test_unknown_kind_fails(monkeypatch):
+    monkeypatch.setattr('kubeflow.fairing.constants.constants.APPLY_DISCOVERY_RETRY_SECONDS', 0)
+    api_client = FakeApiClient()
+    applier = Applier(api_client, ResourceResolver(api_client), default_namespace='kubeflow')
+    with pytest.raises(RuntimeError):
+        applier.run([{'apiVersion': 'apps/v1', 'kind': 'StatefulSet',
+                      'metadata': {'name': 'db'}}], mode='create')
+    assert not api_client.calls
+
+
+def test_apply_namespaced_object_takes_a_single_document(kube_manager, monkeypatch):
+    monkeypatch.setattr('kubeflow.fairing.utils.get_default_target_namespace',
+                        lambda: 'kubeflow')
+    kube_manager.api_client = FakeApiClient()
+    service = MANIFESTS.split('---')[2]
+    assert kube_manager.apply_namespaced_object(service)['path'] == \
+        '/api/v1/namespaces/kubeflow/services'
+    with pytest.raises(ValueError):
+        kube_manager.apply_namespaced_object(MANIFESTS)
+    assert len(kube_manager.api_client.calls) == 1
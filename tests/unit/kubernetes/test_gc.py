@@ -0,0 +1,56 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes.gc import GarbageCollector
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+def job(name, hours_ago=None):
+    finished = hours_ago is not None
+    return client.V1Job(
+        metadata=client.V1ObjectMeta(name=name),
+        status=client.V1JobStatus(
+            completion_time=NOW - datetime.timedelta(hours=hours_ago) if finished else None,
+            conditions=[client.V1JobCondition(type='Complete', status='True')]
+            if finished else None))
+
+
+def tfjob(name, hours_ago):
+    finished = (NOW - datetime.timedelta(hours=hours_ago)).isoformat()
+    return {'metadata': {'name': name},
+            'status': {'completionTime': finished,
+                       'conditions': [{'type': constants.JOB_FAILED, 'status': 'True'}]}}
+
+
+def test_collect_deletes_jobs_finished_before_max_age(kube_manager):
+    pages = {
+        (constants.FAIRING_DEPLOYER_LABEL, None): client.V1JobList(
+            metadata=client.V1ListMeta(_continue='next'),
+            items=[job('old', hours_ago=48), job('running')]),
+        (constants.FAIRING_DEPLOYER_LABEL, 'next'): client.V1JobList(
+            metadata=client.V1ListMeta(), items=[job('recent', hours_ago=1)]),
+        (constants.FAIRING_BUILDER_LABEL, None): client.V1JobList(
+            metadata=client.V1ListMeta(), items=[job('old-build', hours_ago=30)]),
+    }
+    kube_manager.api_instance.list_namespaced_job.side_effect = \
+        lambda namespace, label_selector, limit, _continue: pages[(label_selector, _continue)]
+    custom_api = MagicMock()
+    custom_api.list_namespaced_custom_object.side_effect = [
+        {'items': [tfjob('old-tfjob', 72), tfjob('recent-tfjob', 2)]},
+        client.rest.ApiException(status=404)]
+
+    with patch('kubeflow.fairing.kubernetes.gc.client.CustomObjectsApi',
+               return_value=custom_api):
+        result = GarbageCollector(kube_manager, 'kubeflow', max_age=24 * 3600).collect()
+
+    assert result.succeeded
+    assert sorted(result.created) == ['old', 'old-build', 'old-tfjob']
+    delete_job = kube_manager.api_instance.delete_namespaced_job
+    assert sorted(call[0][0] for call in delete_job.call_args_list) == ['old', 'old-build']
+    body = delete_job.call_args[1]['body']
+    assert body.propagation_policy == 'Background'
+    assert custom_api.delete_namespaced_custom_object.call_args[0][4] == 'old-tfjob'
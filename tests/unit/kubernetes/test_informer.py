@@ -0,0 +1,118 @@
+import datetime
+import threading
+from unittest.mock import MagicMock, patch
+
+from kubernetes import client
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes.informer import JobInformer
+from kubeflow.fairing.kubernetes.manager import KubeManager
+
+
+def labelled(obj, name, fairing_id):
+    obj.metadata = client.V1ObjectMeta(name=name, labels={
+        constants.FAIRING_DEPLOYER_LABEL: 'job', constants.FAIRING_ID_LABEL: fairing_id})
+    return obj
+
+
+def pod(name, fairing_id, phase='Running'):
+    return labelled(client.V1Pod(status=client.V1PodStatus(phase=phase)), name, fairing_id)
+
+
+def job(name, fairing_id, condition=None):
+    start = datetime.datetime(2020, 1, 1)
+    return labelled(client.V1Job(status=client.V1JobStatus(
+        start_time=start, completion_time=start,
+        conditions=[client.V1JobCondition(type=condition, status='True')]
+        if condition else None)), name, fairing_id)
+
+
+def new_informer():
+    manager = MagicMock()
+    manager._job_result = KubeManager._job_result  #pylint:disable=protected-access
+    return JobInformer(manager, 'kubeflow')
+
+
+def test_events_are_dispatched_per_fairing_id():
+    informer = new_informer()
+    informer._handle('ADDED', pod('a-1', 'a'))  #pylint:disable=protected-access
+    events = []
+    subscription = informer.subscribe('a', callback=lambda t, obj: events.append(
+        (t, obj.metadata.name)))
+    other = informer.subscribe('b')
+    informer._handle('MODIFIED', pod('b-1', 'b', phase='Pending'))  #pylint:disable=protected-access
+    informer._handle('MODIFIED', job('a', 'a'))  #pylint:disable=protected-access
+    assert subscription.status == ['Running']
+    assert subscription.wait(timeout=0) is None
+
+    informer._handle('MODIFIED', job('a', 'a', 'Complete'))  #pylint:disable=protected-access
+    assert subscription.wait(timeout=0).succeeded
+    assert subscription.status == constants.JOB_SUCCEEDED
+    assert events == [('ADDED', 'a-1'), ('MODIFIED', 'a'), ('MODIFIED', 'a')]
+    assert list(other.pods) == ['b-1']
+
+
+def test_relisting_drops_deleted_pods():
+    #pylint:disable=protected-access
+    informer = new_informer()
+    subscription = informer.subscribe('a')
+    informer._sync(client.V1Pod.__name__, [pod('a-1', 'a'), pod('a-2', 'a')])
+    informer._handle('ADDED', job('a', 'a'))
+    informer._sync(client.V1Pod.__name__, [pod('a-2', 'a')])
+    assert list(subscription.pods) == ['a-2']
+    assert subscription.job is not None
+    informer.unsubscribe(subscription)
+    assert not informer._subscriptions
+
+
+def test_waiting_for_a_pod_shares_the_namespace_watch():
+    #pylint:disable=protected-access
+    informer = new_informer()
+    listed = threading.Event()
+
+    def watch_events(unused_list_func, unused_namespace, stop=None, **kwargs):
+        assert kwargs['label_selector'] == constants.FAIRING_DEPLOYER_LABEL
+        yield 'LISTED', client.V1PodList(items=[pod('a-1', 'a', phase='Pending')])
+        listed.set()
+        stop.wait()
+
+    informer.kube_manager._watch_events.side_effect = watch_events
+    informer.start()
+    subscription = informer.subscribe('a')
+    assert listed.wait(5)
+    threading.Timer(0.1, informer._handle, ('MODIFIED', pod('a-1', 'a', 'Succeeded'))).start()
+    started = subscription.wait_for(
+        lambda sub: [p for p in sub.pods.values() if p.status.phase == 'Succeeded'], timeout=5)
+    informer.stop()
+    assert [p.metadata.name for p in started] == ['a-1']
+    assert informer.kube_manager._watch_events.call_count == 2
+
+
+def test_replay_is_not_overwritten_by_newer_events():
+    #pylint:disable=protected-access
+    informer = new_informer()
+    informer._handle('ADDED', pod('a-1', 'a', phase='Pending'))
+    informer._handle('ADDED', pod('a-2', 'a', phase='Pending'))
+    newer = threading.Thread(target=informer._handle,
+                             args=('MODIFIED', pod('a-2', 'a', phase='Running')))
+
+    def on_event(unused_event_type, obj):
+        # A watch event arriving while the known objects are replayed.
+        if obj.metadata.name == 'a-1' and not newer.is_alive():
+            newer.start()
+            newer.join(0.2)
+
+    subscription = informer.subscribe('a', callback=on_event)
+    newer.join(5)
+    assert subscription.pods['a-2'].status.phase == 'Running'
+
+
+def test_waiting_for_the_logs_of_a_deleted_pod_ends(kube_manager):
+    informer = JobInformer(kube_manager, 'kubeflow')
+    informer._handle('ADDED', pod('a-1', 'a', phase='Pending'))  #pylint:disable=protected-access
+    deleted = pod('a-1', 'a', phase='Pending')
+    threading.Timer(0.1, informer._handle, ('DELETED', deleted)).start()  #pylint:disable=protected-access
+    with patch.object(KubeManager, 'job_informer', return_value=informer):
+        found = kube_manager._wait_for_log_pod(  #pylint:disable=protected-access
+            'kubeflow', {constants.FAIRING_ID_LABEL: 'a'})
+    assert found is deleted
@@ -0,0 +1,72 @@
+from unittest.mock import MagicMock, patch
+
+from kubernetes import client
+
+from kubeflow.fairing.kubernetes.logs import LogAggregator, timestamp_key
+
+
+class FakeLog(object):
+    def __init__(self, lines):
+        self.data = ''.join("{} {}\n".format(ts, text) for ts, text in lines).encode()
+
+    def stream(self, unused_amt):
+        # Split mid-line to check lines are reassembled.
+        yield self.data[:7]
+        yield self.data[7:]
+
+    def release_conn(self):
+        pass
+
+
+def pod(name, replica_index, phase='Running', restarts=0):
+    return client.V1Pod(
+        metadata=client.V1ObjectMeta(name=name, labels={
+            'tf-replica-type': 'worker', 'tf-replica-index': replica_index}),
+        status=client.V1PodStatus(phase=phase, container_statuses=[
+            client.V1ContainerStatus(
+                name='tensorflow', restart_count=restarts, ready=True, image='i', image_id='i',
+                state=client.V1ContainerState(running=client.V1ContainerStateRunning()))]))
+
+
+def test_timestamp_key_orders_variable_fractions():
+    assert timestamp_key('2020-01-01T00:00:01Z') < timestamp_key('2020-01-01T00:00:01.1Z')
+    assert timestamp_key('2020-01-01T00:00:01.45Z') < timestamp_key('2020-01-01T00:00:01.5Z')
+
+
+def test_every_replica_is_followed_without_repeated_lines(tmpdir):
+    pods = {
+        # worker-0's stream drops, then the pod finishes.
+        'job-worker-0': [pod('job-worker-0', '0'), pod('job-worker-0', '0'),
+                         pod('job-worker-0', '0', 'Succeeded')],
+        # worker-1 restarted: its new container's log starts over.
+        'job-worker-1': [pod('job-worker-1', '1', restarts=1),
+                         pod('job-worker-1', '1', 'Succeeded', restarts=1)],
+    }
+    logs = {
+        'job-worker-0': [[('2020-01-01T00:00:01Z', 'a'), ('2020-01-01T00:00:02Z', 'b')],
+                         [('2020-01-01T00:00:01Z', 'a'), ('2020-01-01T00:00:02Z', 'b'),
+                          ('2020-01-01T00:00:02.5Z', 'c')],
+                         [('2020-01-01T00:00:01Z', 'a'), ('2020-01-01T00:00:02Z', 'b'),
+                          ('2020-01-01T00:00:02.5Z', 'c')]],
+        'job-worker-1': [[('2020-01-01T00:00:01Z', 'x')], [('2020-01-01T00:00:01Z', 'x')]],
+    }
+    manager = MagicMock()
+    manager.api_v1.read_namespaced_pod.side_effect = lambda name, ns: pods[name].pop(0)
+    manager.api_v1.read_namespaced_pod_log.side_effect = \
+        lambda name, ns, **kwargs: FakeLog(logs[name].pop(0))
+
+    def subscribe(unused_fairing_id, callback):
+        for name in pods:
+            callback('ADDED', pod(name, name[-1]))
+
+    manager.job_informer.return_value.subscribe.side_effect = subscribe
+    lines = []
+    aggregator = LogAggregator(manager, 'kubeflow', 'tensorflow',
+                               replica_labels=('tf-replica-type', 'tf-replica-index'),
+                               output_dir=str(tmpdir), stream_logs=False,
+                               line_handler=lambda replica, line: lines.append((replica, line)))
+    with patch('kubeflow.fairing.kubernetes.logs.constants.LOG_RETRY_SECONDS', 0):
+        assert aggregator.follow('abc', replicas=2, timeout=10)
+    assert [line for replica, line in lines if replica == 'worker-0'] == ['a', 'b', 'c']
+    assert [line for replica, line in lines if replica == 'worker-1'] == ['x']
+    assert tmpdir.join('worker-0.log').read() == 'a\nb\nc\n'
@@ -0,0 +1,202 @@
+import datetime
+import itertools
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes import client, watch
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.kubernetes import cache as cache_module
+from kubeflow.fairing.kubernetes import manager as manager_module
+from kubeflow.fairing.kubernetes.manager import KubeManager
+
+
+def job(resource_version, condition=None):
+    start = datetime.datetime(2020, 1, 1, 0, 0, 0)
+    return client.V1Job(
+        metadata=client.V1ObjectMeta(name='build', namespace='kubeflow',
+                                     resource_version=resource_version),
+        status=client.V1JobStatus(
+            start_time=start,
+            completion_time=start + datetime.timedelta(seconds=30)
+            if condition == 'Complete' else None,
+            conditions=[client.V1JobCondition(type=condition, status='True',
+                                              reason='BackoffLimitExceeded'
+                                              if condition == 'Failed' else None)]
+            if condition else None))
+
+
+class FakeWatch(object):
+    """Replays the given events, recording the resource_version of every watch."""
+    events = []
+    resource_versions = []
+
+    def stream(self, unused_func, *unused_args, **kwargs):
+        FakeWatch.resource_versions.append(kwargs['resource_version'])
+        while FakeWatch.events:
+            yield FakeWatch.events.pop(0)
+
+    def stop(self):
+        pass
+
+
+def run_wait(kube_manager, events, **kwargs):
+    kube_manager.api_instance.list_namespaced_job.return_value = client.V1JobList(
+        metadata=client.V1ListMeta(resource_version='1'), items=[job('1')])
+    FakeWatch.events = [{'type': 'MODIFIED', 'object': obj, 'raw_object': {}}
+                        for obj in events]
+    FakeWatch.resource_versions = []
+    with patch('kubeflow.fairing.kubernetes.manager.watch.Watch', FakeWatch):
+        return kube_manager.wait_for_job('build', 'kubeflow', stream_logs=False, **kwargs)
+
+
+def test_wait_for_job_succeeded(kube_manager):
+    result = run_wait(kube_manager, [job('2'), job('3', 'Complete')])
+    assert result.succeeded
+    assert result.duration == 30
+    assert FakeWatch.resource_versions == ['1']
+
+
+def test_wait_for_job_failed(kube_manager):
+    result = run_wait(kube_manager, [job('2', 'Failed')])
+    assert result.status == constants.JOB_FAILED
+    assert result.reason == 'BackoffLimitExceeded'
+
+
+def test_wait_for_job_resumes_watch_and_times_out(kube_manager):
+    # Every reading of the clock advances it by 4 seconds.
+    with patch('kubeflow.fairing.kubernetes.manager.time.time',
+               side_effect=itertools.count(0, 4)):
+        result = run_wait(kube_manager, [job('2')], timeout=10)
+    assert result.status == constants.JOB_TIMED_OUT
+    assert FakeWatch.resource_versions == ['1', '2']
+
+
+class FakeCRDClient(object):
+    def __init__(self, **unused_kwargs):
+        self.custom_api = client.CustomObjectsApi()
+        self.core_api = client.CoreV1Api()
+
+
+def test_managers_share_clients():
+    #pylint:disable=protected-access
+    with patch.dict(manager_module._clients, clear=True), \
+            patch('kubeflow.fairing.kubernetes.manager.config.load_kube_config') as load, \
+            patch('kubeflow.fairing.kubernetes.manager.is_running_in_k8s', return_value=False):
+        first, second = KubeManager(), KubeManager()
+        other_context = KubeManager(context='other')
+        crd_client = first._crd_client(FakeCRDClient)
+        assert second._crd_client(FakeCRDClient) is crd_client
+    assert load.call_count == 2
+    assert first.api_client is second.api_client
+    assert other_context.api_client is not first.api_client
+    assert crd_client.custom_api.api_client is first.api_client
+    assert crd_client.core_api.api_client is first.api_client
+
+
+def test_secret_exists_reads_the_secret(kube_manager):
+    assert kube_manager.secret_exists('user-gcp-sa', 'kubeflow')
+    kube_manager.api_v1.read_namespaced_secret.assert_called_once_with('user-gcp-sa', 'kubeflow')
+    kube_manager.api_v1.read_namespaced_secret.side_effect = client.rest.ApiException(status=404)
+    assert not kube_manager.secret_exists('user-gcp-sa', 'kubeflow')
+    kube_manager.api_v1.list_namespaced_secret.assert_not_called()
+
+
+def test_cached_namespace_answers_in_memory(kube_manager):
+    #pylint:disable=protected-access
+    kube_manager.api_client.call_api.return_value = client.V1SecretList(
+        metadata=client.V1ListMeta(resource_version='1'),
+        items=[client.V1Secret(metadata=client.V1ObjectMeta(name='user-gcp-sa'))])
+    FakeWatch.events = []
+    with patch('kubeflow.fairing.kubernetes.manager.watch.Watch', FakeWatch), \
+            patch.dict(manager_module._namespace_caches, clear=True):
+        cache = kube_manager.cache_namespace('kubeflow', timeout=5)
+        assert kube_manager.config_map_exists('user-gcp-sa', 'kubeflow')
+        assert not kube_manager.service_account_exists('other', 'kubeflow')
+        cache.stop()
+    kube_manager.api_v1.read_namespaced_config_map.assert_not_called()
+    kube_manager.api_v1.read_namespaced_service_account.assert_not_called()
+    kube_manager.api_v1.list_namespaced_secret.assert_not_called()
+    headers = {call[1]['header_params']['Accept']
+               for call in kube_manager.api_client.call_api.call_args_list}
+    assert headers == {cache_module.METADATA_LIST_ACCEPT}
+
+
+def test_secrets_are_watched_without_their_data():
+    api_client = MagicMock()
+    event = {'type': 'ADDED', 'object': {
+        'kind': 'PartialObjectMetadata', 'apiVersion': 'meta.k8s.io/v1',
+        'metadata': {'name': 'user-gcp-sa', 'resourceVersion': '2'}}}
+    response = MagicMock()
+    response.read_chunked.return_value = [json.dumps(event).encode('utf8') + b'\n']
+    api_client.call_api.return_value = response
+    list_func = cache_module.metadata_list_function(api_client, 'secrets', 'V1SecretList')
+
+    events = list(watch.Watch().stream(list_func, 'kubeflow', resource_version='1',
+                                       timeout_seconds=5))
+    assert events[0]['object'].metadata.name == 'user-gcp-sa'
+    assert events[0]['object'].data is None
+    args, kwargs = api_client.call_api.call_args
+    assert args == ('/api/v1/namespaces/{namespace}/secrets', 'GET')
+    assert kwargs['header_params']['Accept'] == cache_module.METADATA_WATCH_ACCEPT
+    assert sorted(kwargs['query_params']) == \
+        [('resourceVersion', '1'), ('timeoutSeconds', 5), ('watch', True)]
+
+
+def throttled():
+    error = client.rest.ApiException(status=429)
+    error.headers = {'Retry-After': '1'}
+    return error
+
+
+def test_create_jobs_retries_throttled_calls(kube_manager):
+    created = client.V1Job(metadata=client.V1ObjectMeta(name='fairing-job-1'))
+    kube_manager.api_instance.create_namespaced_job.side_effect = [
+        throttled(), created, client.rest.ApiException(status=403)]
+    specs = [client.V1Job(kind='Job'), client.V1Job(kind='Job')]
+    with patch('kubeflow.fairing.kubernetes.bulk.time.sleep') as sleep:
+        result = kube_manager.create_jobs('kubeflow', specs, max_workers=1)
+    assert result.names == ['fairing-job-1', None]
+    assert result.failures[0][0] == 1
+    assert result.failures[0][1].status == 403
+    assert sleep.call_count >= 1
+
+    with patch('kubeflow.fairing.kubernetes.manager.client.CustomObjectsApi') as custom_api:
+        custom_api.return_value.create_namespaced_custom_object.return_value = {
+            'metadata': {'name': 'fairing-tfjob-1'}}
+        result = kube_manager.create_jobs('kubeflow', [{'kind': constants.TF_JOB_KIND}])
+    assert result.created == ['fairing-tfjob-1']
+    assert custom_api.return_value.create_namespaced_custom_object.call_args[0][3] == \
+        constants.TF_JOB_PLURAL
+
+
+def test_log_splits_lines_before_decoding(kube_manager):
+    pod = client.V1Pod(metadata=client.V1ObjectMeta(name='build-abcde'))
+    text = 'Using caching version of cmd: RUN echo é€\nlast line'.encode('utf8')
+    tail = MagicMock()
+    tail.stream.return_value = [text[i:i + 7] for i in range(0, len(text), 7)]
+    kube_manager.api_v1.read_namespaced_pod_log.return_value = tail
+    lines = []
+    with patch.object(KubeManager, '_wait_for_log_pod', return_value=pod):
+        kube_manager.log('build', 'kubeflow', line_handler=lines.append)
+    assert lines == ['Using caching version of cmd: RUN echo é€', 'last line']
+    tail.release_conn.assert_called_once_with()
+
+
+def test_log_does_not_stream_again_on_errors(kube_manager):
+    pod = client.V1Pod(metadata=client.V1ObjectMeta(name='build-abcde'))
+
+    def broken_stream(_):
+        yield b'first\n'
+        raise client.rest.ApiException(status=500)
+
+    tail = MagicMock()
+    tail.stream.side_effect = broken_stream
+    kube_manager.api_v1.read_namespaced_pod_log.return_value = tail
+    lines = []
+    with patch.object(KubeManager, '_wait_for_log_pod', return_value=pod), \
+            pytest.raises(client.rest.ApiException):
+        kube_manager.log('build', 'kubeflow', line_handler=lines.append)
+    assert lines == ['first']
+    assert kube_manager.api_v1.read_namespaced_pod_log.call_count == 1
@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from kubernetes import client
+
+from kubeflow.fairing.cloud.gcp import add_gcp_credentials_if_exists
+from kubeflow.fairing.kubernetes import mutators
+from kubeflow.fairing.kubernetes.utils import get_resource_mutator
+
+
+def pod_spec(*env):
+    return client.V1PodSpec(containers=[client.V1Container(
+        name='model', image='example.com/img:1',
+        env=[client.V1EnvVar(name=name, value='1') for name in env] or None)])
+
+
+def test_patches_are_reused_for_the_namespace():
+    mutators.clear_cache()
+    kube_manager = MagicMock()
+    kube_manager.secret_exists.return_value = True
+    chain = [add_gcp_credentials_if_exists, get_resource_mutator(cpu='2')]
+
+    first = pod_spec()
+    mutators.run_mutators(kube_manager, first, 'kubeflow', chain)
+    calls = kube_manager.secret_exists.call_count
+    assert calls > 0
+
+    second = pod_spec('FAIRING_TRIAL_INDEX')
+    mutators.run_mutators(kube_manager, second, 'kubeflow', chain)
+    assert kube_manager.secret_exists.call_count == calls
+    assert [e.name for e in second.containers[0].env] == \
+        ['FAIRING_TRIAL_INDEX', 'GOOGLE_APPLICATION_CREDENTIALS']
+    assert second.containers[0].volume_mounts == first.containers[0].volume_mounts
+    assert second.volumes == first.volumes
+    assert second.containers[0].resources.limits == {'cpu': '2'}
+
+    mutators.run_mutators(kube_manager, pod_spec(), 'other', chain)
+    assert kube_manager.secret_exists.call_count > calls
+
+
+def test_pod_spec_dependent_mutators_and_disabled_cache():
+    mutators.clear_cache()
+    seen = []
+
+    @mutators.pod_spec_dependent
+    def tag_image(kube_manager, spec, namespace):  #pylint:disable=unused-argument
+        seen.append(spec.containers[0].image)
+        spec.containers[0].args = [spec.containers[0].image]
+
+    for image in ('a', 'b', 'a'):
+        spec = pod_spec()
+        spec.containers[0].image = image
+        mutators.run_mutators(None, spec, 'kubeflow', [tag_image])
+        assert spec.containers[0].args == [image]
+    assert seen == ['a', 'b']
+
+    mutators.run_mutators(None, pod_spec(), 'kubeflow', [tag_image], ttl=0)
+    mutators.run_mutators(None, pod_spec(), 'kubeflow', [tag_image], ttl=0)
+    assert len(seen) == 4
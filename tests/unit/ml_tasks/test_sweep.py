@@ -0,0 +1,174 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from kubernetes import client
+
+from kubeflow.fairing import executor
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.deployers.gcp.gcp import GCPJob
+from kubeflow.fairing.deployers.job.job import Job
+from kubeflow.fairing.kubernetes.bulk import BulkResult
+from kubeflow.fairing.ml_tasks.tasks import Sweep
+from kubeflow.fairing.utils import get_trial_params
+
+PARAMS = [{'lr': 0.1}, {'lr': 0.01}, {'lr': 0.001}]
+
+
+def new_sweep(kube_manager, **kwargs):
+    backend = MagicMock()
+    builder = backend.get_builder.return_value
+    builder.progress = executor.Progress()
+    builder.generate_pod_spec.return_value = client.V1PodSpec(
+        containers=[client.V1Container(name='model', image='example.com/img:1',
+                                       env=[client.V1EnvVar(name='FAIRING_RUNTIME',
+                                                            value='1')])])
+    deployer = MagicMock(spec=Job)
+    backend.get_training_deployer.return_value = deployer
+    deployer.labels = {}
+    deployer.namespace = 'kubeflow'
+    deployer.backend = kube_manager
+    deployer.deploy_all.side_effect = lambda pod_specs, labels: BulkResult(
+        ['job-{}'.format(index + 1) for index in range(len(pod_specs))], [])
+    sweep = Sweep('train.py', PARAMS, base_docker_image='python:3.6',
+                  docker_registry='example.com', backend=backend, **kwargs)
+    return sweep, builder, deployer
+
+
+def env_of(pod_spec):
+    return {e.name: e.value for e in pod_spec.containers[0].env}
+
+
+def test_sweep_builds_once_and_submits_a_job_per_trial(kube_manager):
+    sweep, builder, deployer = new_sweep(kube_manager)
+    assert sweep.submit() == ['job-1', 'job-2', 'job-3']
+    builder.build.assert_called_once_with()
+    assert deployer.stream_log is False
+    pod_specs = deployer.deploy_all.call_args[0][0]
+    labels = deployer.deploy_all.call_args[1]['labels']
+    for index, pod_spec in enumerate(pod_specs):
+        assert labels[index] == {constants.SWEEP_TRIAL_LABEL: str(index)}
+        env = env_of(pod_spec)
+        assert env['FAIRING_RUNTIME'] == '1'
+        assert env[constants.SWEEP_TRIAL_INDEX_ENV] == str(index)
+        assert json.loads(env[constants.SWEEP_PARAMS_ENV]) == PARAMS[index]
+    assert deployer.labels[constants.SWEEP_LABEL] == sweep.sweep_id
+
+
+def test_sweep_params_from_config_map(kube_manager):
+    sweep, _, deployer = new_sweep(kube_manager, params_source='configmap')
+    api_v1 = deployer.backend.api_v1
+    api_v1.create_namespaced_config_map.return_value = client.V1ConfigMap(
+        metadata=client.V1ObjectMeta(name='fairing-sweep-abc'))
+    sweep.submit()
+    assert api_v1.create_namespaced_config_map.call_args[0][0] == 'kubeflow'
+    config_map = api_v1.create_namespaced_config_map.call_args[0][1]
+    assert json.loads(config_map.data['trial-2.json']) == PARAMS[2]
+    pod_spec = deployer.deploy_all.call_args[0][0][2]
+    assert pod_spec.volumes[0].config_map.name == 'fairing-sweep-abc'
+    assert pod_spec.volumes[0].config_map.items[0].key == 'trial-2.json'
+    assert constants.SWEEP_PARAMS_ENV not in env_of(pod_spec)
+
+
+def test_sweep_config_map_is_owned_by_the_created_trials(kube_manager):
+    sweep, _, deployer = new_sweep(kube_manager, params_source='configmap')
+    manager = deployer.backend
+    manager.api_v1.create_namespaced_config_map.return_value = client.V1ConfigMap(
+        metadata=client.V1ObjectMeta(name='fairing-sweep-abc'))
+    deployer.deploy_all.side_effect = None
+    deployer.deploy_all.return_value = BulkResult(
+        ['job-1', None, 'job-3'], [(1, client.rest.ApiException(status=403))])
+    manager.api_instance.list_namespaced_job.return_value = client.V1JobList(items=[
+        client.V1Job(metadata=client.V1ObjectMeta(name=name, uid='uid-' + name))
+        for name in ('job-1', 'job-3', 'job-of-a-retried-submit')])
+    with pytest.raises(RuntimeError):
+        sweep.submit()
+    name, namespace, body = manager.api_v1.patch_namespaced_config_map.call_args[0]
+    assert (name, namespace) == ('fairing-sweep-abc', 'kubeflow')
+    owners = body['metadata']['ownerReferences']
+    assert [(owner['name'], owner['uid']) for owner in owners] == [
+        ('job-1', 'uid-job-1'), ('job-3', 'uid-job-3')]
+    manager.api_v1.delete_namespaced_config_map.assert_not_called()
+
+
+def test_sweep_config_map_is_deleted_when_no_trial_is_created(kube_manager):
+    sweep, _, deployer = new_sweep(kube_manager, params_source='configmap')
+    manager = deployer.backend
+    manager.api_v1.create_namespaced_config_map.return_value = client.V1ConfigMap(
+        metadata=client.V1ObjectMeta(name='fairing-sweep-abc'))
+    deployer.deploy_all.side_effect = None
+    deployer.deploy_all.return_value = BulkResult(
+        [None] * 3, [(index, client.rest.ApiException(status=403)) for index in range(3)])
+    with pytest.raises(RuntimeError):
+        sweep.submit()
+    manager.api_v1.delete_namespaced_config_map.assert_called_once_with(
+        'fairing-sweep-abc', 'kubeflow')
+    manager.api_v1.patch_namespaced_config_map.assert_not_called()
+
+
+def test_sweep_fails_when_trials_are_not_created(kube_manager):
+    sweep, _, deployer = new_sweep(kube_manager)
+    deployer.deploy_all.side_effect = None
+    deployer.deploy_all.return_value = BulkResult(
+        ['job-1', None, 'job-3'], [(1, client.rest.ApiException(status=403))])
+    with pytest.raises(RuntimeError):
+        sweep.submit()
+
+
+def test_indexed_sweep_submits_a_single_job(kube_manager):
+    sweep, builder, deployer = new_sweep(kube_manager, indexed=True, parallelism=2)
+    deployer.deploy_indexed.return_value = 'job-1'
+    assert sweep.submit() == ['job-1']
+    builder.build.assert_called_once_with()
+    deployer.deploy_all.assert_not_called()
+    assert deployer.deploy_indexed.call_args[0][1] == PARAMS
+    assert deployer.deploy_indexed.call_args[1] == {'parallelism': 2}
+
+
+def test_sweep_results_are_gathered_from_the_trial_logs(kube_manager):
+    sweep, _, deployer = new_sweep(kube_manager, indexed=True)
+    deployer.deploy_indexed.return_value = 'job-1'
+    kube_manager.wait_for_job = MagicMock()
+    sweep.submit()
+
+    def pod(index, phase):
+        return client.V1Pod(
+            metadata=client.V1ObjectMeta(
+                name='job-1-{}'.format(index),
+                annotations={constants.JOB_COMPLETION_INDEX_ANNOTATION: str(index)}),
+            spec=client.V1PodSpec(containers=[client.V1Container(name='fairing-job')]),
+            status=client.V1PodStatus(phase=phase))
+    api_v1 = deployer.backend.api_v1
+    api_v1.list_namespaced_pod.return_value = client.V1PodList(
+        items=[pod(2, 'Succeeded'), pod(0, 'Succeeded'), pod(1, 'Failed')])
+    api_v1.read_namespaced_pod_log.side_effect = lambda name, namespace, container: \
+        'epoch 1\n{}{}\n'.format(constants.SWEEP_TRIAL_RESULT_PREFIX,
+                                   json.dumps({'loss': int(name[-1])}))
+
+    assert sweep.results(timeout=60) == [{'loss': 0}, None, {'loss': 2}]
+    deployer.backend.wait_for_job.assert_called_once_with(
+        'job-1', 'kubeflow', timeout=pytest.approx(60, abs=1), stream_logs=False)
+
+
+def test_sweep_rejects_deployers_other_than_jobs(kube_manager):
+    sweep, builder, _ = new_sweep(kube_manager)
+    backend = sweep._backend  #pylint:disable=protected-access
+    backend.get_training_deployer.return_value = MagicMock(spec=GCPJob)
+    with pytest.raises(ValueError):
+        sweep.submit()
+    builder.build.assert_not_called()
+
+
+def test_sweep_rejects_unknown_params_source(kube_manager):
+    with pytest.raises(ValueError):
+        new_sweep(kube_manager, params_source='files')
+
+
+def test_get_trial_params(monkeypatch, tmpdir):
+    assert get_trial_params() == {}
+    monkeypatch.setenv(constants.SWEEP_PARAMS_ENV, json.dumps(PARAMS[0]))
+    assert get_trial_params() == PARAMS[0]
+    params_file = tmpdir.join('params.json')
+    params_file.write(json.dumps(PARAMS[1]))
+    monkeypatch.setenv(constants.SWEEP_PARAMS_FILE_ENV, str(params_file))
+    assert get_trial_params() == PARAMS[1]
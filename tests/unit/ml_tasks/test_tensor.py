@@ -0,0 +1,53 @@
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from kubeflow.fairing.constants import constants
+from kubeflow.fairing.ml_tasks import tensor
+from kubeflow.fairing.ml_tasks.tasks import PredictionEndpoint
+
+
+def test_tensors_round_trip_in_npy_format():
+    for array in (np.arange(12, dtype='>f4').reshape(3, 4), np.float64(3),
+                  np.arange(6).reshape(2, 3).T, np.zeros((0, 3), dtype=np.int8)):
+        encoded = tensor.encode_tensor(array)
+        np.testing.assert_array_equal(np.load(io.BytesIO(encoded)), array)
+        decoded = tensor.decode_tensor(encoded)
+        np.testing.assert_array_equal(decoded, array)
+        assert decoded.dtype.byteorder in ('<', '=', '|')
+        assert decoded.base is not None
+
+
+def new_endpoint():
+    endpoint = PredictionEndpoint.__new__(PredictionEndpoint)
+    endpoint.url = 'http://model.kubeflow.svc.cluster.local:5000/predict'
+    return endpoint
+
+
+def test_predict_nparray_binary():
+    data = np.random.rand(4, 3).astype(np.float32)
+    response = MagicMock()
+    response.text = json.dumps(tensor.encode_bin_data(data * 2))
+    with patch('kubeflow.fairing.ml_tasks.tasks.requests.post',
+               return_value=response) as post:
+        result = new_endpoint().predict_nparray(data, binary=True)
+    sent = post.call_args[1]['json']
+    assert post.call_args[1]['timeout'] == constants.PREDICT_TIMEOUT_SECONDS
+    np.testing.assert_array_equal(tensor.decode_bin_data(sent), data)
+    np.testing.assert_array_equal(result, data * 2)
+
+
+def test_predict_nparray_json():
+    response = MagicMock()
+    response.text = json.dumps({'data': {'ndarray': [1, 2]}})
+    with patch('kubeflow.fairing.ml_tasks.tasks.requests.post',
+               return_value=response) as post:
+        result = new_endpoint().predict_nparray(np.ones((1, 2)), feature_names=['a', 'b'],
+                                                timeout=5)
+    assert post.call_args[1]['timeout'] == 5
+    sent = json.loads(post.call_args[1]['data']['json'])
+    assert sent['data'] == {'names': ['a', 'b'],
+                            'tensor': {'shape': [1, 2], 'values': [1.0, 1.0]}}
+    assert result == {'data': {'ndarray': [1, 2]}}
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from kubeflow.fairing import executor
+from kubeflow.fairing.builders.base_builder import BaseBuilder
+
+
+class BlockingBuilder(BaseBuilder):
+    """Builds until released, to observe builds running in the background."""
+
+    def __init__(self, tag):
+        super().__init__(registry='example.com/project', image_name='img', push=False)
+        self.tag = tag
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def build(self):
+        self.progress.update(executor.BUILDING)
+        self.started.set()
+        assert self.release.wait(10)
+        if self.tag is None:
+            raise RuntimeError('build failed')
+        self.image_tag = self.full_image_name(self.tag)
+
+
+def test_builds_overlap_and_report_progress():
+    first, second = BlockingBuilder('1'), BlockingBuilder('2')
+    first_future, second_future = first.build_async(), second.build_async()
+    assert first.started.wait(10) and second.started.wait(10)
+    assert first_future.progress.stage == executor.BUILDING
+    assert not first_future.done()
+
+    second.release.set()
+    assert second_future.result(10) == 'example.com/project/img:2'
+    assert second_future.progress.stage == executor.DONE
+    assert first_future.progress.stage == executor.BUILDING
+
+    first.release.set()
+    assert first_future.result(10) == 'example.com/project/img:1'
+    assert [stage for stage, _ in first.progress.history] == [
+        executor.QUEUED, executor.RUNNING, executor.BUILDING, executor.DONE]
+
+
+def test_failed_build_raises_from_future():
+    builder = BlockingBuilder(None)
+    builder.release.set()
+    future = builder.build_async()
+    with pytest.raises(RuntimeError):
+        future.result(10)
+    assert future.progress.stage == executor.FAILED
@@ -210,6 +210,10 @@
                     name: "integration",
                     template: "integration",
                   },
+                  {
+                    name: "benchmarks",
+                    template: "benchmarks",
+                  },
                   {
                     name: "create-pr-symlink",
                     template: "create-pr-symlink",
@@ -253,6 +257,11 @@
             $.parts(namespace, name, overrides).e2e(prow_env, bucket).buildTemplate("unit", pythonImage, srcDir,[
               "tests/unit.sh",
             ]),  // run python tests
+            $.parts(namespace, name, overrides).e2e(prow_env, bucket).buildTemplate("benchmarks", pythonImage, srcDir,[
+              "env",
+              "FAIRING_BENCHMARK_OUTPUT=" + artifactsDir + "/benchmarks.jsonl",
+              "tests/benchmarks.sh",
+            ]),  // run build/push benchmarks
             $.parts(namespace, name, overrides).e2e(prow_env, bucket).buildTemplate("integration", testWorkerImage, srcDir,[
               "tests/e2e.sh",
             ]),  // run tests